@@ -0,0 +1,210 @@
+"""
+What-If Policy Adoption Simulator
+
+Evaluates every subset ("bundle") of candidate policies against the plan
+coverage matrix: adopting a policy lifts each area it addresses to FULL for
+every plan. Per-plan coverage % is (FULL + 0.5 * LIMITED) over the areas the
+plan mentions, as in coverage_model.plan_coverage_stats, so the empty bundle
+reproduces the Tab 1 percentages; an adopted policy's areas count as
+mentioned (and FULL) from then on.
+
+Everything runs on area bitsets from policy_taxonomy. To stay tractable as
+the candidate list grows:
+- policies addressing identical area sets are merged into one candidate
+- policies that cannot close any gap are dropped
+- bundles with the same union of areas share one evaluated outcome
+- plans with identical coverage signatures are evaluated once
+- bundle size is capped (max_bundle_size, DEFAULT_MAX_BUNDLE_SIZE unless given)
+- only the best MAX_BUNDLES_PER_SIZE bundles of each size are kept in the
+  result; bundlesEvaluated still counts every bundle
+"""
+
+import heapq
+from collections import Counter
+from itertools import combinations
+from typing import Dict, List, Any, Optional, Tuple
+
+from policy_taxonomy import ALL_AREAS_MASK, AREA_IDS, area_mask, areas_from_mask, plan_coverage_masks
+
+DEFAULT_MAX_BUNDLE_SIZE = 6
+MAX_BUNDLES_PER_SIZE = 50
+
+# (FULL mask, LIMITED mask, mentioned mask, points and count of mentioned non-standard areas)
+Signature = Tuple[int, int, int, float, int]
+
+
+def _plan_signature(policy_coverage: Dict[str, Dict[str, Any]]) -> Signature:
+    """Everything a plan's coverage % depends on; non-standard areas cannot be lifted, so only their totals matter."""
+    masks = plan_coverage_masks(policy_coverage)
+    mentioned = 0
+    other_points = 0.0
+    other_total = 0
+    for area, entry in policy_coverage.items():
+        area_id = AREA_IDS.get(area)
+        if area_id is not None:
+            mentioned |= 1 << area_id
+            continue
+        other_total += 1
+        if entry['coverage'] == "FULL":
+            other_points += 1
+        elif entry['coverage'] == "LIMITED":
+            other_points += 0.5
+    return masks['FULL'], masks['LIMITED'], mentioned, other_points, other_total
+
+
+def _adopted_coverage(signature: Signature, union: int) -> Tuple[float, bool]:
+    """(coverage %, fully covered) for a plan once the areas in union are lifted to FULL."""
+    full, limited, mentioned, other_points, other_total = signature
+    points = (full | union).bit_count() + 0.5 * (limited & ~union).bit_count() + other_points
+    total = (mentioned | union).bit_count() + other_total
+    if total == 0:
+        return 0, False
+    return round(points / total * 100, 1), points == total
+
+
+def _prepare_candidates(policy_mapping: Dict[str, List[str]], gap_mask: int) -> tuple[List[Dict[str, Any]], List[str]]:
+    """Merge policies with identical area sets and drop those that close no gap."""
+    by_mask: Dict[int, List[str]] = {}
+    dropped = []
+    for policy, areas in policy_mapping.items():
+        mask = area_mask(areas)
+        if not mask & gap_mask:
+            dropped.append(policy)
+            continue
+        by_mask.setdefault(mask, []).append(policy)
+    candidates = [{'policies': names, 'mask': mask} for mask, names in by_mask.items()]
+    return candidates, dropped
+
+
+def _enumerate_unions(masks: List[int], max_size: int):
+    """Yield (candidate indices, union mask) for every non-empty bundle up to max_size."""
+    k = len(masks)
+    if max_size >= k:
+        # Full power set: build unions incrementally from the subset minus its lowest bit
+        unions = [0] * (1 << k)
+        for subset in range(1, 1 << k):
+            low = subset & -subset
+            unions[subset] = unions[subset ^ low] | masks[low.bit_length() - 1]
+            yield [i for i in range(k) if subset >> i & 1], unions[subset]
+    else:
+        for size in range(1, max_size + 1):
+            for combo in combinations(range(k), size):
+                union = 0
+                for i in combo:
+                    union |= masks[i]
+                yield list(combo), union
+
+
+def simulate_policy_adoption(
+    plans: List[Dict[str, Any]],
+    policy_mapping: Dict[str, List[str]],
+    max_bundle_size: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Simulate adoption of every bundle of up to max_bundle_size candidate policies.
+
+    Returns:
+        Dict with 'plans', 'baseline', 'bundles' (the empty baseline bundle plus
+        the best MAX_BUNDLES_PER_SIZE bundles of each size), 'bundlesEvaluated',
+        'outcomes' (per-plan coverage, shared between bundles with the same area
+        union), 'paretoFrontier' and 'prunedPolicies'
+    """
+    plan_names = [plan['planName'] for plan in plans]
+    plan_signatures = [_plan_signature(plan.get('policyCoverage', {})) for plan in plans]
+
+    # Plans with identical coverage behave identically under any bundle
+    signatures = Counter(plan_signatures)
+    gap_mask = 0
+    for full, *_ in signatures:
+        gap_mask |= ~full
+    gap_mask &= ALL_AREAS_MASK
+
+    candidates, dropped = _prepare_candidates(policy_mapping, gap_mask)
+    if max_bundle_size is None:
+        max_bundle_size = DEFAULT_MAX_BUNDLE_SIZE
+    max_size = min(max_bundle_size, len(candidates))
+
+    outcomes: List[Dict[str, Any]] = []
+    outcome_by_union: Dict[int, int] = {}
+
+    def evaluate(union: int) -> int:
+        if union in outcome_by_union:
+            return outcome_by_union[union]
+        adopted = {sig: _adopted_coverage(sig, union) for sig in signatures}
+        total = sum(adopted[sig][0] * count for sig, count in signatures.items())
+        outcome = {
+            'areasLifted': areas_from_mask(union),
+            'planCoverage': [adopted[sig][0] for sig in plan_signatures],
+            'averageCoverage': round(total / len(plans), 1) if plans else 0,
+            'minCoverage': min(pct for pct, _ in adopted.values()) if plans else 0,
+            'plansFullyCovered': sum(count for sig, count in signatures.items() if adopted[sig][1]),
+        }
+        outcome_by_union[union] = len(outcomes)
+        outcomes.append(outcome)
+        return outcome_by_union[union]
+
+    baseline_idx = evaluate(0)
+    baseline_avg = outcomes[baseline_idx]['averageCoverage']
+
+    def bundle_record(indices: List[int], outcome_idx: int) -> Dict[str, Any]:
+        outcome = outcomes[outcome_idx]
+        return {
+            'policies': [name for i in indices for name in candidates[i]['policies']],
+            'size': len(indices),
+            'averageCoverage': outcome['averageCoverage'],
+            'minCoverage': outcome['minCoverage'],
+            'plansFullyCovered': outcome['plansFullyCovered'],
+            'coverageGain': round(outcome['averageCoverage'] - baseline_avg, 1),
+            'outcome': outcome_idx,
+        }
+
+    # Keep the best bundles of each size (min-heaps on coverage; earlier bundles win ties)
+    kept_by_size: Dict[int, List[tuple]] = {}
+    evaluated = 1
+    masks = [c['mask'] for c in candidates]
+    for seq, (indices, union) in enumerate(_enumerate_unions(masks, max_size)):
+        evaluated += 1
+        outcome_idx = evaluate(union)
+        entry = (outcomes[outcome_idx]['averageCoverage'], -seq, indices, outcome_idx)
+        heap = kept_by_size.setdefault(len(indices), [])
+        if len(heap) < MAX_BUNDLES_PER_SIZE:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+
+    bundles = [bundle_record([], baseline_idx)]
+    for size in sorted(kept_by_size):
+        for _, _, indices, outcome_idx in sorted(kept_by_size[size], key=lambda e: (-e[0], -e[1])):
+            bundles.append(bundle_record(indices, outcome_idx))
+
+    # Drop the outcomes only discarded bundles referred to
+    renumber: Dict[int, int] = {}
+    for bundle in bundles:
+        bundle['outcome'] = renumber.setdefault(bundle['outcome'], len(renumber))
+    outcomes = [outcomes[old] for old in renumber]
+
+    # Pareto frontier: best bundle per size, kept only if it beats every smaller size
+    best_by_size: Dict[int, int] = {}
+    for i, bundle in enumerate(bundles):
+        current = best_by_size.get(bundle['size'])
+        if current is None or bundle['averageCoverage'] > bundles[current]['averageCoverage']:
+            best_by_size[bundle['size']] = i
+    frontier = []
+    best_so_far = -1.0
+    for size in sorted(best_by_size):
+        best = best_by_size[size]
+        if bundles[best]['averageCoverage'] > best_so_far:
+            frontier.append(best)
+            best_so_far = bundles[best]['averageCoverage']
+
+    return {
+        'plans': plan_names,
+        'candidatePolicies': [c['policies'] for c in candidates],
+        'prunedPolicies': dropped,
+        'maxBundleSize': max_size,
+        'baseline': outcomes[0],
+        'bundlesEvaluated': evaluated,
+        'bundles': bundles,
+        'outcomes': outcomes,
+        'paretoFrontier': frontier,
+    }
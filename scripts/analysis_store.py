@@ -0,0 +1,271 @@
+"""
+SQLite Analysis Store
+
+Indexed SQLite alternative to re-loading the full json-plan-analysis.json.
+parse-json-plans.py --sqlite writes it; readers (enhance-mapping.py) fetch
+only what they need:
+
+    conn = open_store("scripts/output/json-plan-analysis.db", readonly=True)
+    gaps_for_area(conn, "Clawback/Recovery")
+    coverage_for_business_unit(conn, "Medical")
+    plan_coverage(conn, "Medical ISC Standard v3")
+
+Schema changes are applied as numbered migrations tracked in PRAGMA
+user_version. write_store() builds each run into a fresh file (rollback
+journal, executemany bulk inserts in one transaction) and moves it over
+the previous store, so readers never see a half-written store and a run
+with unchanged plans leaves the file byte-identical.
+"""
+
+import os
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from policy_taxonomy import AREA_IDS, POLICY_AREAS
+
+# Ordered schema migrations; index + 1 = schema version
+MIGRATIONS = [
+    """
+    CREATE TABLE metadata (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    );
+    CREATE TABLE areas (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE,
+        standard INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE TABLE plans (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        source_file TEXT NOT NULL UNIQUE,
+        business_unit TEXT,
+        plan_type TEXT,
+        coverage_pct REAL,
+        full_count INTEGER,
+        limited_count INTEGER,
+        no_count INTEGER,
+        total_count INTEGER
+    );
+    CREATE TABLE coverage (
+        plan_id INTEGER NOT NULL REFERENCES plans(id),
+        area_id INTEGER NOT NULL REFERENCES areas(id),
+        coverage TEXT NOT NULL,
+        details TEXT,
+        original_policy TEXT,
+        PRIMARY KEY (plan_id, area_id)
+    ) WITHOUT ROWID;
+    CREATE TABLE clauses (
+        id INTEGER PRIMARY KEY,
+        plan_id INTEGER NOT NULL REFERENCES plans(id),
+        area_id INTEGER NOT NULL REFERENCES areas(id),
+        policy TEXT NOT NULL,
+        coverage TEXT NOT NULL,
+        details TEXT
+    );
+    CREATE INDEX idx_plans_name ON plans(name);
+    CREATE INDEX idx_plans_business_unit ON plans(business_unit);
+    CREATE INDEX idx_coverage_area ON coverage(area_id, coverage);
+    CREATE INDEX idx_clauses_plan ON clauses(plan_id);
+    CREATE INDEX idx_clauses_area ON clauses(area_id);
+    """,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Apply any pending migrations. Returns the resulting schema version."""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version > SCHEMA_VERSION:
+        raise RuntimeError(f"Store schema v{version} is newer than this script (v{SCHEMA_VERSION})")
+    for target in range(version + 1, SCHEMA_VERSION + 1):
+        with conn:
+            conn.executescript(MIGRATIONS[target - 1])
+            conn.execute(f"PRAGMA user_version = {target}")
+    return SCHEMA_VERSION
+
+
+def open_store(db_path: Path, readonly: bool = False) -> sqlite3.Connection:
+    """Open (and for writers, create/migrate) the analysis store."""
+    if readonly:
+        conn = sqlite3.connect(f"file:{Path(db_path).as_posix()}?mode=ro", uri=True)
+    else:
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(db_path)
+        conn.execute("PRAGMA journal_mode = DELETE")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        migrate(conn)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def write_store(
+    db_path: Path,
+    output_data: Dict[str, Any],
+    clauses_by_plan: Optional[List[List[Dict[str, Any]]]] = None,
+):
+    """Build the store for one analysis run in a fresh file and atomically replace db_path with it."""
+    db_path = Path(db_path)
+    tmp = db_path.with_name(db_path.name + ".tmp")
+    tmp.unlink(missing_ok=True)
+    conn = open_store(tmp)
+    try:
+        write_analysis(conn, output_data, clauses_by_plan)
+    finally:
+        conn.close()
+    os.replace(tmp, db_path)
+    # Sidecars of a store last written in WAL mode would otherwise sit next to the new file
+    for suffix in ("-wal", "-shm"):
+        db_path.with_name(db_path.name + suffix).unlink(missing_ok=True)
+
+
+def write_analysis(
+    conn: sqlite3.Connection,
+    output_data: Dict[str, Any],
+    clauses_by_plan: Optional[List[List[Dict[str, Any]]]] = None,
+):
+    """
+    Replace the store contents with one analysis run.
+
+    Args:
+        output_data: the json-plan-analysis.json structure
+        clauses_by_plan: every parsed clause per plan (same order as plans);
+            when omitted only the best clause per area is stored
+    """
+    plans = output_data['plans']
+
+    # Standard areas keep their taxonomy IDs; other labels are appended
+    area_ids = dict(AREA_IDS)
+    for plan in plans:
+        for area in plan['policyCoverage']:
+            area_ids.setdefault(area, len(area_ids))
+    if clauses_by_plan:
+        for clauses in clauses_by_plan:
+            for clause in clauses:
+                area_ids.setdefault(clause['area'], len(area_ids))
+
+    with conn:
+        for table in ("clauses", "coverage", "plans", "areas", "metadata"):
+            conn.execute(f"DELETE FROM {table}")
+
+        conn.executemany(
+            "INSERT INTO metadata (key, value) VALUES (?, ?)",
+            [
+                ("source", output_data['metadata'].get('source', '')),
+                ("totalFiles", str(output_data['metadata'].get('totalFiles', len(plans)))),
+                ("averageCoverage", str(output_data['globalStats'].get('averageCoverage', 0))),
+            ],
+        )
+        conn.executemany(
+            "INSERT INTO areas (id, name, standard) VALUES (?, ?, ?)",
+            ((area_id, name, int(name in AREA_IDS)) for name, area_id in area_ids.items()),
+        )
+        conn.executemany(
+            """INSERT INTO plans (id, name, source_file, business_unit, plan_type, coverage_pct,
+                                  full_count, limited_count, no_count, total_count)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (
+                (
+                    plan_id, plan['planName'], plan['sourceFile'],
+                    plan.get('businessUnit'), plan.get('planType'),
+                    plan['coverageStats']['percentage'], plan['coverageStats']['full'],
+                    plan['coverageStats']['limited'], plan['coverageStats']['no'],
+                    plan['coverageStats']['total'],
+                )
+                for plan_id, plan in enumerate(plans, start=1)
+            ),
+        )
+        conn.executemany(
+            "INSERT INTO coverage (plan_id, area_id, coverage, details, original_policy) VALUES (?, ?, ?, ?, ?)",
+            (
+                (plan_id, area_ids[area], entry['coverage'], entry.get('details'), entry.get('originalPolicy'))
+                for plan_id, plan in enumerate(plans, start=1)
+                for area, entry in plan['policyCoverage'].items()
+            ),
+        )
+        if clauses_by_plan:
+            conn.executemany(
+                "INSERT INTO clauses (plan_id, area_id, policy, coverage, details) VALUES (?, ?, ?, ?, ?)",
+                (
+                    (plan_id, area_ids[clause['area']], clause['policy'], clause['coverage'], clause['details'])
+                    for plan_id, clauses in enumerate(clauses_by_plan, start=1)
+                    for clause in clauses
+                ),
+            )
+
+
+def gaps_for_area(conn: sqlite3.Connection, area: str, include_unmentioned: bool = True) -> List[Dict[str, Any]]:
+    """
+    Plans with NO or LIMITED coverage in one area.
+
+    Unmentioned areas count as NO unless include_unmentioned is False (then
+    only plans that list the area, as enhance-mapping.py's Plans Count).
+
+    Raises:
+        ValueError: the area is not in the store
+    """
+    row = conn.execute("SELECT id FROM areas WHERE name = ?", (area,)).fetchone()
+    if row is None:
+        raise ValueError(f"Unknown policy area: {area!r}")
+    rows = conn.execute(
+        f"""SELECT p.name AS planName, COALESCE(c.coverage, 'NO') AS coverage, c.details AS details
+            FROM plans p
+            {"LEFT JOIN" if include_unmentioned else "JOIN"} coverage c
+              ON c.plan_id = p.id AND c.area_id = ?
+            WHERE COALESCE(c.coverage, 'NO') IN ('NO', 'LIMITED')
+            ORDER BY p.id""",
+        (row['id'],),
+    )
+    return [dict(row) for row in rows]
+
+
+def coverage_for_business_unit(conn: sqlite3.Connection, business_unit: str) -> List[Dict[str, Any]]:
+    """Standard-area coverage for every plan in one business unit (unmentioned areas are NO)."""
+    plans = conn.execute(
+        "SELECT id, name FROM plans WHERE business_unit = ? ORDER BY id", (business_unit,)
+    ).fetchall()
+    by_plan: Dict[int, Dict[str, str]] = {plan['id']: {} for plan in plans}
+    rows = conn.execute(
+        """SELECT c.plan_id, a.name AS area, c.coverage
+           FROM plans p
+           JOIN coverage c ON c.plan_id = p.id
+           JOIN areas a ON a.id = c.area_id AND a.standard = 1
+           WHERE p.business_unit = ?""",
+        (business_unit,),
+    )
+    for row in rows:
+        by_plan[row['plan_id']][row['area']] = row['coverage']
+    return [
+        {'planName': plan['name'], 'coverage': {area: by_plan[plan['id']].get(area, "NO") for area in POLICY_AREAS}}
+        for plan in plans
+    ]
+
+
+def plan_coverage(conn: sqlite3.Connection, plan_name: str) -> Optional[Dict[str, Any]]:
+    """One plan's stats and per-area coverage, or None if unknown."""
+    plan = conn.execute("SELECT * FROM plans WHERE name = ? ORDER BY id LIMIT 1", (plan_name,)).fetchone()
+    if plan is None:
+        return None
+    rows = conn.execute(
+        """SELECT a.name AS area, c.coverage, c.details, c.original_policy AS originalPolicy
+           FROM coverage c JOIN areas a ON a.id = c.area_id
+           WHERE c.plan_id = ? ORDER BY a.id""",
+        (plan['id'],),
+    )
+    return {
+        'planName': plan['name'],
+        'sourceFile': plan['source_file'],
+        'coverageStats': {
+            'full': plan['full_count'],
+            'limited': plan['limited_count'],
+            'no': plan['no_count'],
+            'total': plan['total_count'],
+            'percentage': plan['coverage_pct'],
+        },
+        'policyCoverage': {
+            row['area']: {'coverage': row['coverage'], 'details': row['details'], 'originalPolicy': row['originalPolicy']}
+            for row in rows
+        },
+    }
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Batch Build Policy Coverage Matrix Workbooks
+
+Renders many coverage matrix workbooks concurrently (see policy_matrix.py),
+e.g. for a quarterly refresh of every client and division. Each workbook is
+built in its own worker process: workers exit after one job
+(max_tasks_per_child=1), so memory is returned to the OS between workbooks,
+and each worker's address space is capped (RLIMIT_AS) so one oversized input
+fails alone instead of taking the host down.
+
+Inputs are coverage analysis documents (json-plan-analysis.json layout,
+from parse-json-plans.py or ingest-coverage-workbook.py).
+
+Usage:
+    python3 scripts/batch-build-matrices.py acme=/data/acme/json-plan-analysis.json globex=/data/globex/json-plan-analysis.json
+    python3 scripts/batch-build-matrices.py --manifest clients.json --by-division [--workers 4] [--memory-limit 1024]
+    python3 scripts/batch-build-matrices.py scripts/output/*/json-plan-analysis.json --formats all
+
+Manifest format:
+    [{"client": "Acme", "input": "/data/acme/json-plan-analysis.json"}]
+
+Output:
+    scripts/output/matrices/<Client>[_<Division>]_Policy_Coverage_Matrix.xlsx (+ --formats siblings)
+    scripts/output/matrices/logs/<workbook>.log
+    scripts/output/matrices/matrix-batch-summary.json (per-workbook timings, peak RSS, throughput)
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import re
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from adoption_simulator import DEFAULT_MAX_BUNDLE_SIZE
+from coverage_model import build_analysis
+from policy_matrix import EXPORT_FORMATS, build_workbook
+
+OUTPUT_DIR = Path(os.environ.get("SGM_OUTPUT_DIR", Path(__file__).parent / "output")) / "matrices"
+SUMMARY_FILE_NAME = "matrix-batch-summary.json"
+DEFAULT_MEMORY_LIMIT_MB = 2048
+WORKBOOK_SUFFIX = "_Policy_Coverage_Matrix.xlsx"
+
+
+def file_slug(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", text).strip("_")
+
+
+def load_jobs(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """Collect (client, input) specs from --manifest and CLIENT=PATH / PATH arguments."""
+    specs = []
+    if args.manifest:
+        with open(args.manifest, 'r', encoding='utf-8') as f:
+            specs.extend(json.load(f))
+    for spec in args.inputs:
+        client, sep, path = spec.partition("=")
+        if not sep:
+            # Bare path: name the client after its directory (scripts/output/<tenant>/json-plan-analysis.json)
+            path = spec
+            client = Path(spec).resolve().parent.name
+        specs.append({'client': client, 'input': path})
+
+    jobs = []
+    for spec in specs:
+        if not spec.get('client') or not spec.get('input'):
+            raise ValueError(f"Manifest entry needs client and input: {spec}")
+        jobs.append({'client': spec['client'], 'input': spec['input'], 'division': None})
+        if args.by_division:
+            with open(spec['input'], 'r', encoding='utf-8') as f:
+                divisions = json.load(f)['metadata'].get('divisions', [])
+            jobs.extend({'client': spec['client'], 'input': spec['input'], 'division': division}
+                        for division in divisions)
+
+    seen = set()
+    for job in jobs:
+        name = file_slug(job['client'] + (f"_{job['division']}" if job['division'] else ""))
+        if name in seen:
+            raise ValueError(f"Two jobs would write the same workbook: {name}{WORKBOOK_SUFFIX}")
+        seen.add(name)
+        job['name'] = name
+    return jobs
+
+
+def limit_memory(limit_bytes: Optional[int]):
+    """Worker initializer: cap the address space so a runaway build raises MemoryError."""
+    if not limit_bytes:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit_bytes = min(limit_bytes, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit_bytes, hard))
+
+
+def division_analysis(plan_data: Dict[str, Any], division: str) -> Dict[str, Any]:
+    """The analysis document restricted to one division's plans."""
+    plans = [plan for plan in plan_data['plans'] if plan.get('division') == division]
+    metadata = plan_data['metadata']
+    analysis = build_analysis(plans, f"{metadata.get('source', '')}#{division}", len(plans), [division])
+    analysis['metadata']['standardPolicyAreas'] = metadata.get('standardPolicyAreas', analysis['metadata']['standardPolicyAreas'])
+    return analysis
+
+
+def build_job(job: Dict[str, Any], output_dir: str, formats: List[str], max_bundle_size: Optional[int]) -> Dict[str, Any]:
+    """Worker: build one workbook, logging its progress lines to logs/<name>.log."""
+    started = time.perf_counter()
+    output_file = Path(output_dir) / f"{job['name']}{WORKBOOK_SUFFIX}"
+    log_file = Path(output_dir) / "logs" / f"{job['name']}.log"
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+    summary = {'name': job['name'], 'client': job['client'], 'division': job['division'], 'input': job['input']}
+    try:
+        with open(log_file, 'w', encoding='utf-8') as log, contextlib.redirect_stdout(log):
+            with open(job['input'], 'r', encoding='utf-8') as f:
+                plan_data = json.load(f)
+            if job['division']:
+                plan_data = division_analysis(plan_data, job['division'])
+            client = f"{job['client']} {job['division']}" if job['division'] else job['client']
+            result = build_workbook(plan_data, output_file, formats, client=client, max_bundle_size=max_bundle_size)
+        summary.update(status="ok", outputs=[str(path) for path in result['outputs']], plans=result['plans'],
+                       gaps=result['gaps'])
+    except MemoryError:
+        summary.update(status="failed", error="memory limit exceeded")
+    except (OSError, ValueError, KeyError) as e:
+        summary.update(status="failed", error=f"{type(e).__name__}: {e}")
+
+    # One job per worker process, so the process peak is this workbook's peak
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    summary['maxRssBytes'] = max_rss if sys.platform == "darwin" else max_rss * 1024
+    summary['seconds'] = round(time.perf_counter() - started, 3)
+    return summary
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build many policy coverage matrix workbooks concurrently")
+    parser.add_argument("inputs", nargs="*", metavar="[CLIENT=]ANALYSIS_JSON", help="Coverage analysis documents")
+    parser.add_argument("--manifest", type=Path, help="JSON list of {client, input}")
+    parser.add_argument("--by-division", action="store_true", help="Also build one workbook per division of each input")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Workbooks built concurrently")
+    parser.add_argument("--memory-limit", type=int, default=DEFAULT_MEMORY_LIMIT_MB, metavar="MB",
+                        help=f"Address space cap per worker in MB, 0 for none (default: {DEFAULT_MEMORY_LIMIT_MB})")
+    parser.add_argument("--formats", nargs="+", choices=EXPORT_FORMATS + ["all"], default=["xlsx"],
+                        help="Matrix formats per workbook (default: xlsx)")
+    parser.add_argument("--max-bundle-size", type=int, default=None,
+                        help=f"Largest policy bundle to simulate (default: {DEFAULT_MAX_BUNDLE_SIZE})")
+    parser.add_argument("--output-dir", type=Path, default=OUTPUT_DIR, help=f"Where workbooks go (default: {OUTPUT_DIR})")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    try:
+        jobs = load_jobs(args)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ {e}")
+        return 1
+    if not jobs:
+        print("❌ No inputs given (use CLIENT=ANALYSIS_JSON arguments or --manifest FILE)")
+        return 1
+    formats = EXPORT_FORMATS if "all" in args.formats else [f for f in EXPORT_FORMATS if f in args.formats]
+    workers = max(1, min(args.workers, len(jobs)))
+    memory_limit = args.memory_limit * 1024 * 1024 if args.memory_limit else None
+
+    print(f"🚀 Building {len(jobs)} workbooks ({workers} workers"
+          f"{f', {args.memory_limit} MB each' if memory_limit else ''})...\n")
+
+    started = time.perf_counter()
+    summaries = []
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=1,
+                             initializer=limit_memory, initargs=(memory_limit,)) as pool:
+        futures = {pool.submit(build_job, job, str(args.output_dir), formats, args.max_bundle_size): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                summary = future.result()
+            except Exception as e:
+                # The worker died (e.g. killed outright for memory) before it could report
+                summary = {'name': job['name'], 'client': job['client'], 'division': job['division'],
+                           'input': job['input'], 'status': "failed", 'error': f"worker crashed: {e}", 'seconds': 0}
+            summaries.append(summary)
+            icon = "✅" if summary['status'] == "ok" else "❌"
+            print(f"   {icon} {summary['name']}: {summary['status']} ({summary['seconds']:.2f}s)")
+    elapsed = time.perf_counter() - started
+
+    summaries.sort(key=lambda s: s['name'])
+    ok = [s for s in summaries if s['status'] == "ok"]
+    throughput = round(len(ok) / elapsed * 60, 1) if elapsed > 0 else 0
+    output_data = {
+        'metadata': {
+            'totalWorkbooks': len(summaries),
+            'succeeded': len(ok),
+            'failed': len(summaries) - len(ok),
+            'workers': workers,
+            'memoryLimitBytes': memory_limit,
+            'formats': formats,
+            'wallSeconds': round(elapsed, 2),
+            'workbooksPerMinute': throughput,
+            'peakWorkerRssBytes': max((s.get('maxRssBytes', 0) for s in summaries), default=0),
+        },
+        'workbooks': summaries,
+    }
+    summary_file = args.output_dir / SUMMARY_FILE_NAME
+    with open(summary_file, 'w', encoding='utf-8') as f:
+        json.dump(output_data, f, indent=2, ensure_ascii=False)
+
+    print(f"\n✅ Summary written to {summary_file}\n")
+    print("📊 Batch Summary:")
+    print("═" * 90)
+    for s in summaries:
+        detail = f"Plans: {s.get('plans', 0):4} | Gaps: {s.get('gaps') or 0:4}" if s['status'] == "ok" else f"failed: {s.get('error', '')}"
+        print(f"   {s['name'][:36]:38} | {detail[:40]:40} | {s['seconds']:6.2f}s | {s.get('maxRssBytes', 0) / 1e6:6.0f} MB")
+    print("═" * 90)
+    print(f"   Workbooks: {len(summaries)} | OK: {len(ok)} | Failed: {len(summaries) - len(ok)} | "
+          f"Wall time: {elapsed:.2f}s | Throughput: {throughput} workbooks/min")
+    print("═" * 90)
+    print()
+
+    if len(ok) != len(summaries):
+        print("❌ Batch finished with failures")
+        return 1
+    print("🎉 Batch complete!")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Batch Multi-Tenant Pipeline Run
+
+Runs the full pipeline (see pipeline_dag.py) for many client archives at
+once, one tenant per worker process. Each tenant gets namespaced outputs
+and its own skip state, and a cross-tenant summary is written at the end.
+
+Usage:
+    python3 scripts/batch-tenants.py --tenant acme=/archives/acme --tenant globex=/archives/globex
+    python3 scripts/batch-tenants.py --manifest tenants.json [--workers 4] [--force]
+
+Manifest format:
+    [{"tenant": "acme", "archiveRoot": "/archives/acme",
+      "mappingCsv": "/archives/acme/Readout_Deliverables_Mapping.csv"}]
+
+Output:
+    scripts/output/<tenant>/            (analysis JSON, workbooks, logs)
+    scripts/output/tenants-summary.json
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Any
+
+from pipeline_dag import DEFAULT_OUTPUT_DIR, REPO_ROOT, context_env, resolve_stages, run_pipeline
+
+SUMMARY_FILE = REPO_ROOT / DEFAULT_OUTPUT_DIR / "tenants-summary.json"
+TENANT_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_-]*$")
+MAPPING_CSV_NAME = "Demo_Client_Readout_Deliverables_Mapping.csv"
+
+
+def load_tenants(args: argparse.Namespace) -> List[Dict[str, str]]:
+    """Collect tenant specs from --manifest and --tenant NAME=ARCHIVE_ROOT."""
+    tenants = []
+    if args.manifest:
+        with open(args.manifest, 'r', encoding='utf-8') as f:
+            tenants.extend(json.load(f))
+    for spec in args.tenant or []:
+        name, _, archive_root = spec.partition("=")
+        tenants.append({"tenant": name, "archiveRoot": archive_root})
+
+    seen = set()
+    for tenant in tenants:
+        if not TENANT_NAME.match(tenant.get("tenant", "")):
+            raise ValueError(f"Invalid tenant name: {tenant.get('tenant')!r} (use letters, digits, - and _)")
+        if not tenant.get("archiveRoot"):
+            raise ValueError(f"Tenant {tenant['tenant']} has no archiveRoot")
+        if tenant["tenant"] in seen:
+            raise ValueError(f"Duplicate tenant: {tenant['tenant']}")
+        seen.add(tenant["tenant"])
+    return tenants
+
+
+def tenant_context(tenant: Dict[str, str]) -> Dict[str, str]:
+    """Pipeline placeholders for one tenant: everything under scripts/output/<tenant>/."""
+    tenant_dir = os.path.join(DEFAULT_OUTPUT_DIR, tenant["tenant"])
+    archive_root = str(Path(tenant["archiveRoot"]).expanduser().resolve())
+    return {
+        "archive": archive_root,
+        "output": tenant_dir,
+        "workbooks": tenant_dir,
+        "mapping_csv": tenant.get("mappingCsv") or os.path.join(archive_root, MAPPING_CSV_NAME),
+        "policies": os.path.join(archive_root, "CLIENT_DELIVERY_PACKAGE/02_POLICIES"),
+        "policy_library": os.path.join(tenant_dir, "policies"),
+        "tenant": tenant["tenant"],
+    }
+
+
+def read_json(path: Path) -> Dict[str, Any]:
+    if path.exists():
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+def run_tenant(tenant: Dict[str, str], force: bool, jobs: int) -> Dict[str, Any]:
+    """Worker: run one tenant's pipeline and summarize its outputs."""
+    context = tenant_context(tenant)
+    stages = resolve_stages(context)
+
+    started = time.perf_counter()
+    results = run_pipeline(stages, output_dir=context["output"], env=context_env(context), force=force, jobs=jobs)
+    elapsed = time.perf_counter() - started
+
+    output_dir = REPO_ROOT / context["output"]
+    plan_analysis = read_json(output_dir / "json-plan-analysis.json")
+    draft_policies = read_json(output_dir / "draft-policies-summary.json")
+    failed = [r["name"] for r in results if r["status"] in ("failed", "blocked")]
+
+    return {
+        "tenant": tenant["tenant"],
+        "archiveRoot": context["archive"],
+        "outputDir": context["output"],
+        "status": "failed" if failed else "ok",
+        "failedStages": failed,
+        "seconds": round(elapsed, 2),
+        "stages": [{"name": r["name"], "status": r["status"], "seconds": round(r["seconds"], 2)} for r in results],
+        "totalPlans": plan_analysis.get("globalStats", {}).get("totalPlans", 0),
+        "averageCoverage": plan_analysis.get("globalStats", {}).get("averageCoverage", 0),
+        "draftPolicies": draft_policies.get("metadata", {}).get("totalPolicies", 0),
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the pipeline for many client archives concurrently")
+    parser.add_argument("--tenant", action="append", metavar="NAME=ARCHIVE_ROOT", help="Tenant to process (repeatable)")
+    parser.add_argument("--manifest", type=Path, help="JSON list of tenants")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Tenants processed concurrently")
+    parser.add_argument("--jobs", type=int, default=2, help="Concurrent stages within each tenant (default: 2)")
+    parser.add_argument("--force", action="store_true", help="Re-run every stage regardless of inputs")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    tenants = load_tenants(args)
+    if not tenants:
+        print("❌ No tenants given (use --tenant NAME=ARCHIVE_ROOT or --manifest FILE)")
+        return 1
+
+    print(f"🚀 Running pipeline for {len(tenants)} tenants ({args.workers} workers)...\n")
+
+    started = time.perf_counter()
+    summaries = []
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        futures = {pool.submit(run_tenant, tenant, args.force, args.jobs): tenant for tenant in tenants}
+        for future in as_completed(futures):
+            tenant = futures[future]
+            try:
+                summary = future.result()
+            except Exception as e:
+                summary = {"tenant": tenant["tenant"], "status": "failed", "error": str(e), "seconds": 0}
+            summaries.append(summary)
+            icon = "✅" if summary["status"] == "ok" else "❌"
+            print(f"   {icon} {summary['tenant']}: {summary['status']} ({summary['seconds']:.2f}s)")
+    elapsed = time.perf_counter() - started
+
+    # Cross-tenant summary
+    summaries.sort(key=lambda s: s["tenant"])
+    ok = [s for s in summaries if s["status"] == "ok"]
+    output_data = {
+        "metadata": {
+            "totalTenants": len(summaries),
+            "succeeded": len(ok),
+            "failed": len(summaries) - len(ok),
+            "wallSeconds": round(elapsed, 2),
+        },
+        "crossTenant": {
+            "totalPlans": sum(s.get("totalPlans", 0) for s in ok),
+            "averageCoverage": round(sum(s.get("averageCoverage", 0) for s in ok) / len(ok), 1) if ok else 0,
+        },
+        "tenants": summaries,
+    }
+    SUMMARY_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(SUMMARY_FILE, 'w', encoding='utf-8') as f:
+        json.dump(output_data, f, indent=2, ensure_ascii=False)
+
+    print(f"\n✅ Summary written to {SUMMARY_FILE}\n")
+    print("📊 Tenant Summary:")
+    print("═" * 90)
+    for s in summaries:
+        failed = f" | failed: {', '.join(s.get('failedStages', [])) or s.get('error', '')}" if s["status"] != "ok" else ""
+        print(f"   {s['tenant'][:30]:32} | Plans: {s.get('totalPlans', 0):4} | "
+              f"Avg Coverage: {s.get('averageCoverage', 0):5.1f}% | {s['seconds']:7.2f}s{failed}")
+    print("═" * 90)
+    print(f"   Tenants: {len(summaries)} | OK: {len(ok)} | Failed: {len(summaries) - len(ok)} | Wall time: {elapsed:.2f}s")
+    print("═" * 90)
+    print()
+
+    if len(ok) != len(summaries):
+        print("❌ Batch finished with failures")
+        return 1
+    print("🎉 Batch complete!")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,87 @@
+"""
+Clause Extract Schema
+
+Validates entries of plan*_clause_extract.json files before they reach
+assess_coverage():
+
+    entry = validate_clause(entry)   # normalized entry, or ClauseSchemaError
+
+The schema below is declarative, but it is not interpreted per record:
+compile_schema() generates one specialized Python function for it at import
+time. A well-formed entry costs a type check and a dict lookup per field
+(well under a microsecond); only bad fields take the slow path, which either
+normalizes them into a copy of the entry or rejects the entry.
+
+Field rules:
+    required   missing field is rejected (otherwise allowed)
+    null       what a JSON null becomes: "reject" or "empty" (an empty string)
+    coerce     numbers are turned into strings instead of rejected
+    nonEmpty   blank strings are rejected
+"""
+
+from typing import Any, Callable, Dict, List
+
+CLAUSE_SCHEMA: Dict[str, Dict[str, Any]] = {
+    'plan': {'required': False, 'null': "reject", 'coerce': True, 'nonEmpty': False},
+    'policy': {'required': True, 'null': "reject", 'coerce': True, 'nonEmpty': True},
+    # A null details is treated like a clause with no text (assessed as NO coverage)
+    'details': {'required': True, 'null': "empty", 'coerce': True, 'nonEmpty': False},
+}
+
+
+class ClauseSchemaError(ValueError):
+    """An entry that cannot be normalized into the clause schema."""
+
+
+def _field_source(name: str, rule: Dict[str, Any]) -> List[str]:
+    """Generated checks for one field; fast path first."""
+    key = repr(name)
+    lines = [f"    value = entry.get({key}, _MISSING)"]
+    lines.append("    if type(value) is not _str:")
+    if rule['required']:
+        lines.append("        if value is _MISSING:")
+        lines.append(f"            raise _Error('missing field ' + {key!r})")
+    else:
+        lines.append("        if value is _MISSING:")
+        lines.append("            pass")
+    lines.append("        elif value is None:")
+    if rule['null'] == "empty":
+        lines.append("            if changed is None:")
+        lines.append("                changed = dict(entry)")
+        lines.append(f"            changed[{key}] = ''")
+    else:
+        lines.append(f"            raise _Error('field ' + {key!r} + ' is null')")
+    if rule['coerce']:
+        lines.append("        elif type(value) is _int or type(value) is _float:")
+        lines.append("            if changed is None:")
+        lines.append("                changed = dict(entry)")
+        lines.append(f"            changed[{key}] = _str(value)")
+    lines.append("        else:")
+    lines.append(f"            raise _Error('field ' + {key!r} + ' must be a string, got ' + type(value).__name__)")
+    if rule['nonEmpty']:
+        lines.append("    elif not value or value.isspace():")
+        lines.append(f"        raise _Error('field ' + {key!r} + ' is blank')")
+    return lines
+
+
+def compile_schema(schema: Dict[str, Dict[str, Any]]) -> Callable[[Any], Dict[str, Any]]:
+    """Generate a validator function for a schema; returns the entry itself when nothing needed fixing."""
+    lines = [
+        "def validate(entry):",
+        "    if type(entry) is not _dict:",
+        "        raise _Error('expected an object, got ' + type(entry).__name__)",
+        "    changed = None",
+    ]
+    for name, rule in schema.items():
+        lines.extend(_field_source(name, rule))
+    lines.append("    return entry if changed is None else changed")
+
+    namespace = {
+        '_MISSING': object(), '_Error': ClauseSchemaError,
+        '_str': str, '_dict': dict, '_int': int, '_float': float,
+    }
+    exec(compile("\n".join(lines), "<clause_schema>", "exec"), namespace)
+    return namespace['validate']
+
+
+validate_clause = compile_schema(CLAUSE_SCHEMA)
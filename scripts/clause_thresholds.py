@@ -0,0 +1,220 @@
+"""
+Clause Threshold Extraction and Index
+
+Pulls typed numeric values out of clause details and keeps them in sorted
+arrays so threshold questions are range lookups, not text rescans:
+
+    "< $425K or ≥ $425K"     -> money    425000 USD  (comparators "<", ">=")
+    "capped at 100%"         -> percent  100 %       (comparator "<=")
+    "within 30 days"         -> duration 30 days     (comparator "<=")
+    "12 fiscal months"       -> duration 360 days    (original "12 fiscal months")
+    "45-60 days"             -> duration 45 days (">=") and 60 days ("<=")
+    "between $425K and $1M"  -> money    425000 USD (">=") and 1000000 USD ("<=")
+
+    index = ThresholdIndex(extract_plan_thresholds(plans, clauses_by_plan))
+    index.plans("money", low=1_000_000, area="Windfall/Large Deals")
+    index.distribution("duration", [30, 60, 90, 180], area="Clawback/Recovery")
+
+Durations are normalized to days (week 7, month 30, quarter 91, year 365;
+business days count as days and keep their unit). Money is in dollars.
+A range ("-", "to", "through", or "between ... and ...") yields one record
+per end; a range's low end without its own unit takes the high end's
+("$1-2M" is 1M to 2M, "10-20%" is 10% to 20%).
+"""
+
+import bisect
+import re
+from typing import Dict, Iterable, List, Any, Optional, Tuple
+
+from plan_shards import assign_plan_ids
+
+KINDS = ("money", "percent", "duration")
+ALL_AREAS = "*"
+SNIPPET_CHARS = 40
+
+MONEY_MULTIPLIERS = {"k": 1e3, "thousand": 1e3, "m": 1e6, "mm": 1e6, "million": 1e6, "b": 1e9, "billion": 1e9}
+DURATION_DAYS = {"day": 1, "week": 7, "month": 30, "quarter": 91, "year": 365}
+NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "eight": 8, "nine": 9,
+    "ten": 10, "eleven": 11, "twelve": 12, "fifteen": 15, "eighteen": 18, "twenty": 20, "thirty": 30,
+    "forty-five": 45, "sixty": 60, "ninety": 90,
+}
+
+# Comparator words/symbols just before a value (checked nearest-first)
+COMPARATORS = [
+    (re.compile(r"(≥|>=|at least|minimum of|min\.?|no less than|or more)\s*$"), ">="),
+    (re.compile(r"(≤|<=|up to|at most|maximum of|max\.?|no more than|capped at|cap of|cap at|within|not to exceed)\s*$"), "<="),
+    (re.compile(r"(>|above|over|exceeding|exceeds|greater than|more than)\s*$"), ">"),
+    (re.compile(r"(<|below|under|less than)\s*$"), "<"),
+]
+
+_NUMBER = r"\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?"
+_MULT = r"thousand|million|billion|mm|[kmb]"
+_WORDS = "|".join(sorted(NUMBER_WORDS, key=len, reverse=True))
+# Between the two ends of a range; "and" only counts after "between" (see _ends)
+_RANGE_SEP = r"\s*(?P<sep>-|–|—|to|through|and)\s*"
+MONEY_RE = re.compile(
+    rf"\$\s?(?:(?P<low>{_NUMBER})\s*(?P<lowmult>{_MULT})?(?![a-z]){_RANGE_SEP}(?P<dollar>\$)?\s?)?"
+    rf"(?P<num>{_NUMBER})\s*(?P<mult>{_MULT})?(?![a-z])",
+    re.IGNORECASE,
+)
+PERCENT_RE = re.compile(rf"(?<![\w.])(?:(?P<low>{_NUMBER})\s*%?{_RANGE_SEP})?(?P<num>{_NUMBER})\s*%", re.IGNORECASE)
+DURATION_RE = re.compile(
+    rf"(?<![\w.$])(?:(?P<low>{_NUMBER}|{_WORDS}){_RANGE_SEP})?(?P<num>{_NUMBER}|{_WORDS})"
+    r"[\s-]*(?P<qual>business|calendar|fiscal|working)?[\s-]*(?P<unit>day|week|month|quarter|year)s?\b",
+    re.IGNORECASE,
+)
+BETWEEN_RE = re.compile(r"between\s*$", re.IGNORECASE)
+
+
+def _number(text: str) -> float:
+    text = text.lower()
+    if text in NUMBER_WORDS:
+        return float(NUMBER_WORDS[text])
+    return float(text.replace(",", ""))
+
+
+def _comparator(details: str, start: int) -> Optional[str]:
+    before = details[max(0, start - 20):start].lower()
+    for pattern, comparator in COMPARATORS:
+        if pattern.search(before):
+            return comparator
+    return None
+
+
+def _ends(details: str, match: re.Match) -> List[Tuple[str, Optional[str], int]]:
+    """
+    (group, comparator, start) per value in a match: the high end alone, both
+    ends of a range (">=" / "<="), or two separate values for "X and Y"
+    without "between" (comparators then come from the text before each).
+    """
+    if match['low'] is None:
+        return [("num", None, match.start())]
+    if match['sep'].lower() == "and" and not BETWEEN_RE.search(details[max(0, match.start() - 20):match.start()]):
+        return [("low", None, match.start()), ("num", None, match.start('num'))]
+    return [("low", ">=", match.start()), ("num", "<=", match.start())]
+
+
+def extract_values(details: str) -> List[Dict[str, Any]]:
+    """Typed values in one clause's text, in text order."""
+    values = []
+    for match in MONEY_RE.finditer(details):
+        # "$1-2M": a low end without its own unit takes the high end's, unless that has its own "$"
+        low_mult = match['lowmult'] or ("" if match['dollar'] else match['mult'])
+        mults = {'low': (low_mult or "").lower(), 'num': (match['mult'] or "").lower()}
+        for group, comparator, start in _ends(details, match):
+            values.append({'kind': "money", 'value': _number(match[group]) * MONEY_MULTIPLIERS.get(mults[group], 1),
+                           'unit': "USD", 'comparator': comparator, 'start': start, 'end': match.end()})
+    for match in PERCENT_RE.finditer(details):
+        for group, comparator, start in _ends(details, match):
+            values.append({'kind': "percent", 'value': _number(match[group]), 'unit': "%",
+                           'comparator': comparator, 'start': start, 'end': match.end()})
+    for match in DURATION_RE.finditer(details):
+        unit = match['unit'].lower()
+        qualifier = (match['qual'] or "").lower()
+        for group, comparator, start in _ends(details, match):
+            amount = _number(match[group])
+            values.append({'kind': "duration", 'value': amount * DURATION_DAYS[unit], 'unit': "days",
+                           'original': f"{amount:g} {qualifier + ' ' if qualifier else ''}{unit}s",
+                           'comparator': comparator, 'start': start, 'end': match.end()})
+
+    values.sort(key=lambda v: v['start'])
+    for value in values:
+        value['comparator'] = value['comparator'] or _comparator(details, value['start'])
+        value['text'] = details[max(0, value['start'] - SNIPPET_CHARS):value['end'] + SNIPPET_CHARS].strip()
+        del value['start'], value['end']
+    return values
+
+
+def extract_plan_thresholds(plans: List[Dict[str, Any]], clauses_by_plan: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """One record per value found in any clause of any plan (clauses as kept by parse_json_file)."""
+    records = []
+    for plan, pid, clauses in zip(plans, assign_plan_ids(plans), clauses_by_plan):
+        for clause in clauses:
+            for value in extract_values(clause['details']):
+                records.append(dict(value, planId=pid, planName=plan['planName'], area=clause['area'],
+                                    policy=clause['policy']))
+    return records
+
+
+class ThresholdIndex:
+    """Records sorted by value per (kind, area), with bisect range lookups."""
+
+    def __init__(self, records: List[Dict[str, Any]], order: Optional[Dict[str, Dict[str, List[int]]]] = None):
+        self.records = records
+        if order is None:
+            order = {}
+            values = [record['value'] for record in records]
+            for record_id in sorted(range(len(records)), key=values.__getitem__):
+                record = records[record_id]
+                by_area = order.setdefault(record['kind'], {})
+                by_area.setdefault(ALL_AREAS, []).append(record_id)
+                by_area.setdefault(record['area'], []).append(record_id)
+        self.order = order
+        # Parallel sorted value arrays for bisect
+        self.values: Dict[Tuple[str, str], List[float]] = {
+            (kind, area): [records[i]['value'] for i in record_ids]
+            for kind, by_area in order.items() for area, record_ids in by_area.items()
+        }
+
+    def range(self, kind: str, low: Optional[float] = None, high: Optional[float] = None,
+              area: Optional[str] = None, inclusive: bool = True) -> List[Dict[str, Any]]:
+        """Records of a kind with low <= value <= high (strict bounds without inclusive), ascending."""
+        key = (kind, area or ALL_AREAS)
+        values = self.values.get(key, [])
+        if low is None:
+            start = 0
+        else:
+            start = (bisect.bisect_left if inclusive else bisect.bisect_right)(values, low)
+        if high is None:
+            end = len(values)
+        else:
+            end = (bisect.bisect_right if inclusive else bisect.bisect_left)(values, high)
+        record_ids = self.order.get(kind, {}).get(area or ALL_AREAS, [])
+        return [self.records[i] for i in record_ids[start:end]]
+
+    def plans(self, kind: str, low: Optional[float] = None, high: Optional[float] = None,
+              area: Optional[str] = None, inclusive: bool = True) -> Dict[str, List[Dict[str, Any]]]:
+        """Matching records grouped by plan ID."""
+        by_plan: Dict[str, List[Dict[str, Any]]] = {}
+        for record in self.range(kind, low, high, area, inclusive):
+            by_plan.setdefault(record['planId'], []).append(record)
+        return by_plan
+
+    def distribution(self, kind: str, edges: Iterable[float], area: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Counts per bucket [edge_i, edge_i+1), plus below the first and from the last edge."""
+        values = self.values.get((kind, area or ALL_AREAS), [])
+        edges = sorted(edges)
+        cuts = [0] + [bisect.bisect_left(values, edge) for edge in edges] + [len(values)]
+        bounds = [None] + edges + [None]
+        return [
+            {'from': bounds[i], 'to': bounds[i + 1], 'count': cuts[i + 1] - cuts[i]}
+            for i in range(len(cuts) - 1)
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'kinds': list(KINDS), 'records': self.records, 'order': self.order}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ThresholdIndex":
+        return cls(data['records'], data['order'])
+
+
+def parse_quantity(kind: str, text: str) -> float:
+    """Command-line bound in a kind's units: '1M', '$425K', '17%', '90 days', '6 months', '30'."""
+    text = text.strip()
+    if kind == "duration":
+        match = DURATION_RE.fullmatch(text)
+        if match and match['low'] is None:
+            return _number(match['num']) * DURATION_DAYS[match['unit'].lower()]
+        if re.fullmatch(_NUMBER, text):
+            return _number(text)
+    elif kind == "percent":
+        match = re.fullmatch(rf"({_NUMBER})\s*%?", text)
+        if match:
+            return _number(match[1])
+    elif kind == "money":
+        match = re.fullmatch(rf"\$?\s?({_NUMBER})\s*({_MULT})?", text, re.IGNORECASE)
+        if match:
+            return _number(match[1]) * MONEY_MULTIPLIERS.get((match[2] or "").lower(), 1)
+    raise ValueError(f"Not a {kind} value: {text!r}")
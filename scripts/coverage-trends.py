@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Export Coverage Trends
+
+Reads the coverage history store (see coverage_history.py, filled by
+parse-json-plans.py --history) and writes time series for the analytics
+and pulse pages: average coverage per run, coverage % per plan and per
+policy area.
+
+Usage:
+    python3 scripts/coverage-trends.py [--since EPOCH] [--until EPOCH]
+    python3 scripts/coverage-trends.py --plan medical-plan10 [--area "Clawback/Recovery"]
+
+Output:
+    scripts/output/coverage-trends.json
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+
+from coverage_history import BASE, CODE_LEVELS, CoverageHistory
+from policy_taxonomy import POLICY_AREAS
+
+OUTPUT_DIR = Path(os.environ.get("SGM_OUTPUT_DIR", Path(__file__).parent / "output"))
+HISTORY_FILE = OUTPUT_DIR / "coverage-history.sgmhist"
+OUTPUT_FILE = OUTPUT_DIR / "coverage-trends.json"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Export coverage time series from the history store")
+    parser.add_argument("--history", type=Path, default=HISTORY_FILE, help=f"History store (default: {HISTORY_FILE})")
+    parser.add_argument("--since", type=int, help="First run timestamp (Unix epoch seconds)")
+    parser.add_argument("--until", type=int, help="Last run timestamp (Unix epoch seconds)")
+    parser.add_argument("--plan", help="Only print the series for this plan ID")
+    parser.add_argument("--area", help="With --plan: coverage level series for one area")
+    parser.add_argument("--output", type=Path, default=OUTPUT_FILE, help=f"Trends JSON path (default: {OUTPUT_FILE})")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    history = CoverageHistory(args.history)
+    index = history.records()
+    if not index:
+        print(f"❌ No history found at {args.history} (run parse-json-plans.py --history)")
+        return 1
+
+    bases = sum(1 for record in index if record['kind'] == BASE)
+    print(f"📈 History: {len(index)} runs ({bases} base, {len(index) - bases} delta), "
+          f"{args.history.stat().st_size:,} bytes\n")
+
+    if args.plan:
+        if args.area:
+            series = history.plan_area_series(args.plan, args.area, args.since, args.until)
+            for point in series:
+                print(f"   run {point['run']:5} | {point['timestamp']:12} | {point['coverage'] or '-'}")
+        else:
+            series = history.plan_series(args.plan, args.since, args.until)
+            for point in series:
+                print(f"   run {point['run']:5} | {point['timestamp']:12} | {point['percentage']:5.1f}%")
+        if not series:
+            print(f"❌ Plan not found in history: {args.plan}")
+            return 1
+        return 0
+
+    # One replay pass builds every series
+    runs, plans, areas = [], {}, {area: [] for area in POLICY_AREAS}
+    for record, state in history.iter_states(args.since, args.until, index=index):
+        point = {'run': record['run'], 'timestamp': record['timestamp']}
+        runs.append({**point, 'averageCoverage': state['averageCoverage'], 'plans': len(state['plans'])})
+        for pid, plan in state['plans'].items():
+            entry = plans.setdefault(pid, {'name': plan['n'], 'series': []})
+            entry['name'] = plan['n']
+            entry['series'].append({**point, 'percentage': plan['p']})
+        total = len(state['plans'])
+        for area, series in areas.items():
+            levels = [CODE_LEVELS.get(plan['c'].get(area), "NO") for plan in state['plans'].values()]
+            full, limited = levels.count("FULL"), levels.count("LIMITED")
+            series.append({**point, 'FULL': full, 'LIMITED': limited, 'NO': total - full - limited,
+                           'percentage': round((full + 0.5 * limited) / total * 100, 1) if total else 0})
+
+    output_data = {'runs': runs, 'plans': plans, 'areas': areas}
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(output_data, f, indent=2, ensure_ascii=False)
+
+    print("📊 Average Coverage by Run:")
+    print("═" * 90)
+    for run in runs[-10:]:
+        print(f"   run {run['run']:5} | {run['timestamp']:12} | Plans: {run['plans']:4} | {run['averageCoverage']:5.1f}%")
+    print("═" * 90)
+    print(f"\n✅ Trends written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
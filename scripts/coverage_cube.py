@@ -0,0 +1,154 @@
+"""
+Coverage Aggregate Cube
+
+Materialized coverage counts by policy area x business unit x plan type x
+division, including every roll-up ("*" = all values of a dimension), so
+slice-and-dice questions read one precomputed cell instead of iterating
+plans:
+
+    cube = CoverageCube.build(output_data)
+    cube.query(area="Clawback/Recovery", division="Medical")
+    cube.slice("businessUnit", area="Quota Management")
+
+Cells count plans at each coverage level in the 16 standard areas (areas a
+plan does not mention count as NO, as in the coverage matrix). With
+area="*" a cell counts (plan, area) pairs. Plans without a businessUnit or
+planType fall under "Unknown", as in the Plan Details tab.
+
+The cube remembers each plan's dimension values and levels, so update()
+only subtracts and re-adds the plans that changed since the last build.
+"""
+
+from itertools import product
+from typing import Dict, List, Any, Optional
+
+from coverage_history import CODE_LEVELS, LEVEL_CODES
+from plan_shards import assign_plan_ids
+from policy_taxonomy import COVERAGE_LEVELS, POLICY_AREAS, plan_coverage_masks
+
+DIMENSIONS = ("area", "businessUnit", "planType", "division")
+ALL = "*"
+UNKNOWN = "Unknown"
+
+# Count slots per cell, in COVERAGE_LEVELS order (NO, LIMITED, FULL)
+LEVEL_SLOTS = {level: slot for slot, level in enumerate(COVERAGE_LEVELS)}
+
+
+def plan_signature(plan: Dict[str, Any]) -> List[Any]:
+    """A plan's non-area dimension values and its level per standard area."""
+    masks = plan_coverage_masks(plan.get('policyCoverage', {}))
+    levels = "".join(
+        LEVEL_CODES["FULL" if masks["FULL"] >> area_id & 1 else "LIMITED" if masks["LIMITED"] >> area_id & 1 else "NO"]
+        for area_id in range(len(POLICY_AREAS))
+    )
+    return [plan.get('businessUnit') or UNKNOWN, plan.get('planType') or UNKNOWN, plan.get('division') or UNKNOWN, levels]
+
+
+def cell_stats(counts: Optional[List[int]]) -> Dict[str, Any]:
+    no, limited, full = counts or (0, 0, 0)
+    total = no + limited + full
+    return {
+        'FULL': full,
+        'LIMITED': limited,
+        'NO': no,
+        'total': total,
+        'percentage': round((full + 0.5 * limited) / total * 100, 1) if total else 0,
+    }
+
+
+class CoverageCube:
+    """Coverage counts for every combination of dimension values and roll-ups."""
+
+    def __init__(self):
+        self.cells: Dict[tuple, List[int]] = {}
+        self.members: Dict[str, List[Any]] = {}
+
+    @classmethod
+    def build(cls, output_data: Dict[str, Any]) -> "CoverageCube":
+        cube = cls()
+        cube.update(output_data)
+        return cube
+
+    def _apply(self, signature: List[Any], sign: int):
+        business_unit, plan_type, division, levels = signature
+        for area, code in zip(POLICY_AREAS, levels):
+            slot = LEVEL_SLOTS[CODE_LEVELS[code]]
+            for key in product((area, ALL), (business_unit, ALL), (plan_type, ALL), (division, ALL)):
+                counts = self.cells.get(key)
+                if counts is None:
+                    counts = self.cells[key] = [0, 0, 0]
+                counts[slot] += sign
+                if not any(counts):
+                    del self.cells[key]
+
+    def add_plan(self, pid: str, plan: Dict[str, Any]):
+        self.remove_plan(pid)
+        signature = plan_signature(plan)
+        self._apply(signature, 1)
+        self.members[pid] = signature
+
+    def remove_plan(self, pid: str):
+        signature = self.members.pop(pid, None)
+        if signature is not None:
+            self._apply(signature, -1)
+
+    def update(self, output_data: Dict[str, Any]) -> Dict[str, int]:
+        """
+        Bring the cube in line with an analysis, touching only changed plans.
+
+        Returns:
+            Counts of plans added, removed and changed
+        """
+        current = dict(zip(assign_plan_ids(output_data['plans']), output_data['plans']))
+        stats = {'added': 0, 'removed': 0, 'changed': 0}
+        for pid in [pid for pid in self.members if pid not in current]:
+            self.remove_plan(pid)
+            stats['removed'] += 1
+        for pid, plan in current.items():
+            previous = self.members.get(pid)
+            if previous is None:
+                stats['added'] += 1
+            elif previous == plan_signature(plan):
+                continue
+            else:
+                stats['changed'] += 1
+            self.add_plan(pid, plan)
+        return stats
+
+    def query(self, area: str = ALL, businessUnit: str = ALL, planType: str = ALL, division: str = ALL) -> Dict[str, Any]:
+        """Coverage counts and percentage for one cell."""
+        return cell_stats(self.cells.get((area, businessUnit, planType, division)))
+
+    def values(self, dimension: str) -> List[str]:
+        """Distinct values of one dimension (excluding the roll-up)."""
+        axis = DIMENSIONS.index(dimension)
+        return sorted({key[axis] for key in self.cells if key[axis] != ALL})
+
+    def slice(self, dimension: str, **fixed: str) -> Dict[str, Dict[str, Any]]:
+        """Cells for every value of one dimension, other dimensions fixed (default: rolled up)."""
+        axis = DIMENSIONS.index(dimension)
+        base = [fixed.get(name, ALL) for name in DIMENSIONS]
+        result = {}
+        for value in self.values(dimension):
+            key = list(base)
+            key[axis] = value
+            counts = self.cells.get(tuple(key))
+            if counts:
+                result[value] = cell_stats(counts)
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'dimensions': list(DIMENSIONS),
+            'levels': list(COVERAGE_LEVELS),
+            'cells': [[*key, *counts] for key, counts in sorted(self.cells.items())],
+            'members': self.members,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CoverageCube":
+        cube = cls()
+        width = len(DIMENSIONS)
+        cube.cells = {tuple(row[:width]): list(row[width:]) for row in data.get('cells', [])}
+        cube.members = {pid: list(signature) for pid, signature in data.get('members', {}).items()}
+        return cube
@@ -0,0 +1,133 @@
+"""
+Coverage Diff Engine
+
+Compares two coverage analyses (json-plan-analysis.json or a binary
+.sgmcov snapshot) keyed by plan ID and policy area:
+- coverage transitions per (plan, area), e.g. NO -> LIMITED, FULL -> NO
+  (an area a plan does not mention is reported as ABSENT)
+- plans added or removed
+- changed clause details / original policy names
+
+Each plan is hashed once; only plans whose hash differs are compared area
+by area, so a diff is linear in the number of plans. The result lists just
+the changed plans and areas, for incremental workbook and app updates.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Any
+
+from coverage_snapshot import MAGIC, CoverageSnapshot
+from plan_shards import assign_plan_ids
+
+ABSENT = "ABSENT"
+DETAIL_FIELDS = ("details", "originalPolicy")
+
+
+def load_analysis(path: Path) -> Dict[str, Any]:
+    """Load an analysis from JSON or a binary snapshot (detected by magic bytes)."""
+    with open(path, 'rb') as f:
+        is_snapshot = f.read(len(MAGIC)) == MAGIC
+    if is_snapshot:
+        with CoverageSnapshot.open(path) as snapshot:
+            return snapshot.to_analysis()
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def plan_hash(plan: Dict[str, Any]) -> str:
+    """Content hash of a plan record, independent of key order."""
+    canonical = json.dumps(plan, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def index_plans(output_data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Plans keyed by plan ID (as in plan_shards.assign_plan_ids), each with a content hash of its record."""
+    return {pid: {'plan': plan, 'hash': plan_hash(plan)}
+            for plan, pid in zip(output_data['plans'], assign_plan_ids(output_data['plans']))}
+
+
+def diff_plan(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Area-level differences between two versions of one plan."""
+    old_coverage = old['policyCoverage']
+    new_coverage = new['policyCoverage']
+    transitions, detail_changes = [], []
+    for area in list(old_coverage) + [a for a in new_coverage if a not in old_coverage]:
+        before = old_coverage.get(area, {})
+        after = new_coverage.get(area, {})
+        level_before = before.get('coverage', ABSENT)
+        level_after = after.get('coverage', ABSENT)
+        if level_before != level_after:
+            transitions.append({'area': area, 'from': level_before, 'to': level_after})
+        elif before and after:
+            fields = [field for field in DETAIL_FIELDS if before.get(field) != after.get(field)]
+            if fields:
+                detail_changes.append({'area': area, 'fields': fields})
+
+    result = {'transitions': transitions, 'detailChanges': detail_changes}
+    if old['coverageStats'] != new['coverageStats']:
+        result['coverageStats'] = {'from': old['coverageStats'], 'to': new['coverageStats']}
+    renamed = {key: {'from': old.get(key), 'to': new.get(key)}
+               for key in ('planName', 'businessUnit', 'planType', 'division') if old.get(key) != new.get(key)}
+    if renamed:
+        result['labels'] = renamed
+    return result
+
+
+def diff_analyses(old_data: Dict[str, Any], new_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Diff two analyses.
+
+    Returns:
+        Dict with 'summary' (counts, transition tallies, affected plans -
+        added, removed and changed - and areas), 'addedPlans', 'removedPlans'
+        and 'changedPlans'
+    """
+    old_plans = index_plans(old_data)
+    new_plans = index_plans(new_data)
+
+    added = [{'id': pid, 'name': entry['plan']['planName']} for pid, entry in new_plans.items() if pid not in old_plans]
+    removed = [{'id': pid, 'name': entry['plan']['planName']} for pid, entry in old_plans.items() if pid not in new_plans]
+
+    changed = []
+    transition_counts: Dict[str, int] = {}
+    affected_areas = set()
+    for pid, new_entry in new_plans.items():
+        old_entry = old_plans.get(pid)
+        if old_entry is None or old_entry['hash'] == new_entry['hash']:
+            continue
+        plan_diff = diff_plan(old_entry['plan'], new_entry['plan'])
+        for transition in plan_diff['transitions']:
+            key = f"{transition['from']}->{transition['to']}"
+            transition_counts[key] = transition_counts.get(key, 0) + 1
+            affected_areas.add(transition['area'])
+        affected_areas.update(change['area'] for change in plan_diff['detailChanges'])
+        changed.append({'id': pid, 'name': new_entry['plan']['planName'], 'hash': new_entry['hash'], **plan_diff})
+
+    for entry in added:
+        affected_areas.update(new_plans[entry['id']]['plan']['policyCoverage'])
+    for entry in removed:
+        affected_areas.update(old_plans[entry['id']]['plan']['policyCoverage'])
+
+    return {
+        'summary': {
+            'oldPlans': len(old_plans),
+            'newPlans': len(new_plans),
+            'added': len(added),
+            'removed': len(removed),
+            'changed': len(changed),
+            'unchanged': len(new_plans) - len(added) - len(changed),
+            'transitions': dict(sorted(transition_counts.items())),
+            'detailChanges': sum(len(plan['detailChanges']) for plan in changed),
+            'averageCoverage': {
+                'from': old_data.get('globalStats', {}).get('averageCoverage'),
+                'to': new_data.get('globalStats', {}).get('averageCoverage'),
+            },
+            'affectedPlans': sorted([entry['id'] for entry in added + removed] + [plan['id'] for plan in changed]),
+            'affectedAreas': sorted(affected_areas),
+        },
+        'addedPlans': added,
+        'removedPlans': removed,
+        'changedPlans': changed,
+    }
@@ -0,0 +1,214 @@
+"""
+Coverage History Store
+
+Append-only history of coverage analyses for trend charts. Every run is
+one framed record in a single file:
+
+    kind u8 | run u32 | timestamp i64 | payload length u32 | crc32 u32 | zlib(JSON payload)
+
+- BASE records hold the full compact coverage state (per plan: name,
+  coverage %, coverage level per area).
+- DELTA records hold only plans that were added, changed or removed since
+  the previous run, so a nightly run with few edits costs a few hundred bytes.
+- A new BASE is written every REBASE_INTERVAL runs (or when a delta would be
+  larger than half a base), which bounds how many deltas a query replays.
+
+Queries seek to the nearest BASE at or before the requested start and
+replay small deltas from there; they never load analysis JSON files:
+
+    history = CoverageHistory("scripts/output/coverage-history.sgmhist")
+    history.append(output_data)
+    history.plan_series("medical-plan10")
+    history.area_series("Clawback/Recovery")
+
+A torn final record (e.g. from a crash mid-append) is ignored on read and
+truncated on the next append.
+"""
+
+import json
+import struct
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Iterator, List, Any, Optional
+
+from plan_shards import assign_plan_ids
+
+RECORD = struct.Struct("<BIqII")  # kind, run, timestamp, payload length, crc32
+BASE = 1
+DELTA = 2
+REBASE_INTERVAL = 30
+
+LEVEL_CODES = {"FULL": "F", "LIMITED": "L", "NO": "N"}
+CODE_LEVELS = {code: level for level, code in LEVEL_CODES.items()}
+
+
+def compact_state(output_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Coverage state kept in history: per plan name, coverage % and area levels."""
+    return {
+        'averageCoverage': output_data.get('globalStats', {}).get('averageCoverage', 0),
+        'plans': {
+            pid: {
+                'n': plan['planName'],
+                'p': plan['coverageStats']['percentage'],
+                'c': {area: LEVEL_CODES[entry['coverage']] for area, entry in plan['policyCoverage'].items()},
+            }
+            for plan, pid in zip(output_data['plans'], assign_plan_ids(output_data['plans']))
+        },
+    }
+
+
+def state_delta(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """Plans set or removed between two states."""
+    return {
+        'averageCoverage': current['averageCoverage'],
+        'set': {pid: plan for pid, plan in current['plans'].items() if previous['plans'].get(pid) != plan},
+        'del': [pid for pid in previous['plans'] if pid not in current['plans']],
+    }
+
+
+def apply_delta(state: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    plans = dict(state['plans'])
+    for pid in delta['del']:
+        plans.pop(pid, None)
+    plans.update(delta['set'])
+    return {'averageCoverage': delta['averageCoverage'], 'plans': plans}
+
+
+def _encode(payload: Dict[str, Any]) -> bytes:
+    return zlib.compress(json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode('utf-8'), 9)
+
+
+class CoverageHistory:
+    """Append-only coverage history file."""
+
+    def __init__(self, path: Path, rebase_interval: int = REBASE_INTERVAL):
+        self.path = Path(path)
+        self.rebase_interval = rebase_interval
+
+    def records(self) -> List[Dict[str, Any]]:
+        """Index of valid records: kind, run, timestamp, payload offset and length."""
+        if not self.path.exists():
+            return []
+        index = []
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        offset = 0
+        while offset + RECORD.size <= len(data):
+            kind, run, timestamp, length, crc = RECORD.unpack_from(data, offset)
+            start = offset + RECORD.size
+            payload = data[start:start + length]
+            if kind not in (BASE, DELTA) or len(payload) != length or zlib.crc32(payload) != crc:
+                break
+            index.append({'kind': kind, 'run': run, 'timestamp': timestamp, 'offset': start,
+                          'length': length, 'end': start + length})
+            offset = start + length
+        return index
+
+    def _payload(self, f, record: Dict[str, Any]) -> Dict[str, Any]:
+        f.seek(record['offset'])
+        return json.loads(zlib.decompress(f.read(record['length'])).decode('utf-8'))
+
+    def iter_states(
+        self,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+        index: Optional[List[Dict[str, Any]]] = None,
+    ) -> Iterator[tuple[Dict[str, Any], Dict[str, Any]]]:
+        """
+        Yield (record, state) for runs with since <= timestamp <= until,
+        replaying from the nearest BASE at or before `since`.
+        """
+        index = self.records() if index is None else index
+        if not index:
+            return
+        start = 0
+        if since is not None:
+            for position, record in enumerate(index):
+                if record['kind'] == BASE and record['timestamp'] <= since:
+                    start = position
+        state = None
+        with open(self.path, 'rb') as f:
+            for record in index[start:]:
+                if until is not None and record['timestamp'] > until:
+                    break
+                payload = self._payload(f, record)
+                state = payload if record['kind'] == BASE else apply_delta(state, payload)
+                if since is None or record['timestamp'] >= since:
+                    yield record, state
+
+    def latest_state(self, index: Optional[List[Dict[str, Any]]] = None) -> Optional[Dict[str, Any]]:
+        index = self.records() if index is None else index
+        state = None
+        for record, state in self.iter_states(since=index[-1]['timestamp'] if index else None, index=index):
+            pass
+        return state
+
+    def append(self, output_data: Dict[str, Any], timestamp: Optional[int] = None) -> Dict[str, Any]:
+        """Record one analysis run. Returns the record kind, run number and size."""
+        index = self.records()
+        timestamp = int(time.time()) if timestamp is None else int(timestamp)
+        current = compact_state(output_data)
+
+        kind, payload = BASE, _encode(current)
+        if index:
+            runs_since_base = len(index) - max(i for i, record in enumerate(index) if record['kind'] == BASE)
+            if runs_since_base < self.rebase_interval:
+                delta = _encode(state_delta(self.latest_state(index), current))
+                if len(delta) * 2 <= len(payload):
+                    kind, payload = DELTA, delta
+
+        run = index[-1]['run'] + 1 if index else 1
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'ab') as f:
+            # Drop a torn record left by an interrupted append
+            f.truncate(index[-1]['end'] if index else 0)
+            f.write(RECORD.pack(kind, run, timestamp, len(payload), zlib.crc32(payload)))
+            f.write(payload)
+        return {'kind': "BASE" if kind == BASE else "DELTA", 'run': run, 'timestamp': timestamp,
+                'bytes': RECORD.size + len(payload)}
+
+    def global_series(self, since: Optional[int] = None, until: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Average coverage % and plan count per run."""
+        return [
+            {'run': record['run'], 'timestamp': record['timestamp'],
+             'averageCoverage': state['averageCoverage'], 'plans': len(state['plans'])}
+            for record, state in self.iter_states(since, until)
+        ]
+
+    def plan_series(self, pid: str, since: Optional[int] = None, until: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Coverage % of one plan per run (runs where the plan is absent are skipped)."""
+        return [
+            {'run': record['run'], 'timestamp': record['timestamp'], 'percentage': state['plans'][pid]['p']}
+            for record, state in self.iter_states(since, until)
+            if pid in state['plans']
+        ]
+
+    def plan_area_series(self, pid: str, area: str, since: Optional[int] = None,
+                         until: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Coverage level of one plan in one area per run (None when not mentioned)."""
+        return [
+            {'run': record['run'], 'timestamp': record['timestamp'],
+             'coverage': CODE_LEVELS.get(state['plans'][pid]['c'].get(area))}
+            for record, state in self.iter_states(since, until)
+            if pid in state['plans']
+        ]
+
+    def area_series(self, area: str, since: Optional[int] = None, until: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Plans at each coverage level in one area per run, plus the area's
+        coverage % (FULL = 1, LIMITED = 0.5; unmentioned counts as NO).
+        """
+        series = []
+        for record, state in self.iter_states(since, until):
+            counts = {"FULL": 0, "LIMITED": 0, "NO": 0}
+            for plan in state['plans'].values():
+                counts[CODE_LEVELS.get(plan['c'].get(area), "NO")] += 1
+            total = len(state['plans'])
+            series.append({
+                'run': record['run'],
+                'timestamp': record['timestamp'],
+                **counts,
+                'percentage': round((counts["FULL"] + 0.5 * counts["LIMITED"]) / total * 100, 1) if total else 0,
+            })
+        return series
@@ -0,0 +1,70 @@
+"""
+Coverage Model
+
+The analysis document every coverage source produces (json-plan-analysis.json
+layout), so plans parsed from clause extracts and plans ingested from a
+workbook share stats and structure:
+
+    plan['coverageStats'] = plan_coverage_stats(plan['policyCoverage'])
+    output_data = build_analysis(plans, source, total_files, divisions)
+"""
+
+from typing import Dict, List, Any
+
+from policy_taxonomy import POLICY_AREAS
+
+
+def plan_coverage_stats(policy_coverage: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Level counts and coverage percentage (LIMITED counts half) over the areas a plan mentions."""
+    full = sum(1 for p in policy_coverage.values() if p['coverage'] == 'FULL')
+    limited = sum(1 for p in policy_coverage.values() if p['coverage'] == 'LIMITED')
+    total = len(policy_coverage)
+    percentage = round((full + 0.5 * limited) / total * 100, 1) if total > 0 else 0
+    return {
+        'full': full,
+        'limited': limited,
+        'no': total - full - limited,
+        'total': total,
+        'percentage': percentage,
+    }
+
+
+def calculate_division_stats(plans: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Per-division plan counts, coverage level totals and average coverage."""
+    division_stats: Dict[str, Dict[str, Any]] = {}
+    for plan in plans:
+        stats = division_stats.setdefault(plan['division'], {
+            'totalPlans': 0, 'full': 0, 'limited': 0, 'no': 0, 'averageCoverage': 0,
+        })
+        stats['totalPlans'] += 1
+        stats['full'] += plan['coverageStats']['full']
+        stats['limited'] += plan['coverageStats']['limited']
+        stats['no'] += plan['coverageStats']['no']
+        stats['averageCoverage'] += plan['coverageStats']['percentage']
+    for stats in division_stats.values():
+        stats['averageCoverage'] = round(stats['averageCoverage'] / stats['totalPlans'], 1)
+    return division_stats
+
+
+def build_analysis(plans: List[Dict[str, Any]], source: str, total_files: int, divisions: List[str]) -> Dict[str, Any]:
+    """Add coverageStats to each plan and assemble the analysis document."""
+    for plan in plans:
+        plan['coverageStats'] = plan_coverage_stats(plan['policyCoverage'])
+
+    global_stats = {
+        'totalPlans': len(plans),
+        'totalPolicyAreasTracked': len(POLICY_AREAS),
+        'averageCoverage': round(sum(p['coverageStats']['percentage'] for p in plans) / len(plans), 1) if plans else 0,
+        'totalDivisions': len(divisions),
+    }
+    return {
+        'metadata': {
+            'source': source,
+            'totalFiles': total_files,
+            'divisions': list(divisions),
+            'standardPolicyAreas': POLICY_AREAS,
+        },
+        'globalStats': global_stats,
+        'divisionStats': calculate_division_stats(plans),
+        'plans': plans,
+    }
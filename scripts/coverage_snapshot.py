@@ -0,0 +1,271 @@
+"""
+Binary Coverage Snapshot
+
+Compact, memory-mappable alternative to json-plan-analysis.json for
+readers that only need part of the coverage model. parse-json-plans.py
+--snapshot writes it; the JSON stays the export for the web app.
+
+    with CoverageSnapshot.open("scripts/output/json-plan-analysis.sgmcov") as snap:
+        snap.plan_row(snap.find_plan("Medical ISC Standard v3"))
+        snap.plan(0)
+
+Opening a snapshot reads only the fixed header; plan rows, labels and
+clause details are decoded on demand straight from the mapped file.
+
+Layout (little-endian; sections are located via header offsets):
+    header        magic "SGMCOV", format version, counts, section offsets
+    metadata      UTF-8 JSON: metadata, globalStats, divisionStats
+    areas         u32 string ID per area label (standard areas keep their IDs)
+    plans         fixed record per plan: label string IDs + coverageStats
+    codes         2-bit coverage code per (plan, area), row_stride bytes per plan
+    refs          u32 details / originalPolicy string IDs per (plan, area)
+    strings       u32 offsets[n + 1] followed by the UTF-8 blob (deduplicated)
+"""
+
+import json
+import mmap
+import struct
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from policy_taxonomy import POLICY_AREAS
+
+MAGIC = b"SGMCOV"
+FORMAT_VERSION = 1
+
+# magic, version, plans, areas, strings, row stride, then section offsets:
+# metadata, metadata length, areas, plans, codes, refs, strings
+HEADER = struct.Struct("<6sHIIII7Q")
+PLAN_RECORD = struct.Struct("<5I4Hd")  # name, sourceFile, businessUnit, planType, division; full, limited, no, total; percentage
+AREA_RECORD = struct.Struct("<I")
+REF_RECORD = struct.Struct("<II")  # details, originalPolicy
+
+# 2-bit coverage codes; 0 = area not mentioned by the plan
+COVERAGE_CODES = {"NO": 1, "LIMITED": 2, "FULL": 3}
+CODE_COVERAGE = {code: level for level, code in COVERAGE_CODES.items()}
+AREAS_PER_BYTE = 4
+
+NO_STRING = 0xFFFFFFFF
+
+
+class _StringTable:
+    """Deduplicating string table builder."""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.strings: List[bytes] = []
+
+    def add(self, value: Optional[str]) -> int:
+        if value is None:
+            return NO_STRING
+        if value not in self.ids:
+            self.ids[value] = len(self.strings)
+            self.strings.append(value.encode('utf-8'))
+        return self.ids[value]
+
+    def encode(self) -> bytes:
+        offsets, position = [], 0
+        for data in self.strings:
+            offsets.append(position)
+            position += len(data)
+        offsets.append(position)
+        return struct.pack(f"<{len(offsets)}I", *offsets) + b"".join(self.strings)
+
+
+def _align(data: bytearray, boundary: int = 8):
+    data.extend(b"\0" * (-len(data) % boundary))
+
+
+def encode_snapshot(output_data: Dict[str, Any]) -> bytes:
+    """Encode a json-plan-analysis.json structure as snapshot bytes."""
+    plans = output_data['plans']
+
+    # Standard areas first (IDs match the taxonomy), then any other labels seen
+    areas = list(POLICY_AREAS)
+    area_index = {area: area_id for area_id, area in enumerate(areas)}
+    for plan in plans:
+        for area in plan['policyCoverage']:
+            if area not in area_index:
+                area_index[area] = len(areas)
+                areas.append(area)
+    row_stride = (len(areas) + AREAS_PER_BYTE - 1) // AREAS_PER_BYTE
+
+    strings = _StringTable()
+    area_section = b"".join(AREA_RECORD.pack(strings.add(area)) for area in areas)
+
+    plan_section = bytearray()
+    codes = bytearray(row_stride * len(plans))
+    refs = [NO_STRING] * (2 * len(plans) * len(areas))
+    for plan_idx, plan in enumerate(plans):
+        stats = plan['coverageStats']
+        plan_section += PLAN_RECORD.pack(
+            strings.add(plan['planName']), strings.add(plan['sourceFile']),
+            strings.add(plan.get('businessUnit')), strings.add(plan.get('planType')),
+            strings.add(plan.get('division')),
+            stats['full'], stats['limited'], stats['no'], stats['total'], stats['percentage'],
+        )
+        for area, entry in plan['policyCoverage'].items():
+            area_id = area_index[area]
+            shift = (area_id % AREAS_PER_BYTE) * 2
+            codes[plan_idx * row_stride + area_id // AREAS_PER_BYTE] |= COVERAGE_CODES[entry['coverage']] << shift
+            ref = 2 * (plan_idx * len(areas) + area_id)
+            refs[ref] = strings.add(entry.get('details'))
+            refs[ref + 1] = strings.add(entry.get('originalPolicy'))
+
+    metadata = json.dumps({
+        'metadata': output_data.get('metadata', {}),
+        'globalStats': output_data.get('globalStats', {}),
+        'divisionStats': output_data.get('divisionStats', {}),
+    }, ensure_ascii=False).encode('utf-8')
+
+    sections = [metadata, area_section, bytes(plan_section), bytes(codes),
+                struct.pack(f"<{len(refs)}I", *refs), strings.encode()]
+    body = bytearray()
+    offsets = []
+    for section in sections:
+        _align(body)
+        offsets.append(HEADER.size + len(body))
+        body += section
+
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, len(plans), len(areas), len(strings.strings), row_stride,
+        offsets[0], len(metadata), *offsets[1:],
+    )
+    return header + bytes(body)
+
+
+def write_snapshot(path: Path, output_data: Dict[str, Any]) -> int:
+    """Write a snapshot atomically. Returns its size in bytes."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = encode_snapshot(output_data)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    tmp.replace(path)
+    return len(data)
+
+
+class CoverageSnapshot:
+    """Read-only view over a memory-mapped snapshot file."""
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+        if len(buffer) < HEADER.size:
+            raise ValueError("Not a coverage snapshot (truncated header)")
+        (magic, version, self.plan_count, self.area_count, self.string_count, self.row_stride,
+         self._metadata_offset, self._metadata_length, self._areas_offset, self._plans_offset,
+         self._codes_offset, self._refs_offset, self._strings_offset) = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a coverage snapshot (bad magic)")
+        if version > FORMAT_VERSION:
+            raise ValueError(f"Snapshot format v{version} is newer than this reader (v{FORMAT_VERSION})")
+        self.version = version
+        self._blob_offset = self._strings_offset + 4 * (self.string_count + 1)
+        # The string blob is the last section, so its end is the end of the file
+        if self._blob_offset > len(buffer) or \
+                self._blob_offset + struct.unpack_from("<I", buffer, self._blob_offset - 4)[0] > len(buffer):
+            raise ValueError("Coverage snapshot is truncated")
+        self._areas: Optional[List[str]] = None
+        self._plan_ids: Optional[Dict[str, int]] = None
+
+    @classmethod
+    def open(cls, path: Path) -> "CoverageSnapshot":
+        with open(path, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer)
+
+    def close(self):
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+    def __enter__(self) -> "CoverageSnapshot":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.plan_count
+
+    def string(self, string_id: int) -> Optional[str]:
+        """Decode one string table entry (None for the null ID)."""
+        if string_id == NO_STRING:
+            return None
+        start, end = struct.unpack_from("<II", self._buffer, self._strings_offset + 4 * string_id)
+        return bytes(self._buffer[self._blob_offset + start:self._blob_offset + end]).decode('utf-8')
+
+    @property
+    def areas(self) -> List[str]:
+        """Area labels in ID order."""
+        if self._areas is None:
+            self._areas = [
+                self.string(AREA_RECORD.unpack_from(self._buffer, self._areas_offset + AREA_RECORD.size * i)[0])
+                for i in range(self.area_count)
+            ]
+        return self._areas
+
+    def metadata(self) -> Dict[str, Any]:
+        """Run metadata, globalStats and divisionStats."""
+        start = self._metadata_offset
+        return json.loads(bytes(self._buffer[start:start + self._metadata_length]).decode('utf-8'))
+
+    def _plan_record(self, plan_idx: int) -> tuple:
+        if not 0 <= plan_idx < self.plan_count:
+            raise IndexError(f"Plan index out of range: {plan_idx}")
+        return PLAN_RECORD.unpack_from(self._buffer, self._plans_offset + PLAN_RECORD.size * plan_idx)
+
+    def plan_name(self, plan_idx: int) -> str:
+        return self.string(self._plan_record(plan_idx)[0])
+
+    def find_plan(self, plan_name: str) -> Optional[int]:
+        """Index of the first plan with the given name, or None."""
+        if self._plan_ids is None:
+            self._plan_ids = {}
+            for plan_idx in range(self.plan_count):
+                self._plan_ids.setdefault(self.plan_name(plan_idx), plan_idx)
+        return self._plan_ids.get(plan_name)
+
+    def plan_codes(self, plan_idx: int) -> List[int]:
+        """Raw 2-bit coverage codes for one plan, indexed by area ID."""
+        self._plan_record(plan_idx)
+        start = self._codes_offset + plan_idx * self.row_stride
+        row = self._buffer[start:start + self.row_stride]
+        return [row[area_id // AREAS_PER_BYTE] >> (area_id % AREAS_PER_BYTE) * 2 & 0b11
+                for area_id in range(self.area_count)]
+
+    def plan_row(self, plan_idx: int) -> Dict[str, str]:
+        """Coverage level per area mentioned by one plan."""
+        areas = self.areas
+        return {areas[area_id]: CODE_COVERAGE[code] for area_id, code in enumerate(self.plan_codes(plan_idx)) if code}
+
+    def plan(self, plan_idx: int) -> Dict[str, Any]:
+        """One plan in the json-plan-analysis.json plan structure."""
+        name, source, business_unit, plan_type, division, full, limited, no, total, pct = self._plan_record(plan_idx)
+        areas = self.areas
+        policy_coverage = {}
+        for area_id, code in enumerate(self.plan_codes(plan_idx)):
+            if not code:
+                continue
+            details_id, original_id = REF_RECORD.unpack_from(
+                self._buffer, self._refs_offset + REF_RECORD.size * (plan_idx * self.area_count + area_id)
+            )
+            policy_coverage[areas[area_id]] = {
+                'coverage': CODE_COVERAGE[code],
+                'details': self.string(details_id),
+                'originalPolicy': self.string(original_id),
+            }
+
+        plan = {'planName': self.string(name), 'sourceFile': self.string(source)}
+        for key, string_id in (('businessUnit', business_unit), ('planType', plan_type), ('division', division)):
+            if string_id != NO_STRING:
+                plan[key] = self.string(string_id)
+        plan['policyCoverage'] = policy_coverage
+        plan['coverageStats'] = {'full': full, 'limited': limited, 'no': no, 'total': total, 'percentage': pct}
+        return plan
+
+    def to_analysis(self) -> Dict[str, Any]:
+        """Decode the whole snapshot back into the json-plan-analysis.json structure."""
+        output_data = self.metadata()
+        output_data['plans'] = [self.plan(plan_idx) for plan_idx in range(self.plan_count)]
+        return output_data
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Diff Two Coverage Analysis Runs
+
+Compares two outputs of parse-json-plans.py (JSON or --snapshot files) and
+reports coverage transitions, added/removed plans and changed clause
+details (see coverage_diff.py).
+
+Usage:
+    python3 scripts/diff-coverage.py OLD NEW [--output PATH]
+
+Output:
+    scripts/output/coverage-diff.json
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+
+from coverage_diff import diff_analyses, load_analysis
+
+OUTPUT_DIR = Path(os.environ.get("SGM_OUTPUT_DIR", Path(__file__).parent / "output"))
+OUTPUT_FILE = OUTPUT_DIR / "coverage-diff.json"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Diff two coverage analysis runs")
+    parser.add_argument("old", type=Path, help="Previous json-plan-analysis.json or .sgmcov snapshot")
+    parser.add_argument("new", type=Path, help="Current json-plan-analysis.json or .sgmcov snapshot")
+    parser.add_argument("--output", type=Path, default=OUTPUT_FILE, help=f"Diff JSON path (default: {OUTPUT_FILE})")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    for path in (args.old, args.new):
+        if not path.exists():
+            print(f"❌ File not found: {path}")
+            return 1
+
+    print(f"🔍 Diffing {args.old} -> {args.new}\n")
+    diff = diff_analyses(load_analysis(args.old), load_analysis(args.new))
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(diff, f, indent=2, ensure_ascii=False)
+
+    summary = diff['summary']
+    print("📊 Diff Summary:")
+    print("═" * 90)
+    print(f"   Plans:            {summary['oldPlans']} -> {summary['newPlans']}")
+    print(f"   Added / Removed:  {summary['added']} / {summary['removed']}")
+    print(f"   Changed:          {summary['changed']} (unchanged: {summary['unchanged']})")
+    print(f"   Detail changes:   {summary['detailChanges']}")
+    print(f"   Avg Coverage:     {summary['averageCoverage']['from']}% -> {summary['averageCoverage']['to']}%")
+    print("═" * 90)
+    for transition, count in summary['transitions'].items():
+        print(f"   {transition:20} {count:4}")
+    print()
+
+    for plan in diff['addedPlans']:
+        print(f"   ➕ {plan['name']} ({plan['id']})")
+    for plan in diff['removedPlans']:
+        print(f"   ➖ {plan['name']} ({plan['id']})")
+    for plan in diff['changedPlans']:
+        print(f"   ✏️  {plan['name']} ({plan['id']})")
+        for transition in plan['transitions']:
+            print(f"        {transition['area'][:40]:42} {transition['from']} -> {transition['to']}")
+        for change in plan['detailChanges']:
+            print(f"        {change['area'][:40]:42} changed: {', '.join(change['fields'])}")
+
+    print(f"\n✅ Diff written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
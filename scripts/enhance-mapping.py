@@ -5,80 +5,50 @@ Enhance Demo Client Deliverables Mapping
 Reads existing CSV and enhances it with:
 - File existence validation
 - File sizes and last modified dates
-- Plan applicability mapping
+- Plan applicability mapping (queried from the SQLite store written by
+  parse-json-plans.py --sqlite when it is current, else from the JSON)
 - Policy coverage levels
 - Risk mitigation values
 
 Usage:
     python3 scripts/enhance-mapping.py
+    python3 scripts/enhance-mapping.py --monte-carlo [--trials 100000] [--seed 42]
+    python3 scripts/enhance-mapping.py --report | --profile
+    SOURCE_DATE_EPOCH=1767225600 python3 scripts/enhance-mapping.py   # reproducible (see reproducible.py)
 
 Output:
     Demo_Client_Deliverables_Mapping_CORRECTED.xlsx
+
+Requirements:
+    pip install openpyxl numpy
 """
 
+import argparse
 import csv
 import json
 import os
+import sqlite3
 from pathlib import Path
-from datetime import datetime
 from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Alignment
 from openpyxl.utils import get_column_letter
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+
+from analysis_store import gaps_for_area, open_store
+from instrumentation import Instrumentation, add_arguments as add_instrumentation_args
+from policy_taxonomy import DELIVERABLE_ALIASES
+from reproducible import build_time, save_workbook, source_date_epoch
+from risk_engine import DEFAULT_TRIALS, calculate_risk_vectorized, simulate_risk_monte_carlo
 
 # File paths
 ARCHIVE_ROOT = Path(os.environ.get("ARCHIVE_ROOT", "data/demo-client-archive"))
 DELIVERY_PKG = ARCHIVE_ROOT / "CLIENT_DELIVERY_PACKAGE"
-INPUT_CSV = Path("Demo_Client_Readout_Deliverables_Mapping.csv")
-OUTPUT_FILE = Path("Demo_Client_Deliverables_Mapping_CORRECTED.xlsx")
-JSON_PLAN_FILE = Path("scripts/output/json-plan-analysis.json")
-
-# Risk exposure by deliverable type/priority
-RISK_VALUES = {
-    "CRITICAL": {
-        "Policy": 500000,
-        "Framework": 300000,
-        "Assessment": 200000,
-        "Procedure": 100000,
-    },
-    "HIGH": {
-        "Policy": 250000,
-        "Framework": 150000,
-        "Assessment": 100000,
-        "Procedure": 50000,
-    },
-    "MEDIUM": {
-        "Policy": 100000,
-        "Framework": 50000,
-        "Assessment": 25000,
-        "Procedure": 10000,
-    },
-    "IMMEDIATE": {  # Same as CRITICAL
-        "Policy": 500000,
-        "Framework": 300000,
-        "Assessment": 200000,
-        "Procedure": 100000,
-    },
-}
-
-# Policy deliverable to policy area mapping
-DELIVERABLE_TO_POLICY_AREA = {
-    "CLAWBACK_AND_RECOVERY_POLICY": "Clawback/Recovery",
-    "QUOTA_MANAGEMENT_POLICY": "Quota Management",
-    "WINDFALL_LARGE_DEAL_POLICY": "Windfall/Large Deals",
-    "SPIF_GOVERNANCE_POLICY": "SPIF Governance",
-    "SECTION_409A_COMPLIANCE_POLICY": "Compliance (409A, State Wage)",
-    "STATE_WAGE_LAW_COMPLIANCE_POLICY": "Compliance (409A, State Wage)",
-    "SALES_CREDITING_POLICY": "Sales Crediting",
-    "TERMINATION_POLICY": "Termination/Final Pay",
-    "PAYMENT_TIMING_POLICY": "Payment Timing",
-    "MID_PERIOD_CHANGE_POLICY": "Mid-Period Changes",
-    "LEAVE_OF_ABSENCE_POLICY": "Leave of Absence",
-    "DRAWS_AND_GUARANTEES_POLICY": "Draws/Guarantees",
-    "DISPUTE_RESOLUTION": "Exceptions/Disputes",
-    "EXCEPTION_REQUEST": "Exceptions/Disputes",
-}
-
+ANALYSIS_DIR = Path(os.environ.get("SGM_OUTPUT_DIR", "scripts/output"))
+WORKBOOK_DIR = Path(os.environ.get("SGM_WORKBOOK_DIR", "."))
+INPUT_CSV = Path(os.environ.get("MAPPING_CSV", "Demo_Client_Readout_Deliverables_Mapping.csv"))
+OUTPUT_FILE = WORKBOOK_DIR / "Demo_Client_Deliverables_Mapping_CORRECTED.xlsx"
+JSON_PLAN_FILE = ANALYSIS_DIR / "json-plan-analysis.json"
+SQLITE_FILE = ANALYSIS_DIR / "json-plan-analysis.db"
 
 def check_file_exists(file_path: str) -> tuple[bool, str, str, int]:
     """
@@ -118,16 +88,20 @@ def format_file_size(size_bytes: int) -> str:
 
 def get_policy_area_from_deliverable(file_path: str) -> str:
     """Extract policy area from deliverable file path."""
-    for key, policy_area in DELIVERABLE_TO_POLICY_AREA.items():
+    for key, policy_area in DELIVERABLE_ALIASES.items():
         if key in file_path.upper():
             return policy_area
     return "Unknown"
 
 
-def find_applicable_plans(policy_area: str, plan_data: List[Dict]) -> tuple[List[str], str]:
+def find_applicable_plans(policy_area: str, plan_data: List[Dict],
+                          store: Optional[sqlite3.Connection] = None) -> tuple[List[str], str]:
     """
     Find plans that need this policy (have NO or LIMITED coverage).
 
+    With a store (see analysis_store.py) the plans are queried from SQLite
+    instead of scanning plan_data.
+
     Returns:
         (list of plan names, coverage summary)
     """
@@ -135,12 +109,15 @@ def find_applicable_plans(policy_area: str, plan_data: List[Dict]) -> tuple[List
         return [], "N/A"
 
     plans_needing = []
-    for plan in plan_data:
-        policy_coverage = plan.get('policyCoverage', {})
-        if policy_area in policy_coverage:
-            coverage = policy_coverage[policy_area]['coverage']
-            if coverage in ["NO", "LIMITED"]:
-                plans_needing.append(plan['planName'])
+    if store is not None:
+        plans_needing = [gap['planName'] for gap in gaps_for_area(store, policy_area, include_unmentioned=False)]
+    else:
+        for plan in plan_data:
+            policy_coverage = plan.get('policyCoverage', {})
+            if policy_area in policy_coverage:
+                coverage = policy_coverage[policy_area]['coverage']
+                if coverage in ["NO", "LIMITED"]:
+                    plans_needing.append(plan['planName'])
 
     if not plans_needing:
         summary = "All plans have full coverage"
@@ -152,32 +129,39 @@ def find_applicable_plans(policy_area: str, plan_data: List[Dict]) -> tuple[List
     return plans_needing, summary
 
 
-def calculate_risk_mitigated(priority: str, deliverable_type: str, plans_count: int) -> int:
-    """Calculate risk mitigated based on priority, type, and # plans affected."""
-    base_risk = RISK_VALUES.get(priority, RISK_VALUES["MEDIUM"]).get(deliverable_type, 10000)
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Enhance Demo Client deliverables mapping")
+    parser.add_argument("--monte-carlo", action="store_true",
+                        help="Simulate exposure ranges and add P50/P90 risk columns")
+    parser.add_argument("--trials", type=int, default=DEFAULT_TRIALS,
+                        help=f"Monte Carlo trials (default: {DEFAULT_TRIALS:,})")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Random seed for Monte Carlo mode (default: SOURCE_DATE_EPOCH if set, else random)")
+    add_instrumentation_args(parser)
+    return parser.parse_args()
 
-    # Scale by number of plans affected (if applicable)
-    if plans_count > 0:
-        # Each plan adds 10% to base risk
-        multiplier = 1 + (plans_count * 0.1)
-        return int(base_risk * multiplier)
-    else:
-        return base_risk
 
+def run(args: argparse.Namespace, instr: Instrumentation) -> int:
+    """The script body. Returns the exit code; main() reports the run either way."""
 
-def main():
     print("🚀 Enhancing Demo Client deliverables mapping...")
     print(f"📂 Input: {INPUT_CSV}")
     print(f"📂 Output: {OUTPUT_FILE}\n")
 
-    # Load plan data
-    if JSON_PLAN_FILE.exists():
-        with open(JSON_PLAN_FILE, 'r') as f:
-            plan_data_json = json.load(f)
-            plan_data = plan_data_json['plans']
-    else:
-        print("⚠️  Plan data not found, continuing without plan mapping")
+    # Load plan data: query the SQLite store unless the JSON is newer
+    with instr.stage("load"):
+        store = None
         plan_data = []
+        if SQLITE_FILE.exists() and (not JSON_PLAN_FILE.exists()
+                                     or SQLITE_FILE.stat().st_mtime >= JSON_PLAN_FILE.stat().st_mtime):
+            store = open_store(SQLITE_FILE, readonly=True)
+            print(f"🗄️  Querying plan coverage from {SQLITE_FILE}")
+        elif JSON_PLAN_FILE.exists():
+            with open(JSON_PLAN_FILE, 'r') as f:
+                plan_data_json = json.load(f)
+                plan_data = plan_data_json['plans']
+        else:
+            print("⚠️  Plan data not found, continuing without plan mapping")
 
     # Read existing CSV
     if not INPUT_CSV.exists():
@@ -185,7 +169,7 @@ def main():
         return 1
 
     print(f"📖 Reading existing mapping CSV...")
-    with open(INPUT_CSV, 'r', encoding='utf-8') as f:
+    with instr.stage("load"), open(INPUT_CSV, 'r', encoding='utf-8') as f:
         reader = csv.DictReader(f)
         rows = list(reader)
 
@@ -194,6 +178,9 @@ def main():
     # Enhance each row
     print("🔍 Validating and enhancing deliverables...")
     enhanced_rows = []
+    priorities = []
+    deliverable_types = []
+    plans_counts = []
 
     stats = {
         'exists': 0,
@@ -201,121 +188,155 @@ def main():
         'draft': 0,
     }
 
-    for i, row in enumerate(rows, 1):
-        if i % 10 == 0:
-            print(f"   Processing row {i}/{len(rows)}...")
-
-        file_path = row.get('Deliverable File Path', '')
-        priority = row.get('Priority', 'MEDIUM')
-        deliverable_type = row.get('Deliverable Type', 'Unknown')
-
-        # Check if file exists
-        exists, status, actual_path, file_size = check_file_exists(file_path)
-
-        # Update stats
-        if status == "YES":
-            stats['exists'] += 1
-        elif status == "DRAFT":
-            stats['draft'] += 1
-        else:
-            stats['missing'] += 1
-
-        # Get policy area
-        policy_area = get_policy_area_from_deliverable(file_path)
-
-        # Find applicable plans
-        applicable_plans, plans_summary = find_applicable_plans(policy_area, plan_data)
-
-        # Calculate risk mitigated
-        risk_mitigated = calculate_risk_mitigated(priority, deliverable_type, len(applicable_plans))
-
-        # Enhanced row
-        enhanced_row = {
-            **row,  # Keep all original columns
-            'Deliverable Exists?': status,
-            'File Size': format_file_size(file_size),
-            'Actual File Path': actual_path if exists else 'NOT FOUND',
-            'Policy Area': policy_area,
-            'Applies to Plans': plans_summary,
-            'Plan Names': ', '.join(applicable_plans[:5]) + ('...' if len(applicable_plans) > 5 else ''),
-            'Plans Count': len(applicable_plans),
-            'Risk Mitigated ($)': f"${risk_mitigated:,}",
-            'Validation Notes': f"Verified {datetime.now().strftime('%Y-%m-%d')}" if exists else "File not found in delivery package",
-        }
-
-        enhanced_rows.append(enhanced_row)
+    with instr.stage("classify"):
+        for i, row in enumerate(rows, 1):
+            if i % 10 == 0:
+                print(f"   Processing row {i}/{len(rows)}...")
+
+            file_path = row.get('Deliverable File Path', '')
+            priority = row.get('Priority', 'MEDIUM')
+            deliverable_type = row.get('Deliverable Type', 'Unknown')
+
+            # Check if file exists
+            exists, status, actual_path, file_size = check_file_exists(file_path)
+
+            # Update stats
+            if status == "YES":
+                stats['exists'] += 1
+            elif status == "DRAFT":
+                stats['draft'] += 1
+            else:
+                stats['missing'] += 1
+
+            # Get policy area
+            policy_area = get_policy_area_from_deliverable(file_path)
+
+            # Find applicable plans
+            applicable_plans, plans_summary = find_applicable_plans(policy_area, plan_data, store)
+
+            # Risk inputs (risk is calculated for all rows at once below)
+            priorities.append(priority)
+            deliverable_types.append(deliverable_type)
+            plans_counts.append(len(applicable_plans))
+
+            # Enhanced row
+            enhanced_row = {
+                **row,  # Keep all original columns
+                'Deliverable Exists?': status,
+                'File Size': format_file_size(file_size),
+                'Actual File Path': actual_path if exists else 'NOT FOUND',
+                'Policy Area': policy_area,
+                'Applies to Plans': plans_summary,
+                'Plan Names': ', '.join(applicable_plans[:5]) + ('...' if len(applicable_plans) > 5 else ''),
+                'Plans Count': len(applicable_plans),
+                'Risk Mitigated ($)': None,
+                'Validation Notes': f"Verified {build_time().strftime('%Y-%m-%d')}" if exists else "File not found in delivery package",
+            }
+
+            enhanced_rows.append(enhanced_row)
+
+    if store is not None:
+        store.close()
+
+    # Calculate risk mitigated for every row in one vectorized pass
+    with instr.stage("aggregate"):
+        risk_mitigated = calculate_risk_vectorized(priorities, deliverable_types, plans_counts)
+        for enhanced_row, risk in zip(enhanced_rows, risk_mitigated):
+            enhanced_row['Risk Mitigated ($)'] = f"${int(risk):,}"
+
+        # Optional Monte Carlo ranges
+        risk_ranges = None
+        if args.monte_carlo:
+            print(f"🎲 Running {args.trials:,} Monte Carlo trials...")
+            risk_ranges = simulate_risk_monte_carlo(priorities, deliverable_types, plans_counts,
+                                                    trials=args.trials,
+                                                    seed=args.seed if args.seed is not None else source_date_epoch())
+            for i, enhanced_row in enumerate(enhanced_rows):
+                enhanced_row['Risk P50 ($)'] = f"${int(risk_ranges['p50'][i]):,}"
+                enhanced_row['Risk P90 ($)'] = f"${int(risk_ranges['p90'][i]):,}"
 
     print(f"✅ Enhanced {len(enhanced_rows)} rows\n")
 
+    instr.gauge("deliverablesTotal", len(enhanced_rows))
+    instr.gauge("deliverablesExist", stats['exists'])
+    instr.gauge("deliverablesDraft", stats['draft'])
+    instr.gauge("deliverablesMissing", stats['missing'])
+    instr.gauge("riskMitigatedTotal", int(risk_mitigated.sum()))
+
     # Create Excel workbook
     print("📊 Creating Excel workbook...")
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Deliverables Mapping"
-
-    # Title
-    ws['A1'] = "Demo Client Deliverables Mapping - CORRECTED & ENHANCED"
-    ws['A1'].font = Font(bold=True, size=14)
-    ws.merge_cells('A1:Q1')
-
-    # Stats
-    ws['A2'] = f"Total: {len(enhanced_rows)} | Exists: {stats['exists']} | Missing: {stats['missing']} | Draft: {stats['draft']} | Generated: {datetime.now().strftime('%Y-%m-%d')}"
-    ws['A2'].font = Font(size=10, italic=True)
-    ws.merge_cells('A2:Q2')
-
-    # Headers
-    if enhanced_rows:
-        headers = list(enhanced_rows[0].keys())
-        for col_idx, header in enumerate(headers, start=1):
-            cell = ws[f'{get_column_letter(col_idx)}4']
-            cell.value = header
-            cell.font = Font(bold=True, color="FFFFFF")
-            cell.fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-            cell.alignment = Alignment(horizontal="center", wrap_text=True)
-
-        # Data rows
-        for row_idx, row_data in enumerate(enhanced_rows, start=5):
-            for col_idx, (key, value) in enumerate(row_data.items(), start=1):
-                cell = ws[f'{get_column_letter(col_idx)}{row_idx}']
-                cell.value = value
-                cell.alignment = Alignment(vertical="top", wrap_text=True)
-
-                # Color code by existence status
-                if key == 'Deliverable Exists?':
-                    if value == "YES":
-                        cell.fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-                    elif value == "DRAFT":
-                        cell.fill = PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid")
-                    else:
-                        cell.fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
-
-    # Column widths
-    col_widths = {
-        'A': 20,  # Category
-        'B': 35,  # Readout Item
-        'C': 25,  # PPT Reference
-        'D': 40,  # Finding/Gap
-        'E': 10,  # Priority
-        'F': 15,  # Deliverable Type
-        'G': 50,  # Deliverable File Path
-        'H': 20,  # Implementation Phase
-        'I': 15,  # Status
-        'J': 15,  # Deliverable Exists?
-        'K': 10,  # File Size
-        'L': 50,  # Actual File Path
-        'M': 20,  # Policy Area
-        'N': 20,  # Applies to Plans
-        'O': 40,  # Plan Names
-        'P': 10,  # Plans Count
-        'Q': 15,  # Risk Mitigated
-        'R': 30,  # Validation Notes
-    }
+    with instr.stage("render"):
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "Deliverables Mapping"
+
+        # Title
+        ws['A1'] = "Demo Client Deliverables Mapping - CORRECTED & ENHANCED"
+        ws['A1'].font = Font(bold=True, size=14)
+        ws.merge_cells('A1:Q1')
+
+        # Stats
+        ws['A2'] = f"Total: {len(enhanced_rows)} | Exists: {stats['exists']} | Missing: {stats['missing']} | Draft: {stats['draft']} | Generated: {build_time().strftime('%Y-%m-%d')}"
+        ws['A2'].font = Font(size=10, italic=True)
+        ws.merge_cells('A2:Q2')
+
+        # Headers
+        if enhanced_rows:
+            headers = list(enhanced_rows[0].keys())
+            for col_idx, header in enumerate(headers, start=1):
+                cell = ws[f'{get_column_letter(col_idx)}4']
+                cell.value = header
+                cell.font = Font(bold=True, color="FFFFFF")
+                cell.fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+                cell.alignment = Alignment(horizontal="center", wrap_text=True)
+
+            # Data rows
+            for row_idx, row_data in enumerate(enhanced_rows, start=5):
+                for col_idx, (key, value) in enumerate(row_data.items(), start=1):
+                    cell = ws[f'{get_column_letter(col_idx)}{row_idx}']
+                    cell.value = value
+                    cell.alignment = Alignment(vertical="top", wrap_text=True)
+
+                    # Color code by existence status
+                    if key == 'Deliverable Exists?':
+                        if value == "YES":
+                            cell.fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
+                        elif value == "DRAFT":
+                            cell.fill = PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid")
+                        else:
+                            cell.fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
+
+        # Column widths
+        col_widths = {
+            'A': 20,  # Category
+            'B': 35,  # Readout Item
+            'C': 25,  # PPT Reference
+            'D': 40,  # Finding/Gap
+            'E': 10,  # Priority
+            'F': 15,  # Deliverable Type
+            'G': 50,  # Deliverable File Path
+            'H': 20,  # Implementation Phase
+            'I': 15,  # Status
+            'J': 15,  # Deliverable Exists?
+            'K': 10,  # File Size
+            'L': 50,  # Actual File Path
+            'M': 20,  # Policy Area
+            'N': 20,  # Applies to Plans
+            'O': 40,  # Plan Names
+            'P': 10,  # Plans Count
+            'Q': 15,  # Risk Mitigated
+            'R': 30,  # Validation Notes
+            'S': 15,  # Risk P50 (Monte Carlo only)
+            'T': 15,  # Risk P90 (Monte Carlo only)
+        }
 
-    for col_letter, width in col_widths.items():
-        ws.column_dimensions[col_letter].width = width
+        for col_letter, width in col_widths.items():
+            ws.column_dimensions[col_letter].width = width
 
     # Save workbook
-    wb.save(OUTPUT_FILE)
+    with instr.stage("save"):
+        OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
+        save_workbook(wb, OUTPUT_FILE)
 
     print(f"✅ Workbook saved: {OUTPUT_FILE}\n")
 
@@ -326,6 +347,9 @@ def main():
     print(f"   ✅ Exists:             {stats['exists']}")
     print(f"   📝 Draft:              {stats['draft']}")
     print(f"   ❌ Missing:            {stats['missing']}")
+    print(f"   💰 Risk Mitigated:     ${int(risk_mitigated.sum()):,}")
+    if risk_ranges:
+        print(f"   🎲 Risk P50 / P90:     ${risk_ranges['totalP50']:,} / ${risk_ranges['totalP90']:,} ({risk_ranges['trials']:,} trials)")
     print("=" * 90)
     print()
 
@@ -345,5 +369,17 @@ def main():
     return 0
 
 
+def main():
+    args = parse_args()
+    instr = Instrumentation.from_args(args, "enhance-mapping")
+    status = 1
+    try:
+        status = run(args, instr)
+    finally:
+        # Failed and crashed runs are reported too (sgm_run_success 0, last failure time)
+        instr.finish(OUTPUT_FILE, success=status == 0)
+    return status
+
+
 if __name__ == '__main__':
     exit(main())
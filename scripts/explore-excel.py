@@ -1,14 +1,21 @@
 #!/usr/bin/env python3
-"""Quick script to explore Excel workbook structure"""
+"""Quick script to explore Excel workbook structure
+(see profile-workbook.py for a full per-sheet profile)
 
+Usage:
+    python3 scripts/explore-excel.py [--report | --profile]
+"""
+
+import argparse
 import openpyxl
 import os
 from pathlib import Path
 
+from instrumentation import Instrumentation, add_arguments as add_instrumentation_args
+
 ARCHIVE_ROOT = Path(os.environ.get("ARCHIVE_ROOT", "data/demo-client-archive"))
 EXCEL_FILE = ARCHIVE_ROOT / "Analysis/Comp Analysis/workbooks/master/BHG_01_HS_Comp_Plan_Analysis_FINAL.xlsx"
-
-wb = openpyxl.load_workbook(EXCEL_FILE, data_only=True)
+OUTPUT_DIR = Path(os.environ.get("SGM_OUTPUT_DIR", Path(__file__).parent / "output"))
 
 # Explore key sheets
 sheets_to_examine = [
@@ -17,15 +24,56 @@ sheets_to_examine = [
     "00_Overview"
 ]
 
-for sheet_name in sheets_to_examine:
-    if sheet_name in wb.sheetnames:
-        print(f"\n{'='*80}")
-        print(f"SHEET: {sheet_name}")
-        print(f"{'='*80}")
-        sheet = wb[sheet_name]
-
-        # Print first 20 rows, first 10 columns
-        for row_idx, row in enumerate(sheet.iter_rows(min_row=1, max_row=20, max_col=10, values_only=True), 1):
-            if any(row):  # Skip completely empty rows
-                row_str = " | ".join([str(cell)[:30] if cell else "" for cell in row])
-                print(f"Row {row_idx:2}: {row_str}")
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Print the first rows of the key workbook sheets")
+    add_instrumentation_args(parser)
+    return parser.parse_args()
+
+
+def run(args: argparse.Namespace, instr: Instrumentation) -> int:
+    """The script body. Returns the exit code; main() reports the run either way."""
+
+    if not EXCEL_FILE.exists():
+        print(f"⚠️  Workbook not found, nothing to explore: {EXCEL_FILE}")
+        return 0
+
+    # Read-only mode streams rows on demand instead of loading every sheet
+    with instr.stage("load"):
+        wb = openpyxl.load_workbook(EXCEL_FILE, read_only=True, data_only=True)
+    instr.count("sheetsInWorkbook", len(wb.sheetnames))
+
+    with instr.stage("render"):
+        for sheet_name in sheets_to_examine:
+            if sheet_name in wb.sheetnames:
+                print(f"\n{'='*80}")
+                print(f"SHEET: {sheet_name}")
+                print(f"{'='*80}")
+                sheet = wb[sheet_name]
+                instr.count("sheetsExamined")
+
+                # Print first 20 rows, first 10 columns
+                for row_idx, row in enumerate(sheet.iter_rows(min_row=1, max_row=20, max_col=10, values_only=True), 1):
+                    if any(row):  # Skip completely empty rows
+                        row_str = " | ".join([str(cell)[:30] if cell else "" for cell in row])
+                        print(f"Row {row_idx:2}: {row_str}")
+                        instr.count("rowsPrinted")
+    wb.close()
+
+    return 0
+
+
+def main():
+    args = parse_args()
+    instr = Instrumentation.from_args(args, "explore-excel")
+    status = 1
+    try:
+        status = run(args, instr)
+    finally:
+        # Failed and crashed runs are reported too (sgm_run_success 0, last failure time)
+        instr.finish(OUTPUT_DIR / "explore-excel.json", success=status == 0)
+    return status
+
+
+if __name__ == '__main__':
+    exit(main())
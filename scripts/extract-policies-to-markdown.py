@@ -6,7 +6,8 @@ Extracts text from all 16 policy DOCX files (6 drafts + 10 templates)
 and converts them to markdown format for use in the policy library.
 
 Usage:
-    python3 scripts/extract-policies-to-markdown.py
+    python3 scripts/extract-policies-to-markdown.py [--report | --profile]
+    POLICIES_PATH=/path/to/02_POLICIES POLICY_LIBRARY_DIR=/tmp/policies python3 scripts/extract-policies-to-markdown.py
 
 Output:
     lib/data/policies/ - Directory with 16 .md files
@@ -15,8 +16,8 @@ Requirements:
     pip install python-docx
 """
 
+import argparse
 import os
-import json
 from pathlib import Path
 from typing import Dict, List, Any
 
@@ -29,10 +30,15 @@ except ImportError:
     print("   Install with: pip3 install python-docx")
     exit(1)
 
+from instrumentation import Instrumentation, add_arguments as add_instrumentation_args
+from reproducible import dump_json
+
 # Paths
-POLICIES_PATH = Path("/Users/toddlebaron/Documents/SPM/clients/DemoClient/02_POLICIES")
+ARCHIVE_ROOT = Path(os.environ.get("ARCHIVE_ROOT", "data/demo-client-archive"))
+POLICIES_PATH = Path(os.environ.get("POLICIES_PATH", ARCHIVE_ROOT / "CLIENT_DELIVERY_PACKAGE/02_POLICIES"))
 DRAFT_PATH = POLICIES_PATH / "DRAFT_FOR_REVIEW"
-OUTPUT_PATH = Path(__file__).parent.parent / "lib" / "data" / "policies"
+REPO_ROOT = Path(__file__).resolve().parent.parent
+OUTPUT_PATH = Path(os.environ.get("POLICY_LIBRARY_DIR", REPO_ROOT / "lib" / "data" / "policies"))
 
 # Policy metadata
 POLICY_MAPPINGS = {
@@ -195,8 +201,18 @@ def extract_text_from_docx(file_path: Path) -> str:
         return ""
 
 
-def extract_all_policies():
-    """Extract all policy documents to markdown."""
+def library_file_path(code: str) -> str:
+    """Index path of a policy's markdown: repo-relative inside the repo, else absolute."""
+    path = (OUTPUT_PATH / f"{code}.md").resolve()
+    try:
+        return path.relative_to(REPO_ROOT).as_posix()
+    except ValueError:
+        return str(path)
+
+
+def extract_all_policies(instr: Instrumentation = None) -> int:
+    """Extract all policy documents to markdown. Returns the exit code."""
+    instr = instr or Instrumentation("extract-policies-to-markdown")
     print("🚀 Extracting Demo Client Policy Documents to Markdown")
     print("=" * 70)
 
@@ -233,7 +249,8 @@ def extract_all_policies():
 
             # Extract text
             print(f"   📄 Extracting: {metadata['name']}...")
-            content = extract_text_from_docx(file_path)
+            with instr.stage("parse", observe="docxExtractSeconds"):
+                content = extract_text_from_docx(file_path)
 
             if not content:
                 print(f"   ❌ Failed to extract: {filename}")
@@ -242,7 +259,7 @@ def extract_all_policies():
 
             # Create markdown file
             output_file = OUTPUT_PATH / f"{metadata['code']}.md"
-            with open(output_file, 'w', encoding='utf-8') as f:
+            with instr.stage("save"), open(output_file, 'w', encoding='utf-8') as f:
                 f.write(f"# {metadata['name']}\n\n")
                 f.write(f"**Policy Code:** {metadata['code']}  \n")
                 f.write(f"**Category:** {metadata['category']}  \n")
@@ -254,6 +271,7 @@ def extract_all_policies():
 
             print(f"   ✅ Saved: {output_file.name}")
             extracted_count += 1
+            instr.count("wordsExtracted", len(content.split()))
 
             # Add to index
             index_data["policies"].append({
@@ -263,7 +281,7 @@ def extract_all_policies():
                 "framework_area": metadata["framework_area"],
                 "status": metadata["status"],
                 "legal_review_required": metadata["legal_review_required"],
-                "file_path": f"lib/data/policies/{metadata['code']}.md",
+                "file_path": library_file_path(metadata['code']),
                 "word_count": len(content.split()),
             })
     else:
@@ -283,7 +301,8 @@ def extract_all_policies():
 
         # Extract text
         print(f"   📄 Extracting: {metadata['name']}...")
-        content = extract_text_from_docx(file_path)
+        with instr.stage("parse", observe="docxExtractSeconds"):
+            content = extract_text_from_docx(file_path)
 
         if not content:
             print(f"   ❌ Failed to extract: {filename}")
@@ -292,7 +311,7 @@ def extract_all_policies():
 
         # Create markdown file
         output_file = OUTPUT_PATH / f"{metadata['code']}.md"
-        with open(output_file, 'w', encoding='utf-8') as f:
+        with instr.stage("save"), open(output_file, 'w', encoding='utf-8') as f:
             f.write(f"# {metadata['name']}\n\n")
             f.write(f"**Policy Code:** {metadata['code']}  \n")
             f.write(f"**Category:** {metadata['category']}  \n")
@@ -304,6 +323,7 @@ def extract_all_policies():
 
         print(f"   ✅ Saved: {output_file.name}")
         extracted_count += 1
+        instr.count("wordsExtracted", len(content.split()))
 
         # Add to index
         index_data["policies"].append({
@@ -313,7 +333,7 @@ def extract_all_policies():
             "framework_area": metadata["framework_area"],
             "status": metadata["status"],
             "legal_review_required": metadata["legal_review_required"],
-            "file_path": f"lib/data/policies/{metadata['code']}.md",
+            "file_path": library_file_path(metadata['code']),
             "word_count": len(content.split()),
         })
 
@@ -322,10 +342,16 @@ def extract_all_policies():
     index_data["metadata"]["draft_policies"] = len([p for p in index_data["policies"] if p["status"] == "DRAFT"])
     index_data["metadata"]["template_policies"] = len([p for p in index_data["policies"] if p["status"] == "TEMPLATE"])
 
-    # Save index file
+    # Never replace an existing library index with an empty one (e.g. no archive checked out)
     index_file = OUTPUT_PATH / "index.json"
-    with open(index_file, 'w', encoding='utf-8') as f:
-        json.dump(index_data, f, indent=2, ensure_ascii=False)
+    if not extracted_count:
+        print(f"\n❌ No policies extracted (checked {DRAFT_PATH} and {POLICIES_PATH}); "
+              f"leaving {index_file} unchanged")
+        return 1
+
+    # Save index file
+    with instr.stage("save"), open(index_file, 'w', encoding='utf-8') as f:
+        dump_json(index_data, f, indent=2)
 
     print(f"\n{'=' * 70}")
     print(f"📊 Summary:")
@@ -334,8 +360,30 @@ def extract_all_policies():
     print(f"   ❌ Errors: {error_count} policies")
     print(f"\n💾 Output Directory: {OUTPUT_PATH}")
     print(f"📋 Index File: {index_file}")
+    instr.count("policiesExtracted", extracted_count)
+    instr.count("policiesSkipped", skipped_count)
+    instr.count("extractErrors", error_count)
     print(f"\n🎉 Policy extraction complete!")
+    return 0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Extract policy DOCX files to markdown")
+    add_instrumentation_args(parser)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    instr = Instrumentation.from_args(args, "extract-policies-to-markdown")
+    status = 1
+    try:
+        status = extract_all_policies(instr)
+    finally:
+        # Failed and crashed runs are reported too (sgm_run_success 0, last failure time)
+        instr.finish(OUTPUT_PATH / "index.json", success=status == 0)
+    return status
 
 
 if __name__ == '__main__':
-    extract_all_policies()
+    exit(main())
@@ -0,0 +1,206 @@
+"""
+File Change Watchers
+
+Watch directories for file changes with Linux inotify (via ctypes, no
+extra dependency) and fall back to polling file stats elsewhere:
+
+    watcher = create_watcher(root, patterns)
+    changed = watcher.wait_for_changes(debounce=0.5)
+
+wait_for_changes() blocks until something changes, then keeps collecting
+until the directory has been quiet for `debounce` seconds (bounded by
+`max_wait`), so a burst of writes becomes one batch of paths.
+
+Patterns use the pipeline's glob syntax ('**' for recursive folders).
+"""
+
+import ctypes
+import ctypes.util
+import fnmatch
+import glob
+import os
+import select
+import struct
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+# inotify event flags (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ATTRIB
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, name length
+
+
+def pattern_matches(pattern: str, path: str) -> bool:
+    """Glob-style match where '**/' may also match zero folders."""
+    return fnmatch.fnmatchcase(path, pattern) or ("**/" in pattern and fnmatch.fnmatchcase(path, pattern.replace("**/", "")))
+
+
+def watch_dirs(root: Path, patterns: Iterable[str]) -> Dict[str, bool]:
+    """Directories to watch for the given patterns: {dir: recursive}."""
+    dirs: Dict[str, bool] = {}
+    for pattern in patterns:
+        parts = Path(pattern).parts
+        fixed = []
+        for part in parts[:-1]:
+            if glob.has_magic(part):
+                break
+            fixed.append(part)
+        recursive = len(fixed) < len(parts) - 1
+        directory = os.path.normpath(os.path.join(root, *fixed)) if fixed else str(root)
+        dirs[directory] = dirs.get(directory, False) or recursive
+    return dirs
+
+
+class PollingWatcher:
+    """Portable watcher: compares (size, mtime) of matching files every interval."""
+
+    def __init__(self, root: Path, patterns: List[str], interval: float = 1.0):
+        self.root = Path(root)
+        self.patterns = patterns
+        self.interval = interval
+        self.snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, tuple]:
+        files = {}
+        for pattern in self.patterns:
+            for match in glob.glob(str(self.root / pattern), recursive=True):
+                try:
+                    stat = os.stat(match)
+                except FileNotFoundError:
+                    continue
+                if os.path.isfile(match):
+                    files[os.path.normpath(match)] = (stat.st_size, stat.st_mtime_ns)
+        return files
+
+    def poll(self, timeout: Optional[float]) -> Set[str]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            current = self._scan()
+            changed = {path for path in current.keys() | self.snapshot.keys()
+                       if current.get(path) != self.snapshot.get(path)}
+            self.snapshot = current
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            time.sleep(self.interval if deadline is None else max(0.0, min(self.interval, deadline - time.monotonic())))
+
+    def wait_for_changes(self, debounce: float = 0.5, max_wait: float = 10.0) -> Set[str]:
+        changed = self.poll(None)
+        started = time.monotonic()
+        while time.monotonic() - started < max_wait:
+            more = self.poll(max(debounce, self.interval))
+            if not more:
+                break
+            changed |= more
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Linux watcher on inotify; new sub-folders of recursive roots are watched as they appear."""
+
+    def __init__(self, root: Path, patterns: List[str]):
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name:
+            raise OSError("libc not found")
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self.libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.root = Path(root)
+        self.patterns = patterns
+        self.watches: Dict[int, tuple[str, bool]] = {}
+        for directory, recursive in watch_dirs(self.root, patterns).items():
+            self._add_tree(directory, recursive)
+        if not self.watches:
+            self.close()
+            raise OSError("No existing directories to watch")
+
+    def _add(self, directory: str, recursive: bool):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd >= 0:
+            self.watches[wd] = (directory, recursive)
+
+    def _add_tree(self, directory: str, recursive: bool):
+        if not os.path.isdir(directory):
+            return
+        self._add(directory, recursive)
+        if recursive:
+            for current, subdirs, _ in os.walk(directory):
+                for subdir in subdirs:
+                    self._add(os.path.join(current, subdir), True)
+
+    def _read_events(self, timeout: Optional[float]) -> Set[str]:
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        changed = set()
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0")
+            offset += EVENT_HEADER.size + length
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped: report every watched input as possibly changed
+                changed |= set(PollingWatcher(self.root, self.patterns)._scan())
+                continue
+            if wd not in self.watches or not name:
+                continue
+            directory, recursive = self.watches[wd]
+            path = os.path.join(directory, os.fsdecode(name))
+            if mask & IN_ISDIR:
+                if recursive and mask & (IN_CREATE | IN_MOVED_TO):
+                    self._add_tree(path, True)
+                    # Files may land before the new folder's watch exists
+                    changed |= {os.path.join(current, f) for current, _, files in os.walk(path) for f in files}
+                continue
+            changed.add(os.path.normpath(path))
+        return changed
+
+    def wait_for_changes(self, debounce: float = 0.5, max_wait: float = 10.0) -> Set[str]:
+        changed = set()
+        while not changed:
+            changed = self._read_events(None)
+        started = time.monotonic()
+        while time.monotonic() - started < max_wait:
+            more = self._read_events(debounce)
+            if not more:
+                break
+            changed |= more
+        return changed
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def create_watcher(root: Path, patterns: List[str], polling: bool = False, interval: float = 1.0):
+    """inotify watcher where available, otherwise a polling watcher."""
+    if not polling:
+        try:
+            return InotifyWatcher(root, patterns)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(root, patterns, interval)
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Ingest the Workbook Plan Coverage Matrix
+
+Stream-reads the "12) Plan Coverage Matrix" sheet of the master analysis
+workbook (read-only, values-only rows) into the same coverage model
+parse-json-plans.py produces (see coverage_model.py), then reconciles it
+against the JSON-derived coverage and reports every disagreement.
+
+The header row is found by its policy area columns (names or aliases, see
+policy_taxonomy.py); the plan column is the one headed "Plan...". Cells may
+say FULL/LIMITED/NO (any case) or use symbols (✓ ◐ ✗, ● ◐ ○); blank cells
+mean the plan does not mention the area. An "X" is ambiguous (checked or
+crossed out) and is reported as unrecognized. Only areas the sheet has a
+column for are reconciled.
+
+A missing workbook still writes both outputs, marked "workbook not found"
+(an empty coverage model and no reconciliation), so the pipeline stage
+completes and is skipped until the workbook appears. With --primary the
+existing json-plan-analysis.json is left alone.
+
+Usage:
+    python3 scripts/ingest-coverage-workbook.py [WORKBOOK] [--sheet NAME]
+    python3 scripts/ingest-coverage-workbook.py --primary   # workbook-only clients
+
+Output:
+    scripts/output/workbook-plan-analysis.json (json-plan-analysis.json layout)
+    scripts/output/coverage-conflicts.json (workbook vs JSON reconciliation)
+    scripts/output/json-plan-analysis.json (with --primary, instead of the first file)
+"""
+
+import argparse
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+import openpyxl
+from openpyxl.utils import get_column_letter
+
+from coverage_model import build_analysis
+from instrumentation import Instrumentation, add_arguments as add_instrumentation_args
+from policy_taxonomy import AREA_IDS, POLICY_AREAS, map_policy_to_standard
+from reproducible import dump_json
+
+ARCHIVE_ROOT = Path(os.environ.get("ARCHIVE_ROOT", "data/demo-client-archive"))
+EXCEL_FILE = ARCHIVE_ROOT / "Analysis/Comp Analysis/workbooks/master/BHG_01_HS_Comp_Plan_Analysis_FINAL.xlsx"
+COVERAGE_SHEET = "12) Plan Coverage Matrix"
+OUTPUT_DIR = Path(os.environ.get("SGM_OUTPUT_DIR", Path(__file__).parent / "output"))
+OUTPUT_FILE = OUTPUT_DIR / "workbook-plan-analysis.json"
+JSON_PLAN_FILE = OUTPUT_DIR / "json-plan-analysis.json"
+CONFLICTS_FILE = OUTPUT_DIR / "coverage-conflicts.json"
+
+HEADER_SCAN_ROWS = 15
+MIN_AREA_COLUMNS = 3
+WORKBOOK_DIVISION = "Workbook"
+
+LEVEL_VALUES = {
+    "full": "FULL", "f": "FULL", "yes": "FULL", "y": "FULL", "covered": "FULL",
+    "✓": "FULL", "✔": "FULL", "✅": "FULL", "●": "FULL",
+    "limited": "LIMITED", "l": "LIMITED", "partial": "LIMITED", "p": "LIMITED",
+    "◐": "LIMITED", "~": "LIMITED", "⚠": "LIMITED", "⚠️": "LIMITED",
+    "no": "NO", "n": "NO", "none": "NO", "gap": "NO", "missing": "NO",
+    "✗": "NO", "✘": "NO", "❌": "NO", "○": "NO", "-": "NO",
+}
+
+
+def normalize_name(name: str) -> str:
+    """Plan name key for matching workbook rows to JSON plans."""
+    return re.sub(r"\s+", " ", str(name)).strip().lower()
+
+
+def slug(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "-", text).strip("-")
+
+
+def cell_level(value: Any) -> Optional[str]:
+    """FULL/LIMITED/NO for a matrix cell, '' for blank, None if unrecognized."""
+    if value is None:
+        return ""
+    text = str(value).strip()
+    if not text:
+        return ""
+    return LEVEL_VALUES.get(text.lower()) or LEVEL_VALUES.get(text.split()[0].lower())
+
+
+def header_columns(row: tuple) -> Optional[Dict[str, Any]]:
+    """Plan and area columns if this row is the matrix header, else None."""
+    areas: Dict[int, str] = {}
+    plan_col = None
+    division_col = None
+    for idx, value in enumerate(row):
+        if not isinstance(value, str) or not value.strip():
+            continue
+        area = map_policy_to_standard(value.strip())
+        if area in AREA_IDS and area not in areas.values():
+            areas[idx] = area
+        elif plan_col is None and "plan" in value.lower():
+            plan_col = idx
+        elif division_col is None and "division" in value.lower():
+            division_col = idx
+    if len(areas) < MIN_AREA_COLUMNS:
+        return None
+    if plan_col is None:
+        # Fall back to the first text column before the area columns
+        plan_col = next((idx for idx, value in enumerate(row) if idx not in areas and isinstance(value, str)), 0)
+    return {'plan': plan_col, 'division': division_col, 'areas': areas}
+
+
+def read_coverage_sheet(workbook: Path, sheet: str) -> Dict[str, Any]:
+    """Stream the matrix sheet into plans (coverage model layout) plus ingestion warnings."""
+    source = str(workbook.relative_to(ARCHIVE_ROOT)) if workbook.is_relative_to(ARCHIVE_ROOT) else str(workbook)
+    wb = openpyxl.load_workbook(workbook, read_only=True, data_only=True)
+    try:
+        if sheet not in wb.sheetnames:
+            raise ValueError(f"Sheet not found: {sheet!r}")
+        columns = None
+        header_row = None
+        plans: List[Dict[str, Any]] = []
+        seen: Dict[str, int] = {}
+        unrecognized = []
+        duplicates = []
+        for row_number, row in enumerate(wb[sheet].iter_rows(values_only=True), 1):
+            if columns is None:
+                columns = header_columns(row)
+                header_row = row_number if columns else None
+                if columns is None and row_number >= HEADER_SCAN_ROWS:
+                    raise ValueError(f"No header with {MIN_AREA_COLUMNS}+ policy area columns in the first {HEADER_SCAN_ROWS} rows")
+                continue
+
+            name = row[columns['plan']] if columns['plan'] < len(row) else None
+            if name is None or not str(name).strip():
+                continue
+            name = str(name).strip()
+
+            policy_coverage = {}
+            for idx, area in columns['areas'].items():
+                value = row[idx] if idx < len(row) else None
+                level = cell_level(value)
+                if level is None:
+                    unrecognized.append({'row': row_number, 'column': get_column_letter(idx + 1), 'plan': name,
+                                         'area': area, 'value': str(value)})
+                    continue
+                if level:
+                    policy_coverage[area] = {
+                        'coverage': level,
+                        'details': f"{sheet}!{get_column_letter(idx + 1)}{row_number}",
+                        'originalPolicy': area,
+                    }
+            if not policy_coverage:
+                continue  # Totals, notes and other non-plan rows
+
+            key = normalize_name(name)
+            if key in seen:
+                duplicates.append({'plan': name, 'row': row_number, 'firstRow': seen[key]})
+                continue
+            seen[key] = row_number
+            division = row[columns['division']] if columns['division'] is not None and columns['division'] < len(row) else None
+            plans.append({
+                'planName': name,
+                'sourceFile': f"{source}/{slug(name)}",
+                'policyCoverage': policy_coverage,
+                'division': str(division).strip() if division else WORKBOOK_DIVISION,
+            })
+    finally:
+        wb.close()
+
+    return {
+        'source': f"{source}#{sheet}",
+        'headerRow': header_row,
+        'areaColumns': {get_column_letter(idx + 1): area for idx, area in (columns or {}).get('areas', {}).items()},
+        'plans': plans,
+        'unrecognizedCells': unrecognized,
+        'duplicatePlans': duplicates,
+    }
+
+
+def effective_levels(plan: Dict[str, Any], areas: List[str]) -> Dict[str, str]:
+    """Level per given area; areas a plan does not mention count as NO."""
+    return {area: plan['policyCoverage'].get(area, {}).get('coverage', "NO") for area in areas}
+
+
+def reconcile(workbook_plans: List[Dict[str, Any]], json_plans: List[Dict[str, Any]],
+              areas: List[str]) -> Dict[str, Any]:
+    """
+    Plans only on one side, and every (plan, area) whose level differs.
+
+    Only areas the workbook has a column for (sheet['areaColumns']) are
+    compared; the rest have no workbook value to disagree with.
+    """
+    json_by_name = {normalize_name(plan['planName']): plan for plan in json_plans}
+    workbook_names = {normalize_name(plan['planName']) for plan in workbook_plans}
+
+    conflicts = []
+    agreeing = 0
+    for plan in workbook_plans:
+        other = json_by_name.get(normalize_name(plan['planName']))
+        if other is None:
+            continue
+        json_levels = effective_levels(other, areas)
+        for area, level in effective_levels(plan, areas).items():
+            if level == json_levels[area]:
+                agreeing += 1
+                continue
+            conflicts.append({
+                'plan': plan['planName'],
+                'area': area,
+                'workbook': level,
+                'json': json_levels[area],
+                'workbookCell': plan['policyCoverage'].get(area, {}).get('details'),
+                'jsonDetails': other['policyCoverage'].get(area, {}).get('details'),
+            })
+
+    only_workbook = [plan['planName'] for plan in workbook_plans if normalize_name(plan['planName']) not in json_by_name]
+    only_json = [plan['planName'] for plan in json_plans if normalize_name(plan['planName']) not in workbook_names]
+    return {
+        'summary': {
+            'workbookPlans': len(workbook_plans),
+            'jsonPlans': len(json_plans),
+            'matched': len(workbook_plans) - len(only_workbook),
+            'onlyInWorkbook': len(only_workbook),
+            'onlyInJson': len(only_json),
+            'agreeingCells': agreeing,
+            'conflictingCells': len(conflicts),
+        },
+        'onlyInWorkbook': only_workbook,
+        'onlyInJson': only_json,
+        'conflicts': conflicts,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Ingest the workbook plan coverage matrix and reconcile it with the JSON analysis")
+    parser.add_argument("workbook", nargs="?", type=Path, default=EXCEL_FILE, help=f"Workbook (default: {EXCEL_FILE})")
+    parser.add_argument("--sheet", default=COVERAGE_SHEET, help=f"Matrix sheet (default: {COVERAGE_SHEET!r})")
+    parser.add_argument("--primary", action="store_true",
+                        help=f"Write the ingested model as {JSON_PLAN_FILE.name} for downstream stages (reconciles against the previous one first)")
+    add_instrumentation_args(parser)
+    return parser.parse_args()
+
+
+def run(args: argparse.Namespace, instr: Instrumentation) -> int:
+    """The script body. Returns the exit code; main() reports the run either way."""
+    output_file = JSON_PLAN_FILE if args.primary else OUTPUT_FILE
+
+    if not args.workbook.exists():
+        print(f"⚠️  Workbook not found, nothing to ingest: {args.workbook}")
+        note = f"Workbook not found: {args.workbook}"
+        with instr.stage("save"):
+            OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+            with open(CONFLICTS_FILE, 'w', encoding='utf-8') as f:
+                dump_json({'summary': None, 'note': note, 'workbook': None}, f, indent=2)
+            if not args.primary:
+                output_data = build_analysis([], str(args.workbook), 0, [])
+                output_data['metadata']['note'] = note
+                with open(output_file, 'w', encoding='utf-8') as f:
+                    dump_json(output_data, f, indent=2)
+        print(f"✅ Empty outputs written to {CONFLICTS_FILE.parent}")
+        return 0
+
+    print(f"🚀 Ingesting {args.sheet!r} from {args.workbook}...")
+    with instr.stage("parse"):
+        try:
+            sheet = read_coverage_sheet(args.workbook, args.sheet)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 1
+    plans = sheet['plans']
+    print(f"📋 Header row {sheet['headerRow']}: {len(sheet['areaColumns'])} policy area columns, {len(plans)} plans")
+    if len(sheet['areaColumns']) < len(POLICY_AREAS):
+        missing = [area for area in POLICY_AREAS if area not in sheet['areaColumns'].values()]
+        print(f"   ⚠️  Areas without a column (treated as not mentioned): {', '.join(missing)}")
+    for cell in sheet['unrecognizedCells'][:10]:
+        print(f"   ⚠️  Unrecognized value {cell['value']!r} at {cell['column']}{cell['row']} ({cell['plan']} / {cell['area']})")
+    for duplicate in sheet['duplicatePlans']:
+        print(f"   ⚠️  Duplicate plan {duplicate['plan']!r} at row {duplicate['row']} (kept row {duplicate['firstRow']})")
+    print()
+
+    with instr.stage("aggregate"):
+        divisions = sorted({plan['division'] for plan in plans})
+        output_data = build_analysis(plans, sheet['source'], 1, divisions)
+
+    # Reconcile against the JSON-derived coverage (before --primary replaces it)
+    with instr.stage("load"):
+        json_plans = None
+        if JSON_PLAN_FILE.exists():
+            with open(JSON_PLAN_FILE, 'r', encoding='utf-8') as f:
+                json_plans = json.load(f)['plans']
+    with instr.stage("classify"):
+        if json_plans is not None:
+            report = reconcile(plans, json_plans, list(sheet['areaColumns'].values()))
+        else:
+            report = {'summary': None, 'note': f"No JSON analysis to reconcile against ({JSON_PLAN_FILE})"}
+        report['workbook'] = {key: sheet[key] for key in ('source', 'headerRow', 'areaColumns', 'unrecognizedCells', 'duplicatePlans')}
+
+    with instr.stage("save"):
+        OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        with open(CONFLICTS_FILE, 'w', encoding='utf-8') as f:
+            dump_json(report, f, indent=2)
+        with open(output_file, 'w', encoding='utf-8') as f:
+            dump_json(output_data, f, indent=2)
+    print(f"✅ Coverage model written to {output_file}")
+    print(f"✅ Reconciliation written to {CONFLICTS_FILE}\n")
+
+    summary = report['summary']
+    instr.count("plansIngested", len(plans))
+    instr.count("unrecognizedCells", len(sheet['unrecognizedCells']))
+    if summary:
+        instr.gauge("conflictingCells", summary['conflictingCells'])
+        print("📊 Reconciliation (workbook vs JSON):")
+        print("═" * 90)
+        print(f"   Plans:              {summary['workbookPlans']} workbook / {summary['jsonPlans']} JSON / {summary['matched']} matched")
+        print(f"   Only in workbook:   {summary['onlyInWorkbook']}")
+        print(f"   Only in JSON:       {summary['onlyInJson']}")
+        print(f"   Cells agreeing:     {summary['agreeingCells']}")
+        print(f"   Cells conflicting:  {summary['conflictingCells']}")
+        print("═" * 90)
+        for conflict in report['conflicts'][:20]:
+            print(f"   ❗ {conflict['plan'][:36]:38} | {conflict['area'][:28]:30} | workbook {conflict['workbook']:7} | JSON {conflict['json']}")
+        if len(report['conflicts']) > 20:
+            print(f"   ... {len(report['conflicts']) - 20} more in {CONFLICTS_FILE}")
+        print()
+    else:
+        print(f"ℹ️  {report['note']}\n")
+
+    print("🎉 Workbook ingestion complete!")
+    return 0
+
+
+def main():
+    args = parse_args()
+    instr = Instrumentation.from_args(args, "ingest-coverage-workbook")
+    status = 1
+    try:
+        status = run(args, instr)
+    finally:
+        # Failed and crashed runs are reported too (sgm_run_success 0, last failure time)
+        instr.finish(JSON_PLAN_FILE if args.primary else OUTPUT_FILE, success=status == 0)
+    return status
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,206 @@
+"""
+Run Instrumentation
+
+Shared timing, counter and profiling layer for the pipeline scripts:
+
+    instr = Instrumentation.from_args(args, "parse-json-plans")
+    with instr.stage("parse"):
+        ...
+    instr.count("plansParsed", len(plans))
+    instr.finish(OUTPUT_FILE)   # writes json-plan-analysis.run-report.json
+
+Stage names follow the pipeline vocabulary: load, parse, classify,
+aggregate, render, save. Scripts call finish(output_file, success=...)
+from a try/finally in main(), so failed and crashed runs are reported too.
+
+Off by default: stage() hands back a shared no-op context manager and
+count()/gauge()/observe() return immediately, so instrumented code costs a
+method call. Enable it with --report (timers, counters, run report),
+--profile (adds cProfile hot spots and tracemalloc allocation sites), or
+SGM_RUN_REPORT=1 for every script in a pipeline run. --metrics-dir DIR or
+SGM_METRICS_DIR=DIR also writes Prometheus textfile metrics (see
+prometheus_metrics.py).
+"""
+
+import argparse
+import cProfile
+import io
+import json
+import os
+import pstats
+import resource
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from prometheus_metrics import (METRICS_ENV, current_tenant, metrics_path, previous_timestamps, render_metrics,
+                                write_textfile)
+
+REPORT_SUFFIX = ".run-report.json"
+PROFILE_TOP = 25
+
+_NO_OP = nullcontext()
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Add --report / --profile to a script's argument parser."""
+    parser.add_argument("--report", action="store_true",
+                        help=f"Write a JSON run report (stage timings, counters) next to the output (*{REPORT_SUFFIX})")
+    parser.add_argument("--profile", action="store_true",
+                        help="Like --report, plus cProfile hot spots and tracemalloc allocations")
+    parser.add_argument("--metrics-dir", type=Path,
+                        help=f"Write Prometheus textfile metrics to this directory (default: ${METRICS_ENV})")
+
+
+def report_path(output_file: Path) -> Path:
+    """Run report path next to an output file: foo.xlsx -> foo.run-report.json."""
+    output_file = Path(output_file)
+    return output_file.with_name(output_file.stem + REPORT_SUFFIX)
+
+
+class Instrumentation:
+    """Stage timers, counters and optional profiling for one script run."""
+
+    def __init__(self, script: str, enabled: bool = False, profile: bool = False,
+                 metrics_dir: Optional[Path] = None):
+        self.script = script
+        self.write_report = enabled or profile
+        self.metrics_dir = Path(metrics_dir) if metrics_dir else None
+        self.enabled = self.write_report or self.metrics_dir is not None
+        self.profile = profile
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.stage_samples: Dict[str, List[float]] = {}
+        self.counters: Dict[str, float] = {}
+        self.gauges: Dict[str, float] = {}
+        self.histograms: Dict[str, List[float]] = {}
+        self.started_at = datetime.now(timezone.utc)
+        self.started = time.perf_counter()
+        self._profiler: Optional[cProfile.Profile] = None
+        if self.profile:
+            tracemalloc.start()
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    @classmethod
+    def from_args(cls, args: Optional[argparse.Namespace], script: str) -> "Instrumentation":
+        enabled = bool(getattr(args, 'report', False)) or os.environ.get("SGM_RUN_REPORT", "") not in ("", "0")
+        metrics_dir = getattr(args, 'metrics_dir', None) or os.environ.get(METRICS_ENV) or None
+        return cls(script, enabled=enabled, profile=bool(getattr(args, 'profile', False)), metrics_dir=metrics_dir)
+
+    def stage(self, name: str, observe: Optional[str] = None):
+        """Context manager timing one stage (accumulates over repeated entries).
+
+        observe also records each entry's duration in that histogram, e.g.
+        stage("parse", observe="docxExtractSeconds") -> sgm_docx_extract_seconds.
+        """
+        if not self.enabled:
+            return _NO_OP
+        return self._timed(name, observe)
+
+    @contextmanager
+    def _timed(self, name: str, observe: Optional[str]):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            self.record(name, seconds)
+            if observe:
+                self.observe(observe, seconds)
+
+    def record(self, name: str, seconds: float):
+        """Add one timed entry of a stage measured elsewhere (e.g. a subprocess)."""
+        if not self.enabled:
+            return
+        entry = self.stages.setdefault(name, {'seconds': 0.0, 'calls': 0})
+        entry['seconds'] += seconds
+        entry['calls'] += 1
+        self.stage_samples.setdefault(name, []).append(seconds)
+
+    def count(self, name: str, value: float = 1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def gauge(self, name: str, value: float):
+        if self.enabled:
+            self.gauges[name] = value
+
+    def observe(self, name: str, value: float):
+        """Add a sample to a histogram (exported as Prometheus metrics only)."""
+        if self.enabled:
+            self.histograms.setdefault(name, []).append(value)
+
+    def _profile_sections(self) -> Dict[str, Any]:
+        self._profiler.disable()
+        stream = io.StringIO()
+        stats = pstats.Stats(self._profiler, stream=stream)
+        hot: List[Dict[str, Any]] = []
+        for (filename, line, function), (_, calls, total, cumulative, _) in sorted(
+            stats.stats.items(), key=lambda item: item[1][3], reverse=True
+        )[:PROFILE_TOP]:
+            hot.append({
+                'function': f"{Path(filename).name}:{line}({function})",
+                'calls': calls,
+                'totalSeconds': round(total, 4),
+                'cumulativeSeconds': round(cumulative, 4),
+            })
+
+        current, peak = tracemalloc.get_traced_memory()
+        top = tracemalloc.take_snapshot().statistics("lineno")[:PROFILE_TOP]
+        tracemalloc.stop()
+        return {
+            'hotFunctions': hot,
+            'memory': {
+                'currentBytes': current,
+                'peakBytes': peak,
+                'topAllocations': [
+                    {'location': f"{Path(stat.traceback[0].filename).name}:{stat.traceback[0].lineno}",
+                     'bytes': stat.size, 'count': stat.count}
+                    for stat in top
+                ],
+            },
+        }
+
+    def report(self) -> Dict[str, Any]:
+        """The run report as a dict."""
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        report = {
+            'script': self.script,
+            'startedAt': self.started_at.isoformat(timespec='seconds'),
+            'wallSeconds': round(time.perf_counter() - self.started, 4),
+            'maxRssBytes': max_rss if sys.platform == "darwin" else max_rss * 1024,
+            'stages': {name: {'seconds': round(entry['seconds'], 4), 'calls': entry['calls']}
+                       for name, entry in self.stages.items()},
+            'counters': self.counters,
+            'gauges': self.gauges,
+        }
+        if self._profiler is not None:
+            report['profile'] = self._profile_sections()
+        return report
+
+    def finish(self, output_file: Path, success: bool = True) -> Optional[Dict[str, Any]]:
+        """Write the run report next to output_file and/or the metrics textfile, and print a timing line."""
+        if not self.enabled:
+            return None
+        report = self.report()
+        report['success'] = success
+        timings = ", ".join(f"{name} {entry['seconds']:.2f}s" for name, entry in report['stages'].items())
+        print(f"⏱️  {self.script}: {report['wallSeconds']:.2f}s ({timings})")
+        if self.write_report:
+            path = report_path(output_file)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+            print(f"📄 Run report: {path}")
+        if self.metrics_dir is not None:
+            tenant = current_tenant()
+            path = metrics_path(self.metrics_dir, self.script, tenant)
+            write_textfile(path, render_metrics(report, self.stage_samples, self.histograms, tenant,
+                                                previous_timestamps(path)))
+            print(f"📈 Metrics: {path}")
+        return report
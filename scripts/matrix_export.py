@@ -0,0 +1,191 @@
+"""
+Policy Coverage Matrix Export
+
+One pass over the plans feeds every output format: matrix_rows() resolves
+each plan's level per policy area once, and each attached writer consumes
+the same rows as they are produced (CSV and HTML stream straight to disk,
+the columnar writer appends to its column arrays):
+
+    writers = [CsvMatrixWriter(stem), ColumnarMatrixWriter(stem), HtmlMatrixWriter(stem)]
+    paths = export_matrix(plans, policy_areas, writers)
+
+The columnar output is always JSON ({"columns": [...], "data": {name: [values]}}),
+which the web app reads directly, plus the same columns as Parquet when
+pyarrow is installed.
+"""
+
+import csv
+import html
+from pathlib import Path
+from typing import Dict, Iterator, List, Any, Optional
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+from plan_shards import assign_plan_ids
+from reproducible import dump_json
+
+NOT_ADDRESSED = "Policy area not addressed in plan documentation"
+LEVEL_COLORS = {"FULL": "C6EFCE", "LIMITED": "FFEB9C", "NO": "FFC7CE"}  # Same fills as the workbook
+
+
+def matrix_rows(plans: List[Dict[str, Any]], policy_areas: List[str]) -> Iterator[Dict[str, Any]]:
+    """One row per plan: level and details per area (unmentioned areas are NO) plus coverage stats."""
+    for plan, pid in zip(plans, assign_plan_ids(plans)):
+        policy_coverage = plan.get('policyCoverage', {})
+        cells = []
+        for area in policy_areas:
+            entry = policy_coverage.get(area)
+            cells.append({
+                'area': area,
+                'coverage': entry['coverage'] if entry else "NO",
+                'details': entry.get('details', 'No details available') if entry else None,
+            })
+        stats = plan.get('coverageStats', {})
+        yield {
+            'planName': plan['planName'],
+            'planId': pid,
+            'businessUnit': plan.get('businessUnit', 'Unknown'),
+            'planType': plan.get('planType', 'Unknown'),
+            'division': plan.get('division', ''),
+            'sourceFile': plan.get('sourceFile', ''),
+            'cells': cells,
+            'percentage': stats.get('percentage', 0),
+            'full': stats.get('full', 0),
+            'limited': stats.get('limited', 0),
+            'no': stats.get('no', 0),
+        }
+
+
+class MatrixWriter:
+    """Receives the matrix header once, then every row, then close() for the files written."""
+
+    def begin(self, policy_areas: List[str], plan_count: int):
+        pass
+
+    def write_row(self, row: Dict[str, Any]):
+        raise NotImplementedError
+
+    def close(self) -> List[Path]:
+        return []
+
+
+def export_matrix(plans: List[Dict[str, Any]], policy_areas: List[str], writers: List[MatrixWriter]) -> List[Path]:
+    """Traverse the plans once, handing each row to every writer; returns the files written."""
+    for writer in writers:
+        writer.begin(policy_areas, len(plans))
+    for row in matrix_rows(plans, policy_areas):
+        for writer in writers:
+            writer.write_row(row)
+    paths = []
+    for writer in writers:
+        paths.extend(writer.close())
+    return paths
+
+
+class CsvMatrixWriter(MatrixWriter):
+    """Wide matrix CSV: plan columns, one level column per area, Coverage %."""
+
+    def __init__(self, stem: Path):
+        self.path = stem.with_suffix(".csv")
+        self.file = None
+        self.writer = None
+
+    def begin(self, policy_areas: List[str], plan_count: int):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(self.path, 'w', encoding='utf-8', newline='')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(["Plan Name", "Plan ID", "Business Unit", "Plan Type", "Division", *policy_areas, "Coverage %"])
+
+    def write_row(self, row: Dict[str, Any]):
+        self.writer.writerow([row['planName'], row['planId'], row['businessUnit'], row['planType'], row['division'],
+                              *(cell['coverage'] for cell in row['cells']), row['percentage']])
+
+    def close(self) -> List[Path]:
+        self.file.close()
+        return [self.path]
+
+
+class ColumnarMatrixWriter(MatrixWriter):
+    """Column arrays for the matrix: columnar JSON, plus Parquet when pyarrow is available."""
+
+    PLAN_COLUMNS = ["planName", "planId", "businessUnit", "planType", "division", "percentage", "full", "limited", "no"]
+
+    def __init__(self, stem: Path, parquet: Optional[bool] = None):
+        self.parquet = pyarrow is not None if parquet is None else parquet
+        self.path = stem.with_suffix(".columns.json")
+        self.parquet_path = stem.with_suffix(".parquet")
+        self.columns: Dict[str, List[Any]] = {}
+        self.areas: List[str] = []
+
+    def begin(self, policy_areas: List[str], plan_count: int):
+        self.areas = list(policy_areas)
+        self.columns = {name: [] for name in self.PLAN_COLUMNS + self.areas}
+
+    def write_row(self, row: Dict[str, Any]):
+        for name in self.PLAN_COLUMNS:
+            self.columns[name].append(row[name])
+        for cell in row['cells']:
+            self.columns[cell['area']].append(cell['coverage'])
+
+    def close(self) -> List[Path]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            dump_json({
+                'columns': list(self.columns),
+                'policyAreas': self.areas,
+                'rowCount': len(self.columns['planName']),
+                'data': self.columns,
+            }, f)
+        if not self.parquet:
+            return [self.path]
+        pyarrow.parquet.write_table(pyarrow.table(self.columns), self.parquet_path)
+        return [self.path, self.parquet_path]
+
+
+class HtmlMatrixWriter(MatrixWriter):
+    """Static, self-contained HTML report of the matrix (no scripts, inline styles)."""
+
+    def __init__(self, stem: Path, title: str = "Policy Coverage Matrix"):
+        self.path = stem.with_suffix(".html")
+        self.title = title
+        self.file = None
+        self.rows = 0
+
+    def begin(self, policy_areas: List[str], plan_count: int):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(self.path, 'w', encoding='utf-8')
+        styles = "".join(f".{level.lower()}{{background:#{color}}}" for level, color in LEVEL_COLORS.items())
+        self.file.write(
+            "<!DOCTYPE html>\n<html lang=\"en\">\n<head>\n<meta charset=\"utf-8\">\n"
+            f"<title>{html.escape(self.title)}</title>\n"
+            "<style>body{font-family:sans-serif;font-size:13px}table{border-collapse:collapse}"
+            "th,td{border:1px solid #ccc;padding:4px 6px}th{background:#4472C4;color:#fff;font-size:11px}"
+            f"td.level{{text-align:center;font-weight:bold;font-size:11px}}{styles}</style>\n"
+            f"</head>\n<body>\n<h1>{html.escape(self.title)}</h1>\n"
+            f"<p>Total Plans: {plan_count} | Policy Areas: {len(policy_areas)}</p>\n"
+            "<table>\n<thead><tr><th>Plan Name</th>"
+            + "".join(f"<th>{html.escape(area)}</th>" for area in policy_areas)
+            + "<th>Coverage %</th></tr></thead>\n<tbody>\n"
+        )
+
+    def write_row(self, row: Dict[str, Any]):
+        cells = "".join(
+            f"<td class=\"level {cell['coverage'].lower()}\" title=\"{html.escape((cell['details'] or NOT_ADDRESSED)[:200])}\">"
+            f"{cell['coverage']}</td>"
+            for cell in row['cells']
+        )
+        self.file.write(f"<tr><td>{html.escape(row['planName'])}</td>{cells}<td>{row['percentage']}%</td></tr>\n")
+        self.rows += 1
+
+    def close(self) -> List[Path]:
+        self.file.write(
+            "</tbody>\n</table>\n<p><span class=\"full\">FULL</span> Detailed enforceable policy with thresholds, workflows, SLAs"
+            " | <span class=\"limited\">LIMITED</span> Mentions policy area but lacks detail or clear process"
+            " | <span class=\"no\">NO</span> Silent on policy area or only disclaimer language</p>\n</body>\n</html>\n"
+        )
+        self.file.close()
+        return [self.path]
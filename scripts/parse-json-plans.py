@@ -1,144 +1,96 @@
 #!/usr/bin/env python3
 """
-Parse 27 JSON Plan Analysis Files
+Parse JSON Plan Analysis Files
 
 Extracts policy coverage from clause extraction JSON files
 and maps to 16 standardized policy areas.
 
+Every division folder under plan_analysis/ (medical, dental, surgical,
+specialty, ...) is discovered recursively and parsed concurrently; each
+plan is tagged with its division and division-level aggregates are added.
+
 Usage:
-    python3 scripts/parse-json-plans.py
+    python3 scripts/parse-json-plans.py [--workers N]
+    python3 scripts/parse-json-plans.py --resume
+    python3 scripts/parse-json-plans.py --sqlite [PATH]
+    python3 scripts/parse-json-plans.py --snapshot [PATH]
+    python3 scripts/parse-json-plans.py --shards [DIR]
+    python3 scripts/parse-json-plans.py --history [PATH]
+    python3 scripts/parse-json-plans.py --cube [PATH]
+    python3 scripts/parse-json-plans.py --thresholds [PATH]
+    python3 scripts/parse-json-plans.py --report | --profile
+
+A file that cannot be parsed (bad JSON, malformed entries) does not stop
+the run: it is copied to scripts/output/quarantine/ with an .error.json
+record, listed in parse-errors.json, and the remaining files are parsed.
+Completed work is journaled as it finishes; --resume re-parses only the
+files that failed or were not reached by the previous run. If a worker
+process dies (e.g. killed for memory), the chunks it had not finished are
+left out of the journal and quarantine and the run stops without writing
+outputs, so --resume picks those files up.
 
 Output:
     scripts/output/json-plan-analysis.json
+    scripts/output/parse-errors.json (files that failed to parse)
+    scripts/output/quarantine/<division>/<file> + <file>.error.json
+    scripts/output/json-plan-analysis.db (with --sqlite)
+    scripts/output/json-plan-analysis.sgmcov (with --snapshot, see coverage_snapshot.py)
+    scripts/output/plans/<planId>.json + manifest.json (with --shards, see plan_shards.py)
+    scripts/output/coverage-history.sgmhist (with --history, appended; see coverage_history.py)
+    scripts/output/coverage-cube.json (with --cube, updated incrementally; see coverage_cube.py)
+    scripts/output/clause-thresholds.json (with --thresholds; see clause_thresholds.py, query-thresholds.py)
+    scripts/output/json-plan-analysis.run-report.json (with --report/--profile, see instrumentation.py)
 """
 
+import argparse
+import copy
+import hashlib
 import json
 import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 import re
 
+from analysis_store import write_store
+from clause_schema import ClauseSchemaError, validate_clause
+from clause_thresholds import ThresholdIndex, extract_plan_thresholds
+from coverage_cube import CoverageCube
+from coverage_model import build_analysis
+from coverage_history import CoverageHistory
+from coverage_snapshot import write_snapshot
+from instrumentation import Instrumentation, add_arguments as add_instrumentation_args
+from plan_shards import write_shards
+from policy_taxonomy import map_policy_to_standard
+from reproducible import build_timestamp, dump_json
+
 # File paths
 ARCHIVE_ROOT = Path(os.environ.get("ARCHIVE_ROOT", "data/demo-client-archive"))
-JSON_DIR = ARCHIVE_ROOT / "Analysis/Comp Analysis/plan_analysis/medical"
-OUTPUT_DIR = Path(__file__).parent / "output"
+PLAN_ANALYSIS_DIR = ARCHIVE_ROOT / "Analysis/Comp Analysis/plan_analysis"
+PLAN_FILE_PATTERN = "plan*_clause_extract.json"
+OUTPUT_DIR = Path(os.environ.get("SGM_OUTPUT_DIR", Path(__file__).parent / "output"))
 OUTPUT_FILE = OUTPUT_DIR / "json-plan-analysis.json"
+SQLITE_FILE = OUTPUT_DIR / "json-plan-analysis.db"
+SNAPSHOT_FILE = OUTPUT_DIR / "json-plan-analysis.sgmcov"
+SHARD_DIR = OUTPUT_DIR / "plans"
+HISTORY_FILE = OUTPUT_DIR / "coverage-history.sgmhist"
+CUBE_FILE = OUTPUT_DIR / "coverage-cube.json"
+THRESHOLDS_FILE = OUTPUT_DIR / "clause-thresholds.json"
+PARSE_CACHE_FILE = OUTPUT_DIR / ".parse-cache.jsonl"
+JOURNAL_FILE = OUTPUT_DIR / ".parse-journal.jsonl"
+QUARANTINE_DIR = OUTPUT_DIR / "quarantine"
+ERROR_REPORT_FILE = OUTPUT_DIR / "parse-errors.json"
+PARSE_CHUNK_SIZE = 25  # Files per worker task; each finished chunk is journaled
+PARSER_SOURCES = [Path(__file__), Path(__file__).parent / "policy_taxonomy.py", Path(__file__).parent / "clause_schema.py"]
+
 
-# Standardized 16 policy areas (from approved plan)
-POLICY_AREAS = [
-    "Windfall/Large Deals",
-    "Quota Management",
-    "Territory Management",
-    "Sales Crediting",
-    "Clawback/Recovery",
-    "SPIF Governance",
-    "Termination/Final Pay",
-    "New Hire/Onboarding",
-    "Leave of Absence",
-    "Payment Timing",
-    "Compliance (409A, State Wage)",
-    "Exceptions/Disputes",
-    "Data/Systems/Controls",
-    "Draws/Guarantees",
-    "Mid-Period Changes",
-    "International Requirements",
-]
-
-# Mapping from JSON policy names to standardized policy areas
-POLICY_MAPPING = {
-    # Windfall/Large Deals
-    "Windfall Governance": "Windfall/Large Deals",
-    "Large Deal": "Windfall/Large Deals",
-    "Unforecasted Deal": "Windfall/Large Deals",
-
-    # Quota Management
-    "Quota": "Quota Management",
-    "Performance Measurement": "Quota Management",
-    "Goal Setting": "Quota Management",
-
-    # Territory Management
-    "Territory": "Territory Management",
-    "Territory Assignment": "Territory Management",
-    "Account Reassignment": "Territory Management",
-
-    # Sales Crediting
-    "Commission Earned Definition": "Sales Crediting",
-    "Credit Rules": "Sales Crediting",
-    "Crediting": "Sales Crediting",
-    "Revenue Recognition": "Sales Crediting",
-
-    # Clawback/Recovery
-    "Clawback": "Clawback/Recovery",
-    "Recovery": "Clawback/Recovery",
-    "Chargeback": "Clawback/Recovery",
-    "Draw & Chargeback": "Draws/Guarantees",  # Separate: Draws are different
-
-    # SPIF Governance
-    "SPIF": "SPIF Governance",
-    "SPIFFs": "SPIF Governance",
-
-    # Termination/Final Pay
-    "Termination": "Termination/Final Pay",
-    "Separation": "Termination/Final Pay",
-    "Final Pay": "Termination/Final Pay",
-
-    # New Hire/Onboarding
-    "New Hire": "New Hire/Onboarding",
-    "Onboarding": "New Hire/Onboarding",
-    "Ramp": "New Hire/Onboarding",
-
-    # Leave of Absence
-    "Leave of Absence": "Leave of Absence",
-    "LOA": "Leave of Absence",
-
-    # Payment Timing
-    "Payment Timing": "Payment Timing",
-    "Payment Schedule": "Payment Timing",
-
-    # Compliance
-    "409A": "Compliance (409A, State Wage)",
-    "State Wage": "Compliance (409A, State Wage)",
-    "Compliance": "Compliance (409A, State Wage)",
-
-    # Exceptions/Disputes
-    "Dispute Process": "Exceptions/Disputes",
-    "Dispute Resolution": "Exceptions/Disputes",
-    "Exception": "Exceptions/Disputes",
-
-    # Data/Systems/Controls
-    "Data Accuracy": "Data/Systems/Controls",
-    "System": "Data/Systems/Controls",
-
-    # Draws/Guarantees
-    "Draw": "Draws/Guarantees",
-    "Guarantee": "Draws/Guarantees",
-
-    # Mid-Period Changes
-    "Mid-Period Change": "Mid-Period Changes",
-    "Plan Amendment": "Mid-Period Changes",
-
-    # International
-    "International": "International Requirements",
-
-    # Expense (maps to multiple)
-    "Expense Deductions": "Sales Crediting",
-}
-
-
-def map_policy_to_standard(policy_name: str) -> str:
-    """Map JSON policy name to standardized policy area."""
-    # Direct match
-    if policy_name in POLICY_MAPPING:
-        return POLICY_MAPPING[policy_name]
-
-    # Fuzzy match
-    policy_lower = policy_name.lower()
-    for json_name, standard_name in POLICY_MAPPING.items():
-        if json_name.lower() in policy_lower:
-            return standard_name
-
-    # Default to original if no match
-    return policy_name
+class PlanFileError(ValueError):
+    """A plan file whose content cannot be parsed; entry_index points at the bad entry."""
+
+    def __init__(self, message: str, entry_index: Optional[int] = None):
+        super().__init__(message)
+        self.entry_index = entry_index
 
 
 def assess_coverage(details: str) -> str:
@@ -206,20 +158,34 @@ def assess_coverage(details: str) -> str:
     return "NO"
 
 
-def parse_json_file(file_path: Path) -> Dict[str, Any]:
-    """Parse a single JSON plan file."""
+def parse_json_file(file_path: Path, keep_clauses: bool = False) -> Dict[str, Any]:
+    """
+    Parse a single JSON plan file.
+
+    With keep_clauses, every assessed entry is also returned under 'clauses'
+    (not just the best one per policy area). Entries are checked against
+    clause_schema.py; one that cannot be normalized fails the file.
+    """
     with open(file_path, 'r', encoding='utf-8') as f:
         data = json.load(f)
 
     if not data or not isinstance(data, list):
         return None
 
-    # Extract plan name from first entry
-    plan_name = data[0]['plan'] if data else f"Unknown Plan {file_path.stem}"
-
     # Build policy coverage map
     policy_coverage = {}
-    for entry in data:
+    clauses = []
+    for entry_index, entry in enumerate(data):
+        try:
+            entry = validate_clause(entry)
+        except ClauseSchemaError as e:
+            raise PlanFileError(f"Entry {entry_index}: {e}", entry_index) from e
+        if entry_index == 0:
+            # Extract plan name from first entry
+            if 'plan' not in entry:
+                raise PlanFileError("Entry 0: missing field 'plan'", 0)
+            plan_name = entry['plan']
+
         policy_name = entry['policy']
         details = entry['details']
 
@@ -229,6 +195,14 @@ def parse_json_file(file_path: Path) -> Dict[str, Any]:
         # Assess coverage level
         coverage = assess_coverage(details)
 
+        if keep_clauses:
+            clauses.append({
+                'policy': policy_name,
+                'area': standard_policy,
+                'coverage': coverage,
+                'details': details,
+            })
+
         # Store with details
         if standard_policy not in policy_coverage:
             policy_coverage[standard_policy] = {
@@ -246,80 +220,362 @@ def parse_json_file(file_path: Path) -> Dict[str, Any]:
                     'originalPolicy': policy_name,
                 }
 
-    return {
+    plan = {
         'planName': plan_name,
         'sourceFile': str(file_path.relative_to(ARCHIVE_ROOT)),
         'policyCoverage': policy_coverage,
     }
+    if keep_clauses:
+        plan['clauses'] = clauses
+    return plan
 
 
-def main():
-    print("🚀 Parsing 27 JSON plan analysis files...")
-    print(f"📂 Source: {JSON_DIR}")
+def discover_divisions(plan_analysis_dir: Path) -> Dict[str, List[Path]]:
+    """
+    Find plan files in every division folder, recursively.
+
+    The division is the first folder below plan_analysis/ (nested folders
+    roll up into it); files directly in plan_analysis/ fall under "General".
+    """
+    divisions: Dict[str, List[Path]] = {}
+    for file_path in plan_analysis_dir.rglob(PLAN_FILE_PATTERN):
+        relative = file_path.relative_to(plan_analysis_dir)
+        division = relative.parts[0].replace("_", " ").title() if len(relative.parts) > 1 else "General"
+        divisions.setdefault(division, []).append(file_path)
+    return {division: sorted(files) for division, files in sorted(divisions.items())}
+
+
+def parse_error_record(file_path: Path, division: str, error: BaseException) -> Dict[str, Any]:
+    """Structured description of why a file failed to parse."""
+    return {
+        'file': str(file_path.relative_to(ARCHIVE_ROOT)),
+        'division': division,
+        'errorType': type(error).__name__,
+        'message': str(error),
+        'entryIndex': getattr(error, 'entry_index', None),
+    }
+
+
+def parse_division(division: str, files: List[Path],
+                   keep_clauses: bool = False) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """
+    Parse a division's plan files (runs in a worker process).
+
+    Returns (results, errors), both keyed by file path. A result is None for
+    a file with no entries; a file that raises lands in errors instead, so
+    one bad file never costs the rest of the batch.
+    """
+    results = {}
+    errors = {}
+    for file_path in files:
+        try:
+            plan_data = parse_json_file(file_path, keep_clauses=keep_clauses)
+        except Exception as e:
+            errors[str(file_path)] = parse_error_record(file_path, division, e)
+            continue
+        if plan_data:
+            plan_data['division'] = division
+        results[str(file_path)] = plan_data
+    return results, errors
+
+
+def parser_version() -> str:
+    """Hash of the parsing code; cached results from other versions are ignored."""
+    sha = hashlib.sha256()
+    for source in PARSER_SOURCES:
+        sha.update(source.read_bytes())
+    return sha.hexdigest()[:16]
+
+
+def load_parse_cache(cache_file: Path, version: str) -> Dict[str, Dict[str, Any]]:
+    """Per-file parse results from earlier runs of the same parser version."""
+    cache = {}
+    if cache_file.exists():
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if entry.get('version') == version:
+                    cache[entry['path']] = entry
+    return cache
+
+
+def cached_result(cache: Dict[str, Dict[str, Any]], file_path: Path, keep_clauses: bool) -> Optional[Dict[str, Any]]:
+    """Cache entry for an unchanged file (same size and mtime), or None."""
+    entry = cache.get(str(file_path))
+    if entry is None or (keep_clauses and not entry['clauses']):
+        return None
+    stat = file_path.stat()
+    if entry['size'] != stat.st_size or entry['mtimeNs'] != stat.st_mtime_ns:
+        return None
+    return entry
+
+
+def cache_entry(path: str, version: str, keep_clauses: bool, plan_data: Optional[Dict[str, Any]],
+                error: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    stat = Path(path).stat()
+    entry = {'path': path, 'size': stat.st_size, 'mtimeNs': stat.st_mtime_ns, 'version': version,
+             'clauses': keep_clauses, 'plan': plan_data}
+    if error is not None:
+        entry['error'] = error
+    return entry
+
+
+def save_parse_cache(cache_file: Path, version: str, keep_clauses: bool, results: Dict[str, Dict[str, Any]]):
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cache_file.with_suffix(".tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        for path, plan_data in results.items():
+            f.write(json.dumps(cache_entry(path, version, keep_clauses, plan_data), ensure_ascii=False) + "\n")
+    tmp.replace(cache_file)
+
+
+def journal_results(journal, version: str, keep_clauses: bool,
+                    results: Dict[str, Dict[str, Any]], errors: Dict[str, Dict[str, Any]]):
+    """Append one finished chunk to the run journal and flush it to disk."""
+    for path, plan_data in results.items():
+        journal.write(json.dumps(cache_entry(path, version, keep_clauses, plan_data), ensure_ascii=False) + "\n")
+    for path, error in errors.items():
+        journal.write(json.dumps(cache_entry(path, version, keep_clauses, None, error), ensure_ascii=False) + "\n")
+    journal.flush()
+    os.fsync(journal.fileno())
+
+
+def quarantine_path(file_path: Path) -> Path:
+    return QUARANTINE_DIR / Path(file_path).relative_to(PLAN_ANALYSIS_DIR)
+
+
+def quarantine_file(file_path: Path, error: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a failed file (the archive is left untouched) next to its error record."""
+    target = quarantine_path(file_path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copy2(file_path, target)
+    error = dict(error, quarantinedAs=str(target))
+    with open(target.with_name(target.name + ".error.json"), 'w', encoding='utf-8') as f:
+        json.dump(error, f, indent=2, ensure_ascii=False)
+    return error
+
+
+def release_quarantine(file_path: Path):
+    """Drop the quarantined copy of a file that now parses."""
+    target = quarantine_path(file_path)
+    for path in (target, target.with_name(target.name + ".error.json")):
+        if path.exists():
+            path.unlink()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Parse clause extraction JSON files into policy coverage")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Divisions parsed concurrently (1 = no worker processes)")
+    parser.add_argument("--sqlite", nargs="?", const=SQLITE_FILE, type=Path, default=None, metavar="PATH",
+                        help=f"Also write an indexed SQLite store (default path: {SQLITE_FILE})")
+    parser.add_argument("--snapshot", nargs="?", const=SNAPSHOT_FILE, type=Path, default=None, metavar="PATH",
+                        help=f"Also write a memory-mappable binary snapshot (default path: {SNAPSHOT_FILE})")
+    parser.add_argument("--shards", nargs="?", const=SHARD_DIR, type=Path, default=None, metavar="DIR",
+                        help=f"Also write one JSON file per plan plus a manifest (default dir: {SHARD_DIR})")
+    parser.add_argument("--history", nargs="?", const=HISTORY_FILE, type=Path, default=None, metavar="PATH",
+                        help=f"Append this run to the coverage history store (default path: {HISTORY_FILE})")
+    parser.add_argument("--cube", nargs="?", const=CUBE_FILE, type=Path, default=None, metavar="PATH",
+                        help=f"Update the area x business unit x plan type x division cube (default path: {CUBE_FILE})")
+    parser.add_argument("--thresholds", nargs="?", const=THRESHOLDS_FILE, type=Path, default=None, metavar="PATH",
+                        help=f"Also index money, percent and duration values from every clause (default path: {THRESHOLDS_FILE})")
+    parser.add_argument("--incremental", action="store_true",
+                        help=f"Re-parse only files changed since the last run (cache: {PARSE_CACHE_FILE})")
+    parser.add_argument("--resume", action="store_true",
+                        help=f"Parse only files that failed or were not reached by the previous run (journal: {JOURNAL_FILE})")
+    add_instrumentation_args(parser)
+    return parser.parse_args()
+
+
+def run(args: argparse.Namespace, instr: Instrumentation) -> int:
+    """The script body. Returns the exit code; main() reports the run either way."""
+
+    print("🚀 Parsing JSON plan analysis files...")
+    print(f"📂 Source: {PLAN_ANALYSIS_DIR}")
     print(f"📂 Output: {OUTPUT_FILE}\n")
 
-    # Find all plan JSON files
-    json_files = sorted(JSON_DIR.glob("plan*_clause_extract.json"))
+    # Find plan JSON files in every division
+    with instr.stage("load"):
+        divisions = discover_divisions(PLAN_ANALYSIS_DIR)
+        json_files = [file_path for files in divisions.values() for file_path in files]
 
     if not json_files:
-        print(f"❌ No JSON files found in {JSON_DIR}")
+        print(f"❌ No JSON files found in {PLAN_ANALYSIS_DIR}")
         return 1
 
-    print(f"📋 Found {len(json_files)} JSON files\n")
+    print(f"📋 Found {len(json_files)} JSON files in {len(divisions)} divisions\n")
+    for division, files in divisions.items():
+        print(f"   {division}: {len(files)} files")
+    print()
+
+    # With --resume, files the previous run completed come from its journal;
+    # with --incremental, unchanged files come from the parse cache
+    with instr.stage("load"):
+        keep_clauses = args.sqlite is not None or args.thresholds is not None
+        version = parser_version()
+        journal = load_parse_cache(JOURNAL_FILE, version) if args.resume else {}
+        cache = load_parse_cache(PARSE_CACHE_FILE, version) if args.incremental else {}
+        results: Dict[str, Dict[str, Any]] = {}
+        pending: Dict[str, List[Path]] = {}
+        resumed = 0
+        for division, files in divisions.items():
+            for file_path in files:
+                entry = cached_result(journal, file_path, keep_clauses)
+                if entry is not None and 'error' not in entry:
+                    results[str(file_path)] = entry['plan']
+                    resumed += 1
+                    continue
+                entry = cached_result(cache, file_path, keep_clauses)
+                if entry is not None:
+                    results[str(file_path)] = entry['plan']
+                else:
+                    pending.setdefault(division, []).append(file_path)
+    files_to_parse = sum(len(f) for f in pending.values())
+    if args.resume:
+        print(f"⏯️  Resuming: {resumed} files done by the previous run, {files_to_parse} failed or remaining\n")
+    if args.incremental:
+        print(f"♻️  Parse cache: {len(results) - resumed} unchanged, {files_to_parse} to parse\n")
+
+    # Parse in chunks, divisions concurrently; each finished chunk is journaled
+    # so an interrupted run loses at most the chunks in flight
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    if not args.resume:
+        shutil.rmtree(QUARANTINE_DIR, ignore_errors=True)
+    chunks = [(division, files[start:start + PARSE_CHUNK_SIZE])
+              for division, files in pending.items() for start in range(0, len(files), PARSE_CHUNK_SIZE)]
+    errors: Dict[str, Dict[str, Any]] = {}
+    not_reached: List[str] = []
+    with instr.stage("parse"), open(JOURNAL_FILE, 'a' if args.resume else 'w', encoding='utf-8') as journal_file:
+        # Profile parsing in-process so worker code shows up in the profile
+        workers = 1 if args.profile else min(args.workers, len(chunks))
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(parse_division, division, files, keep_clauses): (division, files)
+                           for division, files in chunks}
+                for future in as_completed(futures):
+                    division, files = futures[future]
+                    try:
+                        chunk_results, chunk_errors = future.result()
+                    except Exception as e:
+                        # The worker itself died (out of memory, killed; the pool is then broken for
+                        # every chunk still in flight). No file raised, so none is journaled or
+                        # quarantined: --resume parses them again.
+                        if not not_reached:
+                            print(f"❌ Worker failed: {type(e).__name__}: {e}")
+                        not_reached.extend(str(f) for f in files)
+                        continue
+                    journal_results(journal_file, version, keep_clauses, chunk_results, chunk_errors)
+                    results.update(chunk_results)
+                    errors.update(chunk_errors)
+        else:
+            for division, files in chunks:
+                chunk_results, chunk_errors = parse_division(division, files, keep_clauses)
+                journal_results(journal_file, version, keep_clauses, chunk_results, chunk_errors)
+                results.update(chunk_results)
+                errors.update(chunk_errors)
+
+    if args.incremental:
+        save_parse_cache(PARSE_CACHE_FILE, version, keep_clauses, results)
+
+    if not_reached:
+        instr.count("filesNotReached", len(not_reached))
+        print(f"❌ {len(not_reached)} files were not parsed because a worker process died; "
+              f"completed chunks are journaled in {JOURNAL_FILE}")
+        print("   Re-run with --resume to parse the rest (try fewer --workers if workers ran out of memory)")
+        return 1
 
-    # Parse all files
-    plans = []
-    for file_path in json_files:
-        print(f"   Parsing: {file_path.name}...")
-        plan_data = parse_json_file(file_path)
-        if plan_data:
-            plans.append(plan_data)
+    # Quarantine failed files and report them
+    if args.resume:
+        for path in results:
+            release_quarantine(Path(path))
+    error_records = [quarantine_file(file_path, errors[str(file_path)]) for file_path in json_files if str(file_path) in errors]
+    with open(ERROR_REPORT_FILE, 'w', encoding='utf-8') as f:
+        dump_json({
+            'metadata': {'source': str(PLAN_ANALYSIS_DIR), 'totalFiles': len(json_files),
+                         'failedFiles': len(error_records), 'resumed': args.resume},
+            'errors': error_records,
+        }, f, indent=2)
+    if error_records:
+        print(f"⚠️  {len(error_records)} files failed to parse and were quarantined in {QUARANTINE_DIR}:")
+        for record in error_records:
+            print(f"   ❌ {record['file']}: {record['errorType']}: {record['message']}")
+        print(f"   Details: {ERROR_REPORT_FILE} (fix the files, then re-run with --resume)\n")
+
+    # Results are kept in division order, then file order
+    plans = [copy.deepcopy(results[str(file_path)]) for file_path in json_files if results.get(str(file_path))]
+
+    # Every clause goes to the SQLite store and threshold index only, not the JSON output
+    clauses_by_plan = [plan.pop('clauses', []) for plan in plans]
+
+    instr.count("filesDiscovered", len(json_files))
+    instr.count("filesParsed", files_to_parse - len(errors))
+    instr.count("filesFromCache", len(json_files) - files_to_parse)
+    instr.count("filesFailed", len(errors))
+    instr.count("plansParsed", len(plans))
 
     print(f"\n✅ Parsed {len(plans)} plans\n")
 
     # Calculate statistics
     print("📊 Calculating coverage statistics...")
 
-    # Per-plan coverage percentages
-    for plan in plans:
-        coverage = plan['policyCoverage']
-        full = sum(1 for p in coverage.values() if p['coverage'] == 'FULL')
-        limited = sum(1 for p in coverage.values() if p['coverage'] == 'LIMITED')
-        total = len(coverage)
-        percentage = round((full + 0.5 * limited) / total * 100, 1) if total > 0 else 0
-
-        plan['coverageStats'] = {
-            'full': full,
-            'limited': limited,
-            'no': total - full - limited,
-            'total': total,
-            'percentage': percentage,
-        }
-
-    # Global statistics
-    global_stats = {
-        'totalPlans': len(plans),
-        'totalPolicyAreasTracked': len(POLICY_AREAS),
-        'averageCoverage': round(sum(p['coverageStats']['percentage'] for p in plans) / len(plans), 1) if plans else 0,
-    }
-
-    # Compile output
-    output_data = {
-        'metadata': {
-            'source': str(JSON_DIR),
-            'totalFiles': len(json_files),
-            'standardPolicyAreas': POLICY_AREAS,
-        },
-        'globalStats': global_stats,
-        'plans': plans,
-    }
-
-    # Write to JSON
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, indent=2, ensure_ascii=False)
-
-    print(f"✅ Data written to {OUTPUT_FILE}\n")
+    # Per-plan coverage percentages, division and global statistics
+    with instr.stage("aggregate"):
+        output_data = build_analysis(plans, str(PLAN_ANALYSIS_DIR), len(json_files), list(divisions))
+        global_stats = output_data['globalStats']
+        division_stats = output_data['divisionStats']
+        for level in ('full', 'limited', 'no'):
+            instr.count(f"areas{level.title()}", sum(p['coverageStats'][level] for p in plans))
+        instr.gauge("averageCoverage", global_stats['averageCoverage'])
+
+    # Write outputs
+    with instr.stage("save"):
+        with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+            dump_json(output_data, f, indent=2)
+
+        print(f"✅ Data written to {OUTPUT_FILE}\n")
+
+        if args.sqlite:
+            write_store(args.sqlite, output_data, clauses_by_plan)
+            print(f"✅ SQLite store written to {args.sqlite} ({sum(len(c) for c in clauses_by_plan)} clauses)\n")
+
+        if args.snapshot:
+            size = write_snapshot(args.snapshot, output_data)
+            print(f"✅ Binary snapshot written to {args.snapshot} ({size:,} bytes)\n")
+
+        if args.shards:
+            try:
+                manifest = write_shards(args.shards, output_data)
+            except FileExistsError as e:
+                print(f"❌ {e}")
+                return 1
+            print(f"✅ Plan shards written to {args.shards} ({manifest['written']} of {len(manifest['plans'])} changed)\n")
+
+        if args.history:
+            record = CoverageHistory(args.history).append(output_data, timestamp=build_timestamp())
+            print(f"✅ History run {record['run']} appended to {args.history} ({record['kind']}, {record['bytes']:,} bytes)\n")
+
+        if args.cube:
+            cube = CoverageCube()
+            if args.cube.exists():
+                with open(args.cube, 'r', encoding='utf-8') as f:
+                    cube = CoverageCube.from_dict(json.load(f))
+            changes = cube.update(output_data)
+            args.cube.parent.mkdir(parents=True, exist_ok=True)
+            with open(args.cube, 'w', encoding='utf-8') as f:
+                dump_json(cube.to_dict(), f, separators=(",", ":"))
+            print(f"✅ Coverage cube written to {args.cube} ({len(cube.cells):,} cells; "
+                  f"{changes['added']} added, {changes['changed']} changed, {changes['removed']} removed)\n")
+
+        if args.thresholds:
+            index = ThresholdIndex(extract_plan_thresholds(plans, clauses_by_plan))
+            args.thresholds.parent.mkdir(parents=True, exist_ok=True)
+            with open(args.thresholds, 'w', encoding='utf-8') as f:
+                dump_json(index.to_dict(), f, separators=(",", ":"))
+            instr.count("thresholdValues", len(index.records))
+            print(f"✅ Threshold index written to {args.thresholds} ({len(index.records):,} values)\n")
 
     # Display summary
     print("📊 Summary:")
@@ -330,6 +586,13 @@ def main():
     print("═" * 90)
     print()
 
+    print("📊 Division Coverage:")
+    print("═" * 90)
+    for division, stats in division_stats.items():
+        print(f"   {division[:40]:42} | Plans: {stats['totalPlans']:3} | Avg Coverage: {stats['averageCoverage']:5.1f}%")
+    print("═" * 90)
+    print()
+
     # Display top/bottom plans by coverage
     print("📊 Plan Coverage Ranking:")
     print("═" * 90)
@@ -345,5 +608,17 @@ def main():
     return 0
 
 
+def main():
+    args = parse_args()
+    instr = Instrumentation.from_args(args, "parse-json-plans")
+    status = 1
+    try:
+        status = run(args, instr)
+    finally:
+        # Failed and crashed runs are reported too (sgm_run_success 0, last failure time)
+        instr.finish(OUTPUT_FILE, success=status == 0)
+    return status
+
+
 if __name__ == '__main__':
     exit(main())
@@ -0,0 +1,427 @@
+"""
+Pipeline DAG
+
+Declares the Python pipeline stages with their inputs and outputs and runs
+them as a dependency graph:
+- dependencies are derived from outputs -> inputs (no hand-maintained order)
+- a stage is skipped when the content fingerprint of its inputs (data files
+  and the code it runs) matches the last successful run and its outputs exist
+- independent stages run concurrently
+- every stage reports its wall time
+
+Paths are relative to the repository root and may use placeholders:
+    {archive}      ARCHIVE_ROOT (client archive)
+    {output}       analysis output directory (SGM_OUTPUT_DIR, default scripts/output)
+    {workbooks}    workbook output directory (SGM_WORKBOOK_DIR, default .)
+    {mapping_csv}  readout deliverables mapping CSV (MAPPING_CSV)
+    {policies}     policy DOCX folder (POLICIES_PATH, default {archive}/CLIENT_DELIVERY_PACKAGE/02_POLICIES)
+    {policy_library}  markdown policy library (POLICY_LIBRARY_DIR, default lib/data/policies)
+
+The same placeholders are passed to every stage script as environment
+variables, so one graph definition serves any tenant's archive and outputs.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from file_watch import pattern_matches
+from reproducible import SOURCE_DATE_EPOCH_ENV
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_OUTPUT_DIR = "scripts/output"
+STATE_FILE_NAME = ".pipeline-state.json"
+
+# Placeholder -> environment variable read by the stage scripts
+CONTEXT_ENV = {
+    "archive": "ARCHIVE_ROOT",
+    "output": "SGM_OUTPUT_DIR",
+    "workbooks": "SGM_WORKBOOK_DIR",
+    "mapping_csv": "MAPPING_CSV",
+    "policies": "POLICIES_PATH",
+    "policy_library": "POLICY_LIBRARY_DIR",
+    "tenant": "SGM_TENANT",
+}
+
+# Stage definitions: script to run, files it reads, files it writes
+STAGES = {
+    "parse-json-plans": {
+        "script": "scripts/parse-json-plans.py",
+        "args": ["--incremental", "--sqlite"],
+        "inputs": [
+            "{archive}/Analysis/Comp Analysis/plan_analysis/**/plan*_clause_extract.json",
+            # The script and every local module that shapes its outputs
+            "scripts/parse-json-plans.py",
+            "scripts/policy_taxonomy.py",
+            "scripts/clause_schema.py",
+            "scripts/clause_thresholds.py",
+            "scripts/coverage_model.py",
+            "scripts/coverage_cube.py",
+            "scripts/coverage_history.py",
+            "scripts/coverage_snapshot.py",
+            "scripts/analysis_store.py",
+            "scripts/plan_shards.py",
+            "scripts/reproducible.py",
+        ],
+        "outputs": ["{output}/json-plan-analysis.json", "{output}/parse-errors.json", "{output}/json-plan-analysis.db"],
+    },
+    "explore-excel": {
+        "script": "scripts/explore-excel.py",
+        "inputs": [
+            "{archive}/Analysis/Comp Analysis/workbooks/master/BHG_01_HS_Comp_Plan_Analysis_FINAL.xlsx",
+            "scripts/explore-excel.py",
+        ],
+        "outputs": [],  # Prints a workbook overview (see logs/explore-excel.log)
+    },
+    "profile-workbook": {
+        "script": "scripts/profile-workbook.py",
+        "inputs": [
+            "{archive}/Analysis/Comp Analysis/workbooks/master/BHG_01_HS_Comp_Plan_Analysis_FINAL.xlsx",
+            "scripts/profile-workbook.py",
+        ],
+        "outputs": ["{output}/workbook-profile.json"],
+    },
+    "ingest-coverage-workbook": {
+        "script": "scripts/ingest-coverage-workbook.py",
+        "inputs": [
+            "{archive}/Analysis/Comp Analysis/workbooks/master/BHG_01_HS_Comp_Plan_Analysis_FINAL.xlsx",
+            "scripts/ingest-coverage-workbook.py",
+            "scripts/coverage_model.py",
+            "{output}/json-plan-analysis.json",
+        ],
+        "outputs": ["{output}/workbook-plan-analysis.json", "{output}/coverage-conflicts.json"],
+    },
+    "read-draft-policies": {
+        "script": "scripts/read-draft-policies.py",
+        "inputs": [
+            "{archive}/CLIENT_DELIVERY_PACKAGE/02_POLICIES/DRAFT_FOR_REVIEW/*_DRAFT.docx",
+            "scripts/read-draft-policies.py",
+        ],
+        "outputs": ["{output}/draft-policies-summary.json"],
+    },
+    "build-policy-matrix": {
+        "script": "scripts/build-policy-matrix.py",
+        "args": ["--formats", "all"],
+        "inputs": [
+            "{output}/json-plan-analysis.json",
+            "scripts/build-policy-matrix.py",
+            "scripts/policy_matrix.py",
+            "scripts/policy_taxonomy.py",
+            "scripts/adoption_simulator.py",
+            "scripts/rollout_planner.py",
+            "scripts/matrix_export.py",
+            "scripts/reproducible.py",
+        ],
+        "outputs": [
+            # The .parquet sibling is only written when pyarrow is installed, so it is not declared
+            "{workbooks}/Demo_Client_Policy_Coverage_Matrix.xlsx",
+            "{workbooks}/Demo_Client_Policy_Coverage_Matrix.csv",
+            "{workbooks}/Demo_Client_Policy_Coverage_Matrix.columns.json",
+            "{workbooks}/Demo_Client_Policy_Coverage_Matrix.html",
+            "{output}/policy-adoption-simulation.json",
+        ],
+    },
+    "enhance-mapping": {
+        "script": "scripts/enhance-mapping.py",
+        "inputs": [
+            "{output}/json-plan-analysis.json",
+            "{output}/json-plan-analysis.db",
+            "{mapping_csv}",
+            "scripts/enhance-mapping.py",
+            "scripts/analysis_store.py",
+            "scripts/policy_taxonomy.py",
+            "scripts/risk_engine.py",
+            "scripts/reproducible.py",
+        ],
+        "outputs": ["{workbooks}/Demo_Client_Deliverables_Mapping_CORRECTED.xlsx"],
+    },
+    # Opt-in (run-pipeline --only / watch-pipeline --include extract-policies-to-markdown): the default library is tracked in git
+    "extract-policies-to-markdown": {
+        "script": "scripts/extract-policies-to-markdown.py",
+        "default": False,
+        "inputs": [
+            "{policies}/*.docx",
+            "{policies}/DRAFT_FOR_REVIEW/*_DRAFT.docx",
+            "scripts/extract-policies-to-markdown.py",
+        ],
+        "outputs": ["{policy_library}/index.json"],
+    },
+}
+
+
+def default_context() -> Dict[str, str]:
+    """Placeholder values for a single-tenant run, honoring the environment."""
+    archive = os.environ.get("ARCHIVE_ROOT", "data/demo-client-archive")
+    return {
+        "archive": archive,
+        "output": os.environ.get("SGM_OUTPUT_DIR", DEFAULT_OUTPUT_DIR),
+        "workbooks": os.environ.get("SGM_WORKBOOK_DIR", "."),
+        "mapping_csv": os.environ.get("MAPPING_CSV", "Demo_Client_Readout_Deliverables_Mapping.csv"),
+        "policies": os.environ.get("POLICIES_PATH", os.path.join(archive, "CLIENT_DELIVERY_PACKAGE/02_POLICIES")),
+        "policy_library": os.environ.get("POLICY_LIBRARY_DIR", "lib/data/policies"),
+        "tenant": os.environ.get("SGM_TENANT", "default"),
+    }
+
+
+def context_env(context: Dict[str, str]) -> Dict[str, str]:
+    """Environment for stage scripts: the current environment plus the context variables."""
+    env = dict(os.environ)
+    env.update({CONTEXT_ENV[key]: str(value) for key, value in context.items() if key in CONTEXT_ENV})
+    return env
+
+
+def resolve_stages(context: Optional[Dict[str, str]] = None) -> Dict[str, Dict[str, Any]]:
+    """Substitute path placeholders and derive each stage's upstream dependencies."""
+    context = context or default_context()
+    stages = {}
+    for name, spec in STAGES.items():
+        stages[name] = {
+            "name": name,
+            "script": spec["script"],
+            "args": list(spec.get("args", [])),
+            "inputs": [os.path.normpath(pattern.format(**context)) for pattern in spec["inputs"]],
+            "outputs": [os.path.normpath(path.format(**context)) for path in spec["outputs"]],
+            "default": spec.get("default", True),
+        }
+
+    producers = {output: name for name, stage in stages.items() for output in stage["outputs"]}
+    for name, stage in stages.items():
+        stage["deps"] = sorted({producers[p] for p in stage["inputs"] if p in producers and producers[p] != name})
+    return stages
+
+
+def default_stages(stages: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """The stages a plain run includes (opt-in stages only run when named with --only or --include)."""
+    return {name: stage for name, stage in stages.items() if stage["default"]}
+
+
+def topological_order(stages: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Stage names ordered so every stage follows its dependencies."""
+    order, state = [], {}
+
+    def visit(name: str):
+        if state.get(name) == "done":
+            return
+        if state.get(name) == "visiting":
+            raise ValueError(f"Pipeline has a dependency cycle at stage '{name}'")
+        state[name] = "visiting"
+        for dep in stages[name]["deps"]:
+            visit(dep)
+        state[name] = "done"
+        order.append(name)
+
+    for name in stages:
+        visit(name)
+    return order
+
+
+def select_stages(stages: Dict[str, Dict[str, Any]], names: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Restrict the graph to the named stages plus everything they depend on."""
+    selected = set()
+    pending = list(names)
+    while pending:
+        name = pending.pop()
+        if name not in stages:
+            raise KeyError(f"Unknown stage: {name}")
+        if name not in selected:
+            selected.add(name)
+            pending.extend(stages[name]["deps"])
+    return {name: stage for name, stage in stages.items() if name in selected}
+
+
+def downstream_stages(stages: Dict[str, Dict[str, Any]], names: List[str]) -> List[str]:
+    """The named stages plus every stage that (transitively) depends on them, in run order."""
+    affected = set(names)
+    for name in topological_order(stages):
+        if any(dep in affected for dep in stages[name]["deps"]):
+            affected.add(name)
+    return [name for name in topological_order(stages) if name in affected]
+
+
+def stages_for_paths(stages: Dict[str, Dict[str, Any]], root: Path, paths: List[str]) -> List[str]:
+    """Stages with an input pattern matching any of the paths (absolute or relative to root)."""
+    absolute = [os.path.normpath(os.path.join(root, path)) for path in paths]
+    return [
+        name for name, stage in stages.items()
+        if any(pattern_matches(os.path.normpath(os.path.join(root, pattern)), path)
+               for pattern in stage["inputs"] for path in absolute)
+    ]
+
+
+class FileHasher:
+    """SHA-256 of files, re-hashing only when size or mtime changed since last seen."""
+
+    def __init__(self, cache: Optional[Dict[str, List]] = None):
+        self.cache = cache or {}
+
+    def digest(self, path: Path) -> Optional[str]:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        key = str(path)
+        cached = self.cache.get(key)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                sha.update(block)
+        digest = sha.hexdigest()
+        self.cache[key] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest
+
+
+def expand_inputs(root: Path, patterns: List[str]) -> List[Path]:
+    """Expand input glob patterns to a sorted list of existing files."""
+    files = set()
+    for pattern in patterns:
+        for match in glob.glob(str(root / pattern), recursive=True):
+            if os.path.isfile(match):
+                files.add(Path(match))
+    return sorted(files)
+
+
+def stage_fingerprint(root: Path, stage: Dict[str, Any], hasher: FileHasher) -> str:
+    """Fingerprint of a stage's script, arguments, build timestamp and input file contents."""
+    sha = hashlib.sha256()
+    sha.update(json.dumps([stage["script"], stage["args"]]).encode())
+    # A different pinned build time changes the dates stamped into outputs
+    sha.update(os.environ.get(SOURCE_DATE_EPOCH_ENV, "").encode())
+    for path in expand_inputs(root, stage["inputs"]):
+        sha.update(os.path.relpath(path, root).encode())
+        sha.update((hasher.digest(path) or "").encode())
+    return sha.hexdigest()
+
+
+def load_state(state_file: Path) -> Dict[str, Any]:
+    if state_file.exists():
+        with open(state_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {"stages": {}, "files": {}}
+
+
+def save_state(state_file: Path, state: Dict[str, Any]):
+    state_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp = state_file.with_suffix(".tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    tmp.replace(state_file)
+
+
+def run_stage_process(root: Path, stage: Dict[str, Any], env: Dict[str, str], log_dir: Path) -> tuple[int, float]:
+    """Run one stage script to completion, logging its output. Returns (returncode, seconds)."""
+    log_dir.mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
+    with open(log_dir / f"{stage['name']}.log", 'w', encoding='utf-8') as log:
+        result = subprocess.run(
+            [sys.executable, stage["script"], *stage["args"]],
+            cwd=root, env=env, stdout=log, stderr=subprocess.STDOUT,
+        )
+    return result.returncode, time.perf_counter() - started
+
+
+def run_pipeline(
+    stages: Dict[str, Dict[str, Any]],
+    root: Path = REPO_ROOT,
+    output_dir: str = DEFAULT_OUTPUT_DIR,
+    env: Optional[Dict[str, str]] = None,
+    force: bool = False,
+    jobs: int = 4,
+    dry_run: bool = False,
+    on_event=None,
+) -> List[Dict[str, Any]]:
+    """
+    Run the stage graph, skipping up-to-date stages and running ready stages concurrently.
+
+    A stage becomes ready once all of its dependencies finished; its
+    fingerprint is taken at that moment, so a dependency that re-ran but
+    produced identical output does not force a re-run downstream. In a dry
+    run nothing is re-run, so every stage downstream of one that would run
+    is reported as would run too. A failed stage loses its stored
+    fingerprint, so it runs again next time even if its inputs revert.
+
+    Returns:
+        One result per stage: name, status (ran/skipped/failed/blocked/pending), seconds
+    """
+    env = dict(os.environ if env is None else env)
+    state_file = root / output_dir / STATE_FILE_NAME
+    log_dir = root / output_dir / "logs"
+    state = load_state(state_file)
+    hasher = FileHasher(state.get("files"))
+    notify = on_event or (lambda result: None)
+
+    order = topological_order(stages)
+    results = {name: {"name": name, "status": "pending", "seconds": 0.0} for name in order}
+    done, failed, would_run = set(), set(), set()
+    running = {}
+
+    def start_ready(pool):
+        # Skips can unlock further stages immediately, so sweep until nothing changes
+        progressed = True
+        while progressed:
+            progressed = False
+            for name in order:
+                stage = stages[name]
+                if name in done or name in failed or name in running.values():
+                    continue
+                if any(dep in failed for dep in stage["deps"]):
+                    results[name]["status"] = "blocked"
+                    failed.add(name)
+                    notify(results[name])
+                    progressed = True
+                    continue
+                if not all(dep in done for dep in stage["deps"]):
+                    continue
+
+                progressed = True
+                fingerprint = stage_fingerprint(root, stage, hasher)
+                previous = state["stages"].get(name, {})
+                outputs_exist = all((root / output).exists() for output in stage["outputs"])
+                upstream_would_run = any(dep in would_run for dep in stage["deps"])
+                if not force and not upstream_would_run and previous.get("fingerprint") == fingerprint and outputs_exist:
+                    results[name]["status"] = "skipped"
+                    done.add(name)
+                    notify(results[name])
+                elif dry_run:
+                    # Outputs upstream are not rebuilt, so this fingerprint cannot show what would change
+                    results[name]["status"] = "would run"
+                    done.add(name)
+                    would_run.add(name)
+                    notify(results[name])
+                else:
+                    results[name]["fingerprint"] = fingerprint
+                    running[pool.submit(run_stage_process, root, stage, env, log_dir)] = name
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        start_ready(pool)
+        while running:
+            finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                returncode, seconds = future.result()
+                results[name]["seconds"] = seconds
+                fingerprint = results[name].pop("fingerprint")
+                if returncode == 0:
+                    results[name]["status"] = "ran"
+                    done.add(name)
+                    state["stages"][name] = {"fingerprint": fingerprint}
+                else:
+                    results[name]["status"] = "failed"
+                    results[name]["log"] = str(log_dir / f"{name}.log")
+                    failed.add(name)
+                    state["stages"].pop(name, None)
+                notify(results[name])
+            start_ready(pool)
+
+    if not dry_run:
+        state["files"] = hasher.cache
+        save_state(state_file, state)
+    return [results[name] for name in order]
@@ -0,0 +1,126 @@
+"""
+Per-Plan JSON Shards
+
+Splits the coverage analysis into one compact JSON file per plan plus a
+manifest, so the web app can lazy-load only the plan being viewed:
+
+    scripts/output/plans/manifest.json
+    scripts/output/plans/<planId>.json
+
+Each manifest entry carries the plan's id, name, coverage stats and the
+SHA-256 of its shard file, which doubles as an HTTP ETag. Shards whose
+content is unchanged are not rewritten, and shards of plans that no
+longer exist are removed. Only files listed in the previous manifest are
+ever removed or overwritten, so a shard directory shared with other
+outputs keeps them.
+"""
+
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Any, Set
+
+MANIFEST_NAME = "manifest.json"
+PLAN_ANALYSIS_FOLDER = "plan_analysis"
+PLAN_FILE_SUFFIX = "_clause_extract"
+
+
+def plan_id(source_file: str) -> str:
+    """
+    Stable URL-safe plan ID from the plan's source file.
+
+    'Analysis/Comp Analysis/plan_analysis/medical/plan10_clause_extract.json'
+    becomes 'medical-plan10'.
+    """
+    parts = list(Path(source_file).with_suffix("").parts)
+    if PLAN_ANALYSIS_FOLDER in parts:
+        parts = parts[parts.index(PLAN_ANALYSIS_FOLDER) + 1:]
+    if parts and parts[-1].endswith(PLAN_FILE_SUFFIX):
+        parts[-1] = parts[-1][:-len(PLAN_FILE_SUFFIX)]
+    return re.sub(r"[^a-z0-9]+", "-", "-".join(parts).lower()).strip("-")
+
+
+def assign_plan_ids(plans: List[Dict[str, Any]]) -> List[str]:
+    """
+    Unique plan IDs in plan order: plan_id() of each source file, with
+    '-2', '-3', ... appended to repeats. Every consumer keying plans by ID
+    uses this, so the keys match the shard file names.
+    """
+    ids = []
+    seen: Dict[str, int] = {}
+    for plan in plans:
+        base_id = plan_id(plan.get('sourceFile') or plan['planName'])
+        seen[base_id] = seen.get(base_id, 0) + 1
+        ids.append(base_id if seen[base_id] == 1 else f"{base_id}-{seen[base_id]}")
+    return ids
+
+
+def encode_shard(plan: Dict[str, Any]) -> bytes:
+    """Compact JSON encoding of one plan."""
+    return json.dumps(plan, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
+
+
+def previous_shards(shard_dir: Path) -> Set[str]:
+    """Shard file names the existing manifest lists (what an earlier write_shards created)."""
+    try:
+        with open(shard_dir / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+            return {entry['path'] for entry in json.load(f).get('plans', [])}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return set()
+
+
+def write_shards(shard_dir: Path, output_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Write one shard per plan and the manifest.
+
+    Returns:
+        The manifest dict, plus a 'written' count of shards actually rewritten
+
+    Raises:
+        FileExistsError: a shard would overwrite a file the manifest did not write
+    """
+    shard_dir = Path(shard_dir)
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    owned = previous_shards(shard_dir)
+
+    entries: List[Dict[str, Any]] = []
+    written = 0
+    for plan, pid in zip(output_data['plans'], assign_plan_ids(output_data['plans'])):
+        data = encode_shard(dict(plan, planId=pid))
+        digest = hashlib.sha256(data).hexdigest()
+        path = shard_dir / f"{pid}.json"
+        if path.exists() and path.name not in owned:
+            raise FileExistsError(f"{path} exists and is not a plan shard; use a dedicated shard directory")
+        if not path.exists() or hashlib.sha256(path.read_bytes()).hexdigest() != digest:
+            path.write_bytes(data)
+            written += 1
+
+        entries.append({
+            'id': pid,
+            'name': plan['planName'],
+            'division': plan.get('division'),
+            'businessUnit': plan.get('businessUnit'),
+            'coverageStats': plan['coverageStats'],
+            'path': path.name,
+            'bytes': len(data),
+            'hash': digest,
+        })
+
+    # Drop shards of plans that are gone (only ones this module wrote)
+    current = {entry['path'] for entry in entries}
+    for name in owned - current:
+        stale = shard_dir / name
+        if stale.name != MANIFEST_NAME and stale.parent == shard_dir and stale.exists():
+            stale.unlink()
+
+    manifest = {
+        'metadata': output_data.get('metadata', {}),
+        'globalStats': output_data.get('globalStats', {}),
+        'plans': entries,
+    }
+    tmp = shard_dir / f"{MANIFEST_NAME}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    tmp.replace(shard_dir / MANIFEST_NAME)
+    return dict(manifest, written=written)
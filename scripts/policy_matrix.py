@@ -0,0 +1,571 @@
+"""
+Policy Coverage Matrix Workbook
+
+Renders the 6-tab coverage matrix workbook (plus any other matrix formats,
+see matrix_export.py) for one coverage analysis document. Shared by
+build-policy-matrix.py (one workbook) and batch-build-matrices.py (many
+workbooks in a process pool):
+
+    result = build_workbook(plan_data, Path("Acme_Policy_Coverage_Matrix.xlsx"), client="Acme")
+"""
+
+from pathlib import Path
+from openpyxl import Workbook
+from openpyxl.styles import Font, PatternFill, Alignment
+from openpyxl.utils import get_column_letter
+from typing import Dict, List, Any, Optional
+
+from adoption_simulator import simulate_policy_adoption
+from instrumentation import Instrumentation
+from matrix_export import (NOT_ADDRESSED, ColumnarMatrixWriter, CsvMatrixWriter, HtmlMatrixWriter, MatrixWriter,
+                           export_matrix)
+from policy_taxonomy import POLICY_AREAS, area_risk_tier
+from reproducible import build_time, dump_json, save_workbook
+from rollout_planner import plan_rollout
+
+# Client named in sheet titles
+CLIENT_NAME = "Demo Client"
+
+# Matrix output formats (--formats)
+EXPORT_FORMATS = ["xlsx", "csv", "columnar", "html"]
+
+# Adoption simulator tab lists at most this many bundles (the JSON keeps the best per bundle size)
+MAX_SIMULATOR_ROWS = 200
+
+# Mapping of BHG DRAFT policies to policy areas they address
+BHG_POLICY_MAPPING = {
+    "Clawback And Recovery Policy": ["Clawback/Recovery", "Termination/Final Pay"],
+    "Quota Management Policy": ["Quota Management", "Mid-Period Changes"],
+    "Windfall Large Deal Policy": ["Windfall/Large Deals", "Exceptions/Disputes"],
+    "Spif Governance Policy": ["SPIF Governance"],
+    "Section 409A Compliance Policy": ["Compliance (409A, State Wage)", "Payment Timing", "Termination/Final Pay"],
+    "State Wage Law Compliance Policy": ["Compliance (409A, State Wage)", "Payment Timing"],
+}
+
+# Colors
+COLOR_FULL = "C6EFCE"  # Light green
+COLOR_LIMITED = "FFEB9C"  # Light yellow
+COLOR_NO = "FFC7CE"  # Light red
+COLOR_HEADER = "4472C4"  # Blue
+COLOR_ALT_ROW = "F2F2F2"  # Light gray
+
+
+class CoverageSummaryTab(MatrixWriter):
+    """Tab 1: Plan Policy Coverage Summary Matrix"""
+
+    def __init__(self, wb: Workbook, client: str = CLIENT_NAME):
+        self.wb = wb
+        self.client = client
+        self.ws = None
+        self.policy_areas: List[str] = []
+        self.plan_idx = 0
+
+    def begin(self, policy_areas: List[str], plan_count: int):
+        ws = self.ws = self.wb.create_sheet("Plan Coverage Summary", 0)
+        self.policy_areas = policy_areas
+
+        # Title
+        ws['A1'] = f"{self.client} Compensation Plans - Policy Coverage Matrix"
+        ws['A1'].font = Font(bold=True, size=14)
+        ws.merge_cells('A1:R1')
+
+        # Metadata
+        ws['A2'] = f"Total Plans: {plan_count} | Policy Areas: {len(policy_areas)} | Generated: {build_time().strftime('%Y-%m')}"
+        ws['A2'].font = Font(size=10, italic=True)
+        ws.merge_cells('A2:R2')
+
+        # Header row
+        row = 4
+        ws[f'A{row}'] = "Plan Name"
+        ws[f'A{row}'].font = Font(bold=True, color="FFFFFF")
+        ws[f'A{row}'].fill = PatternFill(start_color=COLOR_HEADER, end_color=COLOR_HEADER, fill_type="solid")
+        ws[f'A{row}'].alignment = Alignment(horizontal="left", vertical="center")
+
+        for col_idx, policy in enumerate(policy_areas, start=2):
+            cell = ws[f'{get_column_letter(col_idx)}{row}']
+            cell.value = policy
+            cell.font = Font(bold=True, color="FFFFFF", size=9)
+            cell.fill = PatternFill(start_color=COLOR_HEADER, end_color=COLOR_HEADER, fill_type="solid")
+            cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+
+        # Add Coverage % column
+        ws[f'{get_column_letter(len(policy_areas) + 2)}{row}'] = "Coverage %"
+        ws[f'{get_column_letter(len(policy_areas) + 2)}{row}'].font = Font(bold=True, color="FFFFFF")
+        ws[f'{get_column_letter(len(policy_areas) + 2)}{row}'].fill = PatternFill(start_color=COLOR_HEADER, end_color=COLOR_HEADER, fill_type="solid")
+        ws[f'{get_column_letter(len(policy_areas) + 2)}{row}'].alignment = Alignment(horizontal="center")
+
+    def write_row(self, matrix_row: Dict[str, Any]):
+        ws = self.ws
+        self.plan_idx += 1
+        plan_idx = self.plan_idx
+        row = 4 + plan_idx
+
+        # Plan name
+        ws[f'A{row}'] = matrix_row['planName']
+        ws[f'A{row}'].font = Font(size=10)
+        if plan_idx % 2 == 0:
+            ws[f'A{row}'].fill = PatternFill(start_color=COLOR_ALT_ROW, end_color=COLOR_ALT_ROW, fill_type="solid")
+
+        # Policy coverage
+        for col_idx, matrix_cell in enumerate(matrix_row['cells'], start=2):
+            cell = ws[f'{get_column_letter(col_idx)}{row}']
+            coverage = matrix_cell['coverage']
+            cell.value = coverage
+
+            # Color coding
+            if coverage == "FULL":
+                cell.fill = PatternFill(start_color=COLOR_FULL, end_color=COLOR_FULL, fill_type="solid")
+            elif coverage == "LIMITED":
+                cell.fill = PatternFill(start_color=COLOR_LIMITED, end_color=COLOR_LIMITED, fill_type="solid")
+            else:
+                cell.fill = PatternFill(start_color=COLOR_NO, end_color=COLOR_NO, fill_type="solid")
+
+            cell.alignment = Alignment(horizontal="center", vertical="center")
+            cell.font = Font(size=9, bold=True)
+
+        # Coverage percentage
+        pct_cell = ws[f'{get_column_letter(len(self.policy_areas) + 2)}{row}']
+        pct_cell.value = f"{matrix_row['percentage']}%"
+        pct_cell.alignment = Alignment(horizontal="center")
+        pct_cell.font = Font(size=10, bold=True)
+        if plan_idx % 2 == 0:
+            pct_cell.fill = PatternFill(start_color=COLOR_ALT_ROW, end_color=COLOR_ALT_ROW, fill_type="solid")
+
+    def close(self) -> List[Path]:
+        ws = self.ws
+
+        # Column widths
+        ws.column_dimensions['A'].width = 35
+        for col_idx in range(2, len(self.policy_areas) + 3):
+            ws.column_dimensions[get_column_letter(col_idx)].width = 12
+
+        # Legend
+        legend_row = 4 + self.plan_idx + 3
+        ws[f'A{legend_row}'] = "Legend:"
+        ws[f'A{legend_row}'].font = Font(bold=True)
+        ws[f'B{legend_row}'] = "FULL"
+        ws[f'B{legend_row}'].fill = PatternFill(start_color=COLOR_FULL, end_color=COLOR_FULL, fill_type="solid")
+        ws[f'C{legend_row}'] = "Detailed enforceable policy with thresholds, workflows, SLAs"
+        ws[f'D{legend_row}'] = "LIMITED"
+        ws[f'D{legend_row}'].fill = PatternFill(start_color=COLOR_LIMITED, end_color=COLOR_LIMITED, fill_type="solid")
+        ws[f'E{legend_row}'] = "Mentions policy area but lacks detail or clear process"
+        ws[f'F{legend_row}'] = "NO"
+        ws[f'F{legend_row}'].fill = PatternFill(start_color=COLOR_NO, end_color=COLOR_NO, fill_type="solid")
+        ws[f'G{legend_row}'] = "Silent on policy area or only disclaimer language"
+
+        print(f"✅ Tab 1 created: Plan Coverage Summary ({self.plan_idx} plans x {len(self.policy_areas)} policies)")
+        return []  # Saved with the rest of the workbook
+
+
+class GapDetailsTab(MatrixWriter):
+    """Tab 2: Policy Gap Details"""
+
+    def __init__(self, wb: Workbook):
+        self.wb = wb
+        self.ws = None
+        self.row = 4
+        self.gaps = 0
+
+    def begin(self, policy_areas: List[str], plan_count: int):
+        ws = self.ws = self.wb.create_sheet("Gap Details", 1)
+
+        # Title
+        ws['A1'] = "Policy Gap Analysis - NO and LIMITED Coverage Details"
+        ws['A1'].font = Font(bold=True, size=14)
+        ws.merge_cells('A1:G1')
+
+        # Header
+        headers = ["Plan Name", "Policy Area", "Current Coverage", "What's Missing", "BHG Policy That Addresses This", "Priority", "Risk Impact"]
+        for col_idx, header in enumerate(headers, start=1):
+            cell = ws[f'{get_column_letter(col_idx)}3']
+            cell.value = header
+            cell.font = Font(bold=True, color="FFFFFF")
+            cell.fill = PatternFill(start_color=COLOR_HEADER, end_color=COLOR_HEADER, fill_type="solid")
+            cell.alignment = Alignment(horizontal="center", wrap_text=True)
+
+    def write_row(self, matrix_row: Dict[str, Any]):
+        ws = self.ws
+        for matrix_cell in matrix_row['cells']:
+            coverage = matrix_cell['coverage']
+
+            # Only include NO and LIMITED
+            if coverage not in ["NO", "LIMITED"]:
+                continue
+            row = self.row
+            policy_area = matrix_cell['area']
+            details = matrix_cell['details'][:200] if matrix_cell['details'] is not None else NOT_ADDRESSED
+
+            ws[f'A{row}'] = matrix_row['planName']
+            ws[f'B{row}'] = policy_area
+            ws[f'C{row}'] = coverage
+            ws[f'D{row}'] = details
+
+            # Find BHG policy
+            bhg_policy = ""
+            for policy, areas in BHG_POLICY_MAPPING.items():
+                if policy_area in areas:
+                    bhg_policy = policy
+                    break
+            ws[f'E{row}'] = bhg_policy if bhg_policy else "Not addressed by BHG policies"
+
+            # Priority (HIGH if NO, MEDIUM if LIMITED)
+            priority = "HIGH" if coverage == "NO" else "MEDIUM"
+            ws[f'F{row}'] = priority
+            cell = ws[f'F{row}']
+            if priority == "HIGH":
+                cell.fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
+
+            # Risk impact
+            ws[f'G{row}'] = area_risk_tier(policy_area)
+
+            # Styling
+            for col in range(1, 8):
+                cell = ws[f'{get_column_letter(col)}{row}']
+                cell.alignment = Alignment(vertical="top", wrap_text=True)
+                cell.font = Font(size=9)
+
+            self.row += 1
+        self.gaps = self.row - 4
+
+    def close(self) -> List[Path]:
+        ws = self.ws
+
+        # Column widths
+        ws.column_dimensions['A'].width = 30
+        ws.column_dimensions['B'].width = 20
+        ws.column_dimensions['C'].width = 12
+        ws.column_dimensions['D'].width = 50
+        ws.column_dimensions['E'].width = 30
+        ws.column_dimensions['F'].width = 10
+        ws.column_dimensions['G'].width = 12
+
+        print(f"✅ Tab 2 created: Gap Details ({self.gaps} gaps identified)")
+        return []
+
+
+def create_tab3_bhg_applicability(wb: Workbook, plans: List[Dict]):
+    """Tab 3: BHG Policy Applicability"""
+    ws = wb.create_sheet("BHG Policy Applicability", 2)
+
+    # Title
+    ws['A1'] = "BHG DRAFT Policy Applicability Analysis"
+    ws['A1'].font = Font(bold=True, size=14)
+    ws.merge_cells('A1:F1')
+
+    # Header
+    headers = ["BHG DRAFT Policy", "Policy Areas Addressed", "# Plans Needing This", "Plan Names", "Priority", "Implementation Complexity"]
+    for col_idx, header in enumerate(headers, start=1):
+        cell = ws[f'{get_column_letter(col_idx)}3']
+        cell.value = header
+        cell.font = Font(bold=True, color="FFFFFF")
+        cell.fill = PatternFill(start_color=COLOR_HEADER, end_color=COLOR_HEADER, fill_type="solid")
+        cell.alignment = Alignment(horizontal="center", wrap_text=True)
+
+    # Analyze each BHG policy
+    row = 4
+    for bhg_policy, policy_areas_covered in BHG_POLICY_MAPPING.items():
+        ws[f'A{row}'] = bhg_policy
+        ws[f'B{row}'] = "\n".join(policy_areas_covered)
+
+        # Count plans that need this policy (have NO or LIMITED in covered areas)
+        plans_needing = []
+        for plan in plans:
+            policy_coverage = plan.get('policyCoverage', {})
+            for area in policy_areas_covered:
+                if area in policy_coverage:
+                    coverage = policy_coverage[area]['coverage']
+                    if coverage in ["NO", "LIMITED"]:
+                        plans_needing.append(plan['planName'])
+                        break
+
+        ws[f'C{row}'] = len(plans_needing)
+        ws[f'D{row}'] = "\n".join(plans_needing[:10]) + ("..." if len(plans_needing) > 10 else "")
+
+        # Priority (MUST HAVE if >70% plans need, SHOULD HAVE if 40-70%, NICE TO HAVE if <40%)
+        pct_needing = (len(plans_needing) / len(plans)) * 100
+        if pct_needing > 70:
+            priority = "MUST HAVE"
+            color = "FFC7CE"
+        elif pct_needing > 40:
+            priority = "SHOULD HAVE"
+            color = "FFEB9C"
+        else:
+            priority = "NICE TO HAVE"
+            color = "C6EFCE"
+
+        ws[f'E{row}'] = priority
+        ws[f'E{row}'].fill = PatternFill(start_color=color, end_color=color, fill_type="solid")
+        ws[f'E{row}'].font = Font(bold=True)
+
+        # Complexity (Windfall/Clawback = HIGH, others = MEDIUM)
+        if any(keyword in bhg_policy.lower() for keyword in ["windfall", "clawback", "409a"]):
+            complexity = "HIGH"
+        else:
+            complexity = "MEDIUM"
+        ws[f'F{row}'] = complexity
+
+        # Styling
+        for col in range(1, 7):
+            cell = ws[f'{get_column_letter(col)}{row}']
+            cell.alignment = Alignment(vertical="top", wrap_text=True)
+            cell.font = Font(size=9)
+
+        row += 1
+
+    # Column widths
+    ws.column_dimensions['A'].width = 35
+    ws.column_dimensions['B'].width = 30
+    ws.column_dimensions['C'].width = 15
+    ws.column_dimensions['D'].width = 40
+    ws.column_dimensions['E'].width = 15
+    ws.column_dimensions['F'].width = 20
+
+    print(f"✅ Tab 3 created: BHG Policy Applicability ({len(BHG_POLICY_MAPPING)} policies analyzed)")
+
+
+def create_tab4_plan_details(wb: Workbook, plans: List[Dict], client: str = CLIENT_NAME):
+    """Tab 4: Plan Details Inventory"""
+    ws = wb.create_sheet("Plan Details", 3)
+
+    # Title
+    ws['A1'] = f"{client} Compensation Plan Inventory"
+    ws['A1'].font = Font(bold=True, size=14)
+    ws.merge_cells('A1:H1')
+
+    # Header
+    headers = ["Plan Name", "Business Unit", "Plan Type", "Coverage %", "Full Policies", "Limited Policies", "No Policies", "Source File"]
+    for col_idx, header in enumerate(headers, start=1):
+        cell = ws[f'{get_column_letter(col_idx)}3']
+        cell.value = header
+        cell.font = Font(bold=True, color="FFFFFF")
+        cell.fill = PatternFill(start_color=COLOR_HEADER, end_color=COLOR_HEADER, fill_type="solid")
+        cell.alignment = Alignment(horizontal="center")
+
+    # Data rows
+    for plan_idx, plan in enumerate(plans, start=1):
+        row = 3 + plan_idx
+
+        ws[f'A{row}'] = plan['planName']
+        ws[f'B{row}'] = plan.get('businessUnit', 'Unknown')
+        ws[f'C{row}'] = plan.get('planType', 'Unknown')
+
+        stats = plan.get('coverageStats', {})
+        ws[f'D{row}'] = f"{stats.get('percentage', 0)}%"
+        ws[f'E{row}'] = stats.get('full', 0)
+        ws[f'F{row}'] = stats.get('limited', 0)
+        ws[f'G{row}'] = stats.get('no', 0)
+        ws[f'H{row}'] = plan.get('sourceFile', '')
+
+        # Styling
+        for col in range(1, 9):
+            cell = ws[f'{get_column_letter(col)}{row}']
+            cell.alignment = Alignment(vertical="center")
+            cell.font = Font(size=9)
+            if plan_idx % 2 == 0:
+                cell.fill = PatternFill(start_color=COLOR_ALT_ROW, end_color=COLOR_ALT_ROW, fill_type="solid")
+
+    # Column widths
+    ws.column_dimensions['A'].width = 35
+    ws.column_dimensions['B'].width = 20
+    ws.column_dimensions['C'].width = 25
+    ws.column_dimensions['D'].width = 12
+    ws.column_dimensions['E'].width = 12
+    ws.column_dimensions['F'].width = 15
+    ws.column_dimensions['G'].width = 12
+    ws.column_dimensions['H'].width = 40
+
+    print(f"✅ Tab 4 created: Plan Details ({len(plans)} plans)")
+
+
+def create_tab5_adoption_simulator(wb: Workbook, simulation: Dict[str, Any]):
+    """Tab 5: What-if coverage for every bundle of BHG DRAFT policies"""
+    ws = wb.create_sheet("Policy Adoption Simulator", 4)
+
+    # Title
+    ws['A1'] = "What-If Policy Adoption Simulator - Coverage by Policy Bundle"
+    ws['A1'].font = Font(bold=True, size=14)
+    ws.merge_cells('A1:H1')
+
+    baseline = simulation['baseline']
+    ws['A2'] = (f"Baseline Avg Coverage: {baseline['averageCoverage']}% | "
+                f"Bundles Evaluated: {simulation['bundlesEvaluated']} (up to {simulation['maxBundleSize']} policies) | "
+                f"Adopted policies lift their areas to FULL for every plan")
+    ws['A2'].font = Font(size=10, italic=True)
+    ws.merge_cells('A2:H2')
+
+    # Header
+    headers = ["Bundle Size", "Policies Adopted", "Areas Lifted to FULL", "Avg Coverage %",
+               "Min Coverage %", "Plans Fully Covered", "Coverage Gain (pts)", "Pareto Optimal"]
+    for col_idx, header in enumerate(headers, start=1):
+        cell = ws[f'{get_column_letter(col_idx)}4']
+        cell.value = header
+        cell.font = Font(bold=True, color="FFFFFF")
+        cell.fill = PatternFill(start_color=COLOR_HEADER, end_color=COLOR_HEADER, fill_type="solid")
+        cell.alignment = Alignment(horizontal="center", wrap_text=True)
+
+    # Best bundles first; smaller bundles win ties
+    frontier = set(simulation['paretoFrontier'])
+    ranked = sorted(range(len(simulation['bundles'])),
+                    key=lambda i: (-simulation['bundles'][i]['averageCoverage'], simulation['bundles'][i]['size']))
+
+    row = 5
+    for bundle_idx in ranked[:MAX_SIMULATOR_ROWS]:
+        bundle = simulation['bundles'][bundle_idx]
+        outcome = simulation['outcomes'][bundle['outcome']]
+
+        ws[f'A{row}'] = bundle['size']
+        ws[f'B{row}'] = "\n".join(bundle['policies']) if bundle['policies'] else "(none - baseline)"
+        ws[f'C{row}'] = "\n".join(outcome['areasLifted'])
+        ws[f'D{row}'] = f"{bundle['averageCoverage']}%"
+        ws[f'E{row}'] = f"{bundle['minCoverage']}%"
+        ws[f'F{row}'] = bundle['plansFullyCovered']
+        ws[f'G{row}'] = bundle['coverageGain']
+        ws[f'H{row}'] = "YES" if bundle_idx in frontier else ""
+
+        # Styling
+        for col in range(1, 9):
+            cell = ws[f'{get_column_letter(col)}{row}']
+            cell.alignment = Alignment(vertical="top", wrap_text=True)
+            cell.font = Font(size=9, bold=bundle_idx in frontier)
+            if bundle_idx in frontier:
+                cell.fill = PatternFill(start_color=COLOR_FULL, end_color=COLOR_FULL, fill_type="solid")
+
+        row += 1
+
+    # Column widths
+    ws.column_dimensions['A'].width = 10
+    ws.column_dimensions['B'].width = 40
+    ws.column_dimensions['C'].width = 35
+    ws.column_dimensions['D'].width = 12
+    ws.column_dimensions['E'].width = 12
+    ws.column_dimensions['F'].width = 12
+    ws.column_dimensions['G'].width = 12
+    ws.column_dimensions['H'].width = 10
+
+    print(f"✅ Tab 5 created: Policy Adoption Simulator ({simulation['bundlesEvaluated']} bundles evaluated)")
+
+
+def create_tab6_rollout_sequence(wb: Workbook, rollout: Dict[str, Any]):
+    """Tab 6: Risk-weighted policy rollout sequence"""
+    ws = wb.create_sheet("Rollout Sequence", 5)
+
+    # Title
+    ws['A1'] = "Policy Rollout Sequence - Risk-Weighted Gap Closure"
+    ws['A1'].font = Font(bold=True, size=14)
+    ws.merge_cells('A1:H1')
+
+    ws['A2'] = (f"Total Gaps: {rollout['totalGaps']} | Total Risk Weight: {rollout['totalWeight']} | "
+                f"Weights: CRITICAL 3, HIGH 2, MEDIUM 1 (x0.5 for LIMITED)")
+    ws['A2'].font = Font(size=10, italic=True)
+    ws.merge_cells('A2:H2')
+
+    # Header
+    headers = ["Step", "Adopt Policy", "Areas Closed", "Gaps Closed", "Risk Weight Closed",
+               "Cumulative Weight", "Cumulative %", "Optimal Weight (same # policies)"]
+    for col_idx, header in enumerate(headers, start=1):
+        cell = ws[f'{get_column_letter(col_idx)}4']
+        cell.value = header
+        cell.font = Font(bold=True, color="FFFFFF")
+        cell.fill = PatternFill(start_color=COLOR_HEADER, end_color=COLOR_HEADER, fill_type="solid")
+        cell.alignment = Alignment(horizontal="center", wrap_text=True)
+
+    row = 5
+    for step in rollout['steps']:
+        ws[f'A{row}'] = step['step']
+        ws[f'B{row}'] = step['policy']
+        ws[f'C{row}'] = "\n".join(step['areasClosed'])
+        ws[f'D{row}'] = step['gapsClosed']
+        ws[f'E{row}'] = step['weightClosed']
+        ws[f'F{row}'] = step['cumulativeWeight']
+        ws[f'G{row}'] = f"{step['cumulativePct']}%"
+        ws[f'H{row}'] = step['optimalWeight'] if step['optimalWeight'] is not None else "n/a"
+
+        # Styling
+        for col in range(1, 9):
+            cell = ws[f'{get_column_letter(col)}{row}']
+            cell.alignment = Alignment(vertical="top", wrap_text=True)
+            cell.font = Font(size=9)
+            if step['step'] % 2 == 0:
+                cell.fill = PatternFill(start_color=COLOR_ALT_ROW, end_color=COLOR_ALT_ROW, fill_type="solid")
+
+        row += 1
+
+    # Column widths
+    ws.column_dimensions['A'].width = 8
+    ws.column_dimensions['B'].width = 35
+    ws.column_dimensions['C'].width = 35
+    ws.column_dimensions['D'].width = 12
+    ws.column_dimensions['E'].width = 15
+    ws.column_dimensions['F'].width = 15
+    ws.column_dimensions['G'].width = 12
+    ws.column_dimensions['H'].width = 18
+
+    print(f"✅ Tab 6 created: Rollout Sequence ({len(rollout['steps'])} steps)")
+
+
+def build_workbook(plan_data: Dict[str, Any], output_file: Path, formats: Optional[List[str]] = None,
+                   client: str = CLIENT_NAME, max_bundle_size: Optional[int] = None,
+                   simulation_file: Optional[Path] = None,
+                   instr: Optional[Instrumentation] = None) -> Dict[str, Any]:
+    """Render one analysis document (json-plan-analysis.json layout) to output_file and its sibling formats.
+
+    Returns the files written plus plan, gap, bundle and rollout step counts.
+    """
+    instr = instr or Instrumentation("policy-matrix")
+    formats = formats or ["xlsx"]
+    plans = plan_data['plans']
+    policy_areas = plan_data['metadata'].get('standardPolicyAreas', POLICY_AREAS)
+
+    # Simulate adoption of every BHG policy bundle
+    with instr.stage("aggregate"):
+        simulation = simulate_policy_adoption(plans, BHG_POLICY_MAPPING, max_bundle_size=max_bundle_size)
+
+        # Plan risk-weighted rollout order
+        rollout = plan_rollout(plans, BHG_POLICY_MAPPING)
+
+    # One pass over the matrix feeds tabs 1-2 and every other requested format
+    with instr.stage("render"):
+        stem = output_file.with_suffix("")
+        writers: List[MatrixWriter] = []
+        wb = None
+        gap_tab = None
+        if "xlsx" in formats:
+            wb = Workbook()
+            wb.remove(wb.active)  # Remove default sheet
+            gap_tab = GapDetailsTab(wb)
+            writers += [CoverageSummaryTab(wb, client), gap_tab]
+        if "csv" in formats:
+            writers.append(CsvMatrixWriter(stem))
+        if "columnar" in formats:
+            writers.append(ColumnarMatrixWriter(stem))
+        if "html" in formats:
+            writers.append(HtmlMatrixWriter(stem, f"{client} Compensation Plans - Policy Coverage Matrix"))
+        outputs = export_matrix(plans, policy_areas, writers)
+
+        if wb is not None:
+            create_tab3_bhg_applicability(wb, plans)
+            create_tab4_plan_details(wb, plans, client)
+            create_tab5_adoption_simulator(wb, simulation)
+            create_tab6_rollout_sequence(wb, rollout)
+
+    with instr.stage("save"):
+        # Write simulation artifact
+        if simulation_file is not None:
+            simulation_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(simulation_file, 'w', encoding='utf-8') as f:
+                dump_json(simulation, f, indent=2)
+            print(f"✅ Simulation written: {simulation_file}")
+
+        # Save workbook
+        if wb is not None:
+            output_file.parent.mkdir(parents=True, exist_ok=True)
+            save_workbook(wb, output_file)
+            outputs.insert(0, output_file)
+
+    return {
+        'outputs': outputs,
+        'plans': len(plans),
+        'gaps': gap_tab.gaps if gap_tab is not None else None,
+        'bundles': simulation['bundlesEvaluated'],
+        'rolloutSteps': len(rollout['steps']),
+    }
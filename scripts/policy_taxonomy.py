@@ -0,0 +1,276 @@
+"""
+Shared Policy Taxonomy
+
+Single source of truth for the 16 standardized policy areas, their stable
+integer IDs, and the alias tables used to map clause policy names and
+deliverable file names onto them.
+
+Coverage can be represented as integer bitsets (bit N = area ID N), so
+cross-plan questions become bitwise operations:
+
+    index = CoverageIndex(plans)
+    index.plans_missing(["Clawback/Recovery", "Termination/Final Pay"])
+    index.areas_no_plan_fully_covers()
+
+IDs are positional: new areas must be APPENDED to POLICY_AREAS, never
+inserted or reordered, so previously stored bitsets stay valid.
+"""
+
+from typing import Dict, Iterable, List, Any
+
+# Standardized 16 policy areas (from approved plan). Index = stable area ID.
+POLICY_AREAS = [
+    "Windfall/Large Deals",
+    "Quota Management",
+    "Territory Management",
+    "Sales Crediting",
+    "Clawback/Recovery",
+    "SPIF Governance",
+    "Termination/Final Pay",
+    "New Hire/Onboarding",
+    "Leave of Absence",
+    "Payment Timing",
+    "Compliance (409A, State Wage)",
+    "Exceptions/Disputes",
+    "Data/Systems/Controls",
+    "Draws/Guarantees",
+    "Mid-Period Changes",
+    "International Requirements",
+]
+
+AREA_IDS = {area: area_id for area_id, area in enumerate(POLICY_AREAS)}
+ALL_AREAS_MASK = (1 << len(POLICY_AREAS)) - 1
+
+# Coverage levels, weakest to strongest
+COVERAGE_LEVELS = ("NO", "LIMITED", "FULL")
+
+# Risk impact of a gap in each area (areas not listed are MEDIUM)
+AREA_RISK_TIERS = {
+    "Windfall/Large Deals": "CRITICAL",
+    "Compliance (409A, State Wage)": "CRITICAL",
+    "Clawback/Recovery": "CRITICAL",
+    "Quota Management": "HIGH",
+    "SPIF Governance": "HIGH",
+    "Termination/Final Pay": "HIGH",
+}
+DEFAULT_RISK_TIER = "MEDIUM"
+
+# Relative weight of closing a gap, by risk tier
+RISK_TIER_WEIGHTS = {
+    "CRITICAL": 3.0,
+    "HIGH": 2.0,
+    "MEDIUM": 1.0,
+}
+
+# Mapping from JSON clause policy names to standardized policy areas
+POLICY_ALIASES = {
+    # Windfall/Large Deals
+    "Windfall Governance": "Windfall/Large Deals",
+    "Large Deal": "Windfall/Large Deals",
+    "Unforecasted Deal": "Windfall/Large Deals",
+
+    # Quota Management
+    "Quota": "Quota Management",
+    "Performance Measurement": "Quota Management",
+    "Goal Setting": "Quota Management",
+
+    # Territory Management
+    "Territory": "Territory Management",
+    "Territory Assignment": "Territory Management",
+    "Account Reassignment": "Territory Management",
+
+    # Sales Crediting
+    "Commission Earned Definition": "Sales Crediting",
+    "Credit Rules": "Sales Crediting",
+    "Crediting": "Sales Crediting",
+    "Revenue Recognition": "Sales Crediting",
+
+    # Clawback/Recovery
+    "Clawback": "Clawback/Recovery",
+    "Recovery": "Clawback/Recovery",
+    "Chargeback": "Clawback/Recovery",
+    "Draw & Chargeback": "Draws/Guarantees",  # Separate: Draws are different
+
+    # SPIF Governance
+    "SPIF": "SPIF Governance",
+    "SPIFFs": "SPIF Governance",
+
+    # Termination/Final Pay
+    "Termination": "Termination/Final Pay",
+    "Separation": "Termination/Final Pay",
+    "Final Pay": "Termination/Final Pay",
+
+    # New Hire/Onboarding
+    "New Hire": "New Hire/Onboarding",
+    "Onboarding": "New Hire/Onboarding",
+    "Ramp": "New Hire/Onboarding",
+
+    # Leave of Absence
+    "Leave of Absence": "Leave of Absence",
+    "LOA": "Leave of Absence",
+
+    # Payment Timing
+    "Payment Timing": "Payment Timing",
+    "Payment Schedule": "Payment Timing",
+
+    # Compliance
+    "409A": "Compliance (409A, State Wage)",
+    "State Wage": "Compliance (409A, State Wage)",
+    "Compliance": "Compliance (409A, State Wage)",
+
+    # Exceptions/Disputes
+    "Dispute Process": "Exceptions/Disputes",
+    "Dispute Resolution": "Exceptions/Disputes",
+    "Exception": "Exceptions/Disputes",
+
+    # Data/Systems/Controls
+    "Data Accuracy": "Data/Systems/Controls",
+    "System": "Data/Systems/Controls",
+
+    # Draws/Guarantees
+    "Draw": "Draws/Guarantees",
+    "Guarantee": "Draws/Guarantees",
+
+    # Mid-Period Changes
+    "Mid-Period Change": "Mid-Period Changes",
+    "Plan Amendment": "Mid-Period Changes",
+
+    # International
+    "International": "International Requirements",
+
+    # Expense (maps to multiple)
+    "Expense Deductions": "Sales Crediting",
+}
+
+# Policy deliverable file name keys to policy areas
+DELIVERABLE_ALIASES = {
+    "CLAWBACK_AND_RECOVERY_POLICY": "Clawback/Recovery",
+    "QUOTA_MANAGEMENT_POLICY": "Quota Management",
+    "WINDFALL_LARGE_DEAL_POLICY": "Windfall/Large Deals",
+    "SPIF_GOVERNANCE_POLICY": "SPIF Governance",
+    "SECTION_409A_COMPLIANCE_POLICY": "Compliance (409A, State Wage)",
+    "STATE_WAGE_LAW_COMPLIANCE_POLICY": "Compliance (409A, State Wage)",
+    "SALES_CREDITING_POLICY": "Sales Crediting",
+    "TERMINATION_POLICY": "Termination/Final Pay",
+    "PAYMENT_TIMING_POLICY": "Payment Timing",
+    "MID_PERIOD_CHANGE_POLICY": "Mid-Period Changes",
+    "LEAVE_OF_ABSENCE_POLICY": "Leave of Absence",
+    "DRAWS_AND_GUARANTEES_POLICY": "Draws/Guarantees",
+    "DISPUTE_RESOLUTION": "Exceptions/Disputes",
+    "EXCEPTION_REQUEST": "Exceptions/Disputes",
+}
+
+
+def map_policy_to_standard(policy_name: str) -> str:
+    """Map JSON policy name to standardized policy area."""
+    # Direct match
+    if policy_name in POLICY_ALIASES:
+        return POLICY_ALIASES[policy_name]
+
+    # Fuzzy match
+    policy_lower = policy_name.lower()
+    for json_name, standard_name in POLICY_ALIASES.items():
+        if json_name.lower() in policy_lower:
+            return standard_name
+
+    # Default to original if no match
+    return policy_name
+
+
+def area_risk_tier(area: str) -> str:
+    """Risk impact tier (CRITICAL/HIGH/MEDIUM) of a gap in the given area."""
+    return AREA_RISK_TIERS.get(area, DEFAULT_RISK_TIER)
+
+
+def area_mask(areas: Iterable[str]) -> int:
+    """Bitset of the given standardized areas (unknown names raise KeyError)."""
+    mask = 0
+    for area in areas:
+        mask |= 1 << AREA_IDS[area]
+    return mask
+
+
+def areas_from_mask(mask: int) -> List[str]:
+    """Standardized area names for the bits set in mask, in ID order."""
+    return [area for area_id, area in enumerate(POLICY_AREAS) if mask >> area_id & 1]
+
+
+def plan_coverage_masks(policy_coverage: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Encode one plan's policyCoverage as FULL/LIMITED/NO area bitsets.
+
+    Areas the plan does not mention count as NO, matching the coverage
+    matrix. Non-standard areas are ignored.
+    """
+    full = limited = 0
+    for area, entry in policy_coverage.items():
+        area_id = AREA_IDS.get(area)
+        if area_id is None:
+            continue
+        if entry['coverage'] == "FULL":
+            full |= 1 << area_id
+        elif entry['coverage'] == "LIMITED":
+            limited |= 1 << area_id
+    return {
+        "FULL": full,
+        "LIMITED": limited,
+        "NO": ALL_AREAS_MASK & ~(full | limited),
+    }
+
+
+class CoverageIndex:
+    """
+    Bitset index over a list of plans in both directions.
+
+    - plan_masks[i][level]: area bitset for plan i
+    - area_plans[level][area_id]: plan bitset (bit i = plan i) for an area
+    """
+
+    def __init__(self, plans: List[Dict[str, Any]]):
+        self.plan_names = [plan['planName'] for plan in plans]
+        self.all_plans_mask = (1 << len(plans)) - 1
+        self.plan_masks = [plan_coverage_masks(plan.get('policyCoverage', {})) for plan in plans]
+
+        self.area_plans = {level: [0] * len(POLICY_AREAS) for level in COVERAGE_LEVELS}
+        for plan_idx, masks in enumerate(self.plan_masks):
+            plan_bit = 1 << plan_idx
+            for level in COVERAGE_LEVELS:
+                mask = masks[level]
+                while mask:
+                    low = mask & -mask
+                    self.area_plans[level][low.bit_length() - 1] |= plan_bit
+                    mask ^= low
+
+    def plans_from_mask(self, mask: int) -> List[str]:
+        """Plan names for the bits set in a plan bitset, in input order."""
+        return [name for plan_idx, name in enumerate(self.plan_names) if mask >> plan_idx & 1]
+
+    def plans_at_level(self, areas: Iterable[str], level: str = "NO") -> int:
+        """Plan bitset of plans whose coverage is `level` in ALL given areas."""
+        result = self.all_plans_mask
+        for area in areas:
+            result &= self.area_plans[level][AREA_IDS[area]]
+        return result
+
+    def plans_missing(self, areas: Iterable[str]) -> List[str]:
+        """Plans with NO coverage in every given area."""
+        return self.plans_from_mask(self.plans_at_level(areas, "NO"))
+
+    def plans_not_fully_covering(self, areas: Iterable[str]) -> List[str]:
+        """Plans lacking FULL coverage in at least one of the given areas."""
+        result = 0
+        for area in areas:
+            result |= self.all_plans_mask & ~self.area_plans["FULL"][AREA_IDS[area]]
+        return self.plans_from_mask(result)
+
+    def areas_no_plan_fully_covers(self) -> List[str]:
+        """Areas where no plan has FULL coverage."""
+        covered = 0
+        for masks in self.plan_masks:
+            covered |= masks["FULL"]
+        return areas_from_mask(ALL_AREAS_MASK & ~covered)
+
+    def level_counts(self, area: str) -> Dict[str, int]:
+        """Number of plans at each coverage level for one area."""
+        area_id = AREA_IDS[area]
+        return {level: self.area_plans[level][area_id].bit_count() for level in COVERAGE_LEVELS}
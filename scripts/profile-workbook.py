@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Profile an Excel Workbook
+
+Streams every sheet of a workbook in openpyxl's read-only mode (rows are
+parsed one at a time, never the whole sheet) and reports per sheet:
+dimensions, the detected header row, per-column value types and null
+rates, and sample rows. Chartsheets are listed without a profile, and a
+sheet that fails to parse is reported with its error instead of aborting
+the run. Sheets are profiled concurrently in worker
+processes. Results are cached by the workbook's SHA-256, so profiling an
+unchanged workbook again only costs hashing it. A missing workbook still
+writes a profile ("found": false, no sheets), so the pipeline stage
+completes and is skipped until the workbook appears.
+
+Usage:
+    python3 scripts/profile-workbook.py [WORKBOOK] [--sheets NAME ...] [--samples 5] [--workers N]
+    python3 scripts/profile-workbook.py --no-cache --report
+
+Output:
+    scripts/output/workbook-profile.json
+    scripts/output/.workbook-profile-cache/<sha256>.json
+"""
+
+import argparse
+import datetime as dt
+import hashlib
+import json
+import os
+import xml.etree.ElementTree as ET
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+import openpyxl
+from openpyxl.chartsheet import Chartsheet
+from openpyxl.utils import get_column_letter
+
+from instrumentation import Instrumentation, add_arguments as add_instrumentation_args
+from reproducible import dump_json
+
+ARCHIVE_ROOT = Path(os.environ.get("ARCHIVE_ROOT", "data/demo-client-archive"))
+EXCEL_FILE = ARCHIVE_ROOT / "Analysis/Comp Analysis/workbooks/master/BHG_01_HS_Comp_Plan_Analysis_FINAL.xlsx"
+OUTPUT_DIR = Path(os.environ.get("SGM_OUTPUT_DIR", Path(__file__).parent / "output"))
+OUTPUT_FILE = OUTPUT_DIR / "workbook-profile.json"
+CACHE_DIR = OUTPUT_DIR / ".workbook-profile-cache"
+
+PROFILE_VERSION = 2  # Bump when the profile format changes; older cache entries are ignored
+HEADER_SCAN_ROWS = 15
+HASH_CHUNK = 1024 * 1024
+TYPE_MAJORITY = 0.9  # Share of non-null values one type needs before a column is typed as it
+
+
+def workbook_hash(path: Path) -> str:
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+# Exact classes openpyxl yields; anything else goes through value_type()
+TYPE_NAMES = {str: "string", int: "int", float: "float", bool: "bool",
+              dt.datetime: "date", dt.date: "date", dt.time: "date", dt.timedelta: "duration"}
+
+
+def sheet_names(path: Path) -> List[str]:
+    """Sheet names from xl/workbook.xml; opening the workbook would also load its shared strings."""
+    with zipfile.ZipFile(path) as archive:
+        root = ET.fromstring(archive.read("xl/workbook.xml"))
+    return [sheet.get("name") for sheet in root.iter() if sheet.tag.endswith("}sheet")]
+
+
+def value_type(value: Any) -> str:
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int"
+    if isinstance(value, float):
+        return "float"
+    if isinstance(value, (dt.datetime, dt.date, dt.time)):
+        return "date"
+    if isinstance(value, dt.timedelta):
+        return "duration"
+    return "string"
+
+
+def is_empty(value: Any) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def json_value(value: Any) -> Any:
+    if isinstance(value, (dt.datetime, dt.date, dt.time)):
+        return value.isoformat()
+    if isinstance(value, dt.timedelta):
+        return value.total_seconds()
+    return value
+
+
+def detect_header(rows: List[tuple]) -> Optional[int]:
+    """Index of the first row that looks like a header: 2+ cells, nearly all text, followed by data."""
+    for idx, row in enumerate(rows):
+        filled = [value for value in row if not is_empty(value)]
+        if len(filled) < 2:
+            continue
+        text = sum(1 for value in filled if isinstance(value, str))
+        if text / len(filled) >= 0.8 and any(any(not is_empty(v) for v in later) for later in rows[idx + 1:]):
+            return idx
+    return None
+
+
+def profile_sheet(path: str, sheet_name: str, samples: int) -> Dict[str, Any]:
+    """Stream one sheet and profile it (runs in a worker process)."""
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet_name]
+        if isinstance(ws, Chartsheet):
+            return {'name': sheet_name, 'type': "chartsheet"}
+        try:
+            declared = ws.calculate_dimension()
+        except ValueError:
+            declared = None  # Sheet written without a <dimension> tag
+        rows = ws.iter_rows(values_only=True)
+
+        # Buffer only the rows needed to find the header
+        head: List[tuple] = []
+        for row in rows:
+            head.append(row)
+            if len(head) >= HEADER_SCAN_ROWS:
+                break
+        header_idx = detect_header(head)
+        header = head[header_idx] if header_idx is not None else ()
+
+        width = 0
+        last_row = 0
+        data_rows = 0
+        nulls: List[int] = []
+        types: List[Dict[str, int]] = []
+        sample_rows: List[List[Any]] = []
+        for row_number, row in enumerate(chain(head, rows), 1):
+            filled_to = len(row)
+            while filled_to and is_empty(row[filled_to - 1]):
+                filled_to -= 1
+            if not filled_to:
+                continue
+            last_row = row_number
+            width = max(width, filled_to)
+            if header_idx is not None and row_number <= header_idx + 1:
+                continue
+
+            data_rows += 1
+            while len(types) < len(row):
+                # A column first seen now was null in every earlier data row
+                types.append({})
+                nulls.append(data_rows - 1)
+            for i, value in enumerate(row):
+                if value is None or (value.__class__ is str and not value.strip()):
+                    nulls[i] += 1
+                else:
+                    kind = TYPE_NAMES.get(value.__class__) or value_type(value)
+                    counts = types[i]
+                    counts[kind] = counts.get(kind, 0) + 1
+            for i in range(len(row), len(types)):
+                nulls[i] += 1
+            if len(sample_rows) < samples:
+                sample_rows.append([json_value(value) for value in row])
+    finally:
+        wb.close()
+
+    columns = []
+    for i in range(width):
+        column_types = types[i] if i < len(types) else {}
+        non_null = sum(column_types.values())
+        col_nulls = nulls[i] if i < len(nulls) else data_rows
+        kind = "empty"
+        if non_null:
+            top, count = max(column_types.items(), key=lambda item: item[1])
+            if count / non_null >= TYPE_MAJORITY:
+                kind = top
+            elif set(column_types) <= {"int", "float"}:
+                kind = "number"
+            else:
+                kind = "mixed"
+        columns.append({
+            'column': get_column_letter(i + 1),
+            'header': json_value(header[i]) if i < len(header) and not is_empty(header[i]) else None,
+            'type': kind,
+            'types': column_types,
+            'nonNull': non_null,
+            'nullRate': round(col_nulls / data_rows, 4) if data_rows else None,
+        })
+
+    return {
+        'name': sheet_name,
+        'type': "worksheet",
+        'dimensions': {'declared': declared, 'rows': last_row, 'columns': width},
+        'headerRow': header_idx + 1 if header_idx is not None else None,
+        'dataRows': data_rows,
+        'columns': columns,
+        'sampleRows': [row[:width] for row in sample_rows],
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Profile every sheet of an Excel workbook (streaming)")
+    parser.add_argument("workbook", nargs="?", type=Path, default=EXCEL_FILE, help=f"Workbook (default: {EXCEL_FILE})")
+    parser.add_argument("--sheets", nargs="+", metavar="NAME", help="Profile only these sheets")
+    parser.add_argument("--samples", type=int, default=5, help="Sample rows per sheet (default: 5)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Sheets profiled concurrently")
+    parser.add_argument("--output", type=Path, default=OUTPUT_FILE, help=f"Profile JSON (default: {OUTPUT_FILE})")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore and do not update the profile cache")
+    add_instrumentation_args(parser)
+    return parser.parse_args()
+
+
+def run(args: argparse.Namespace, instr: Instrumentation) -> int:
+    """The script body. Returns the exit code; main() reports the run either way."""
+
+    if not args.workbook.exists():
+        print(f"⚠️  Workbook not found, nothing to profile: {args.workbook}")
+        with instr.stage("save"):
+            args.output.parent.mkdir(parents=True, exist_ok=True)
+            with open(args.output, 'w', encoding='utf-8') as f:
+                dump_json({'workbook': str(args.workbook), 'found': False, 'sheets': []}, f, indent=2)
+        print(f"✅ Empty profile written to {args.output}")
+        return 0
+
+    print(f"🚀 Profiling {args.workbook}...")
+    with instr.stage("load"):
+        sha = workbook_hash(args.workbook)
+        names = sheet_names(args.workbook)
+    if args.sheets:
+        missing = [name for name in args.sheets if name not in names]
+        if missing:
+            print(f"❌ Sheets not in workbook: {', '.join(missing)}")
+            return 1
+        names = [name for name in names if name in args.sheets]
+
+    # Cached profiles are reused per sheet, keyed by workbook hash and options
+    cache_file = CACHE_DIR / f"{sha}.json"
+    cache: Dict[str, Any] = {}
+    if not args.no_cache and cache_file.exists():
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get('version') == PROFILE_VERSION and cached.get('samples') == args.samples:
+            cache = cached['sheets']
+    pending = [name for name in names if name not in cache]
+    print(f"📋 {len(names)} sheets ({len(names) - len(pending)} cached, {len(pending)} to profile)\n")
+
+    # Failed sheets go into this profile but not the cache, so the next run retries them
+    failed: Dict[str, str] = {}
+    with instr.stage("parse"):
+        workers = 1 if args.profile else min(args.workers, len(pending))
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {name: pool.submit(profile_sheet, str(args.workbook), name, args.samples) for name in pending}
+                for name, future in futures.items():
+                    try:
+                        cache[name] = future.result()
+                    except Exception as e:
+                        failed[name] = f"{type(e).__name__}: {e}"
+        else:
+            for name in pending:
+                try:
+                    cache[name] = profile_sheet(str(args.workbook), name, args.samples)
+                except Exception as e:
+                    failed[name] = f"{type(e).__name__}: {e}"
+    instr.count("sheetsProfiled", len(pending) - len(failed))
+    instr.count("sheetsFailed", len(failed))
+    instr.count("sheetsFromCache", len(names) - len(pending))
+
+    profile = {
+        'workbook': str(args.workbook),
+        'found': True,
+        'sha256': sha,
+        'bytes': args.workbook.stat().st_size,
+        'sheets': [{'name': name, 'error': failed[name]} if name in failed else cache[name] for name in names],
+    }
+    with instr.stage("save"):
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            dump_json(profile, f, indent=2, default=str)
+        if pending and not args.no_cache:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp = cache_file.with_suffix(".tmp")
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'version': PROFILE_VERSION, 'samples': args.samples, 'sheets': cache}, f,
+                          ensure_ascii=False, default=str)
+            tmp.replace(cache_file)
+
+    print("📊 Sheet Profiles:")
+    print("═" * 90)
+    for sheet in profile['sheets']:
+        if 'error' in sheet:
+            print(f"   {sheet['name'][:32]:34} | ❌ {sheet['error'][:50]}")
+            continue
+        if sheet['type'] == "chartsheet":
+            print(f"   {sheet['name'][:32]:34} | chartsheet (not profiled)")
+            continue
+        typed = ", ".join(f"{c['header'] or c['column']}:{c['type']}" for c in sheet['columns'][:4])
+        print(f"   {sheet['name'][:32]:34} | {sheet['dimensions']['rows']:7} rows x {sheet['dimensions']['columns']:3} cols"
+              f" | header row {sheet['headerRow'] or '-':>3} | {typed[:40]}")
+    print("═" * 90)
+    if failed:
+        print(f"⚠️  {len(failed)} sheet(s) could not be profiled: {', '.join(failed)}")
+    print(f"\n✅ Profile written to {args.output}")
+    print("🎉 Workbook profile complete!")
+    return 0
+
+
+def main():
+    args = parse_args()
+    instr = Instrumentation.from_args(args, "profile-workbook")
+    status = 1
+    try:
+        status = run(args, instr)
+    finally:
+        # Failed and crashed runs are reported too (sgm_run_success 0, last failure time)
+        instr.finish(args.output, success=status == 0)
+    return status
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,162 @@
+"""
+Prometheus Textfile Metrics
+
+Renders a run's instrumentation (see instrumentation.py) in the Prometheus
+text exposition format for node-exporter's textfile collector:
+
+    SGM_METRICS_DIR=/var/lib/node_exporter/textfile SGM_TENANT=acme \
+        python3 scripts/parse-json-plans.py
+
+writes sgm_parse-json-plans_acme.prom there, replaced atomically on every
+run so the collector never reads a half-written file. Every series carries
+`script` and `tenant` labels:
+
+    sgm_run_duration_seconds                 gauge      wall time of the run
+    sgm_run_max_rss_bytes                    gauge      peak resident memory
+    sgm_run_success                          gauge      1 if the last run succeeded, 0 if it failed
+    sgm_run_last_success_timestamp_seconds   gauge      when a run last succeeded (alert on staleness)
+    sgm_run_last_failure_timestamp_seconds   gauge      when a run last failed
+    sgm_stage_duration_seconds{stage=...}    histogram  one sample per stage entry
+    sgm_<counter>_total                      counter    instr.count(), e.g. sgm_plans_parsed_total
+    sgm_<gauge>                              gauge      instr.gauge(), e.g. sgm_deliverables_missing
+    sgm_<histogram>                          histogram  instr.observe(), e.g. sgm_docx_extract_seconds
+
+Counters restart with every run; they count work done by the latest run.
+The two timestamps carry over from the previous textfile, so a failed run
+leaves the last success time where it was.
+"""
+
+import os
+import re
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Any, Optional
+
+METRICS_ENV = "SGM_METRICS_DIR"
+TENANT_ENV = "SGM_TENANT"
+DEFAULT_TENANT = "default"
+PREFIX = "sgm_"
+
+# Seconds; pipeline stages range from milliseconds to minutes
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+_CAMEL_BOUNDARY = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+_INVALID = re.compile(r"[^a-zA-Z0-9_]")
+RUN_TIMESTAMPS = ("sgm_run_last_success_timestamp_seconds", "sgm_run_last_failure_timestamp_seconds")
+
+
+def metric_name(name: str) -> str:
+    """camelCase instrumentation name -> sgm_snake_case metric name."""
+    return PREFIX + _INVALID.sub("_", _CAMEL_BOUNDARY.sub("_", name)).lower()
+
+
+def current_tenant() -> str:
+    return os.environ.get(TENANT_ENV) or DEFAULT_TENANT
+
+
+def metrics_path(metrics_dir: Path, script: str, tenant: str) -> Path:
+    return Path(metrics_dir) / f"{PREFIX}{script}_{tenant}.prom"
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labels: Dict[str, str]) -> str:
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def histogram_lines(name: str, labels: Dict[str, str], samples: Iterable[float],
+                    buckets: Iterable[float] = DURATION_BUCKETS) -> List[str]:
+    """Cumulative _bucket/_sum/_count lines for one histogram series."""
+    samples = sorted(samples)
+    lines = []
+    seen = 0
+    for bound in list(buckets) + [float("inf")]:
+        while seen < len(samples) and samples[seen] <= bound:
+            seen += 1
+        lines.append(f"{name}_bucket{format_labels(dict(labels, le=format_value(bound)))} {seen}")
+    lines.append(f"{name}_sum{format_labels(labels)} {format_value(round(sum(samples), 6))}")
+    lines.append(f"{name}_count{format_labels(labels)} {len(samples)}")
+    return lines
+
+
+def previous_timestamps(path: Path) -> Dict[str, int]:
+    """Run timestamps from an existing textfile (missing or unreadable file: none)."""
+    values = {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                metric, _, rest = line.partition("{")
+                if metric in RUN_TIMESTAMPS:
+                    values[metric] = int(float(rest.rsplit(" ", 1)[-1]))
+    except (OSError, ValueError):
+        return {}
+    return values
+
+
+def render_metrics(report: Dict[str, Any], stage_samples: Dict[str, List[float]],
+                   histograms: Dict[str, List[float]], tenant: str,
+                   previous: Optional[Dict[str, int]] = None) -> str:
+    """
+    Exposition text for one run report (Instrumentation.report()) plus its samples.
+
+    report['success'] (default True) decides which run timestamp advances; the
+    other keeps its value from previous (see previous_timestamps()).
+    """
+    labels = {'script': report['script'], 'tenant': tenant}
+    success = report.get('success', True)
+    timestamps = dict(previous or {})
+    timestamps[RUN_TIMESTAMPS[0] if success else RUN_TIMESTAMPS[1]] = int(time.time())
+    families: List[tuple] = [
+        ("sgm_run_duration_seconds", "gauge", "Wall time of the last run", [f"sgm_run_duration_seconds{format_labels(labels)} {format_value(report['wallSeconds'])}"]),
+        ("sgm_run_max_rss_bytes", "gauge", "Peak resident memory of the last run", [f"sgm_run_max_rss_bytes{format_labels(labels)} {report['maxRssBytes']}"]),
+        ("sgm_run_success", "gauge", "1 if the last run succeeded, 0 if it failed", [f"sgm_run_success{format_labels(labels)} {int(success)}"]),
+    ]
+    for metric, help_text in zip(RUN_TIMESTAMPS, ("Unix time the last successful run finished",
+                                                  "Unix time the last failed run finished")):
+        if metric in timestamps:
+            families.append((metric, "gauge", help_text, [f"{metric}{format_labels(labels)} {timestamps[metric]}"]))
+
+    if stage_samples:
+        lines = []
+        for stage, samples in stage_samples.items():
+            lines.extend(histogram_lines("sgm_stage_duration_seconds", dict(labels, stage=stage), samples))
+        families.append(("sgm_stage_duration_seconds", "histogram", "Duration of each stage entry", lines))
+
+    for name, value in report['counters'].items():
+        metric = metric_name(name) + "_total"
+        families.append((metric, "counter", f"{name} in the last run", [f"{metric}{format_labels(labels)} {format_value(value)}"]))
+    for name, value in report['gauges'].items():
+        metric = metric_name(name)
+        families.append((metric, "gauge", f"{name} after the last run", [f"{metric}{format_labels(labels)} {format_value(value)}"]))
+    for name, samples in histograms.items():
+        metric = metric_name(name)
+        families.append((metric, "histogram", f"{name} per call in the last run", histogram_lines(metric, labels, samples)))
+
+    out = []
+    for metric, kind, help_text, lines in families:
+        out.append(f"# HELP {metric} {help_text}")
+        out.append(f"# TYPE {metric} {kind}")
+        out.extend(lines)
+    return "\n".join(out) + "\n"
+
+
+def write_textfile(path: Path, text: str):
+    """Atomic replace; the collector only reads *.prom, so the temp name is ignored."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Query Clause Thresholds
+
+Range queries over the threshold index written by
+`parse-json-plans.py --thresholds` (see clause_thresholds.py). Bounds take
+the kind's units: dollars ("1M", "$425K"), percent ("17%") or durations
+("90 days", "6 months"; plain numbers are days).
+
+Usage:
+    python3 scripts/query-thresholds.py money --area "Windfall/Large Deals" --min 1M
+    python3 scripts/query-thresholds.py percent --max 5%
+    python3 scripts/query-thresholds.py duration --area "Clawback/Recovery" --distribution 30 60 90 180
+    python3 scripts/query-thresholds.py money --min 100K --json
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+
+from clause_thresholds import KINDS, ThresholdIndex, parse_quantity
+
+OUTPUT_DIR = Path(os.environ.get("SGM_OUTPUT_DIR", Path(__file__).parent / "output"))
+INPUT_FILE = OUTPUT_DIR / "clause-thresholds.json"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Query money, percent and duration values in plan clauses")
+    parser.add_argument("kind", choices=KINDS, help="Value kind")
+    parser.add_argument("--area", help="Policy area (default: all areas)")
+    parser.add_argument("--min", dest="low", help="Lower bound (inclusive)")
+    parser.add_argument("--max", dest="high", help="Upper bound (inclusive)")
+    parser.add_argument("--distribution", nargs="+", metavar="EDGE", help="Count values between these bucket edges")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--input", type=Path, default=INPUT_FILE, help=f"Threshold index (default: {INPUT_FILE})")
+    return parser.parse_args()
+
+
+def format_value(kind: str, value: float) -> str:
+    if kind == "money":
+        return f"${value:,.0f}"
+    if kind == "percent":
+        return f"{value:g}%"
+    return f"{value:g} days"
+
+
+def main():
+    args = parse_args()
+    if not args.input.exists():
+        print(f"❌ Threshold index not found: {args.input} (run parse-json-plans.py --thresholds first)")
+        return 1
+    try:
+        low = parse_quantity(args.kind, args.low) if args.low else None
+        high = parse_quantity(args.kind, args.high) if args.high else None
+        edges = [parse_quantity(args.kind, edge) for edge in args.distribution or []]
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        index = ThresholdIndex.from_dict(json.load(f))
+    # Clauses whose policy has no standard area keep their own name as area
+    if args.area and not any(args.area in by_area for by_area in index.order.values()):
+        print(f"❌ No values indexed for area: {args.area}")
+        return 1
+
+    if args.distribution:
+        buckets = index.distribution(args.kind, edges, area=args.area)
+        if args.json:
+            print(json.dumps(buckets, indent=2))
+            return 0
+        print(f"📊 {args.kind} distribution ({args.area or 'all areas'}):")
+        print("═" * 90)
+        for bucket in buckets:
+            start = format_value(args.kind, bucket['from']) if bucket['from'] is not None else "-∞"
+            end = format_value(args.kind, bucket['to']) if bucket['to'] is not None else "+∞"
+            print(f"   [{start:>14} .. {end:>14}) {bucket['count']:5}  {'█' * min(bucket['count'], 50)}")
+        print("═" * 90)
+        return 0
+
+    by_plan = index.plans(args.kind, low, high, area=args.area)
+    if args.json:
+        print(json.dumps(by_plan, indent=2, ensure_ascii=False))
+        return 0
+
+    print(f"🔍 {args.kind} values in {args.area or 'all areas'}"
+          f"{' >= ' + format_value(args.kind, low) if low is not None else ''}"
+          f"{' <= ' + format_value(args.kind, high) if high is not None else ''}: "
+          f"{sum(len(r) for r in by_plan.values())} values in {len(by_plan)} plans\n")
+    for pid, records in sorted(by_plan.items()):
+        print(f"📋 {records[0]['planName']} ({pid})")
+        for record in records:
+            comparator = record['comparator'] or ""
+            print(f"   {comparator:2} {format_value(args.kind, record['value']):>14} | {record['area'][:28]:28} | {record['text'][:60]}")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
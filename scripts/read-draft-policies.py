@@ -5,22 +5,25 @@ Read 6 DRAFT BHG Policies
 Extracts text from Word documents and creates summary of policy scope.
 
 Usage:
-    python3 scripts/read-draft-policies.py
+    python3 scripts/read-draft-policies.py [--report | --profile]
 
 Output:
     scripts/output/draft-policies-summary.json
 """
 
-import json
+import argparse
 import os
 from pathlib import Path
 from docx import Document
 from typing import Dict, List, Any
 
+from instrumentation import Instrumentation, add_arguments as add_instrumentation_args
+from reproducible import dump_json
+
 # File paths
 ARCHIVE_ROOT = Path(os.environ.get("ARCHIVE_ROOT", "data/demo-client-archive"))
 DRAFT_DIR = ARCHIVE_ROOT / "CLIENT_DELIVERY_PACKAGE/02_POLICIES/DRAFT_FOR_REVIEW"
-OUTPUT_DIR = Path(__file__).parent / "output"
+OUTPUT_DIR = Path(os.environ.get("SGM_OUTPUT_DIR", Path(__file__).parent / "output"))
 OUTPUT_FILE = OUTPUT_DIR / "draft-policies-summary.json"
 
 # 6 DRAFT policies
@@ -44,9 +47,10 @@ def extract_text_from_docx(file_path: Path) -> str:
         return f"Error reading document: {e}"
 
 
-def analyze_policy(file_path: Path) -> Dict[str, Any]:
+def analyze_policy(file_path: Path, text: str = None) -> Dict[str, Any]:
     """Analyze a policy document and extract key information."""
-    text = extract_text_from_docx(file_path)
+    if text is None:
+        text = extract_text_from_docx(file_path)
 
     # Extract basic info
     policy_name = file_path.stem.replace("_DRAFT", "").replace("_", " ").title()
@@ -89,7 +93,15 @@ def analyze_policy(file_path: Path) -> Dict[str, Any]:
     }
 
 
-def main():
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Summarize the DRAFT policy documents")
+    add_instrumentation_args(parser)
+    return parser.parse_args()
+
+
+def run(args: argparse.Namespace, instr: Instrumentation) -> int:
+    """The script body. Returns the exit code; main() reports the run either way."""
+
     print("🚀 Reading 6 DRAFT BHG policies...")
     print(f"📂 Source: {DRAFT_DIR}\n")
 
@@ -104,11 +116,19 @@ def main():
         file_path = DRAFT_DIR / policy_file
         if not file_path.exists():
             print(f"⚠️  File not found: {policy_file}")
+            instr.count("policiesMissing")
             continue
 
         print(f"📖 Reading: {policy_file}...")
-        policy_data = analyze_policy(file_path)
+        with instr.stage("parse", observe="docxExtractSeconds"):
+            text = extract_text_from_docx(file_path)
+        if text.startswith("Error reading document"):
+            instr.count("extractErrors")
+        with instr.stage("classify"):
+            policy_data = analyze_policy(file_path, text)
         policies.append(policy_data)
+        instr.count("policiesRead")
+        instr.count("wordsExtracted", policy_data['wordCount'])
         print(f"   ✅ {policy_data['wordCount']} words | Applies to: {', '.join(policy_data['applicablePlans'])}")
 
     print(f"\n✅ Read {len(policies)} DRAFT policies\n")
@@ -123,9 +143,10 @@ def main():
     }
 
     # Write to JSON
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, indent=2, ensure_ascii=False)
+    with instr.stage("save"):
+        OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+            dump_json(output_data, f, indent=2)
 
     print(f"✅ Policy summaries written to: {OUTPUT_FILE}\n")
 
@@ -141,5 +162,17 @@ def main():
     return 0
 
 
+def main():
+    args = parse_args()
+    instr = Instrumentation.from_args(args, "read-draft-policies")
+    status = 1
+    try:
+        status = run(args, instr)
+    finally:
+        # Failed and crashed runs are reported too (sgm_run_success 0, last failure time)
+        instr.finish(OUTPUT_FILE, success=status == 0)
+    return status
+
+
 if __name__ == '__main__':
     exit(main())
@@ -0,0 +1,102 @@
+"""
+Reproducible Outputs
+
+With SOURCE_DATE_EPOCH set (seconds since 1970, the reproducible-builds.org
+convention; CI typically uses the last commit time), pipeline artifacts are
+byte-identical for identical inputs, so build and deploy caches can key on
+their content hash:
+
+    SOURCE_DATE_EPOCH=$(git log -1 --format=%ct) python3 scripts/run-pipeline.py --force
+
+- build_time() replaces datetime.now() for dates printed into artifacts
+- save_workbook() pins the XLSX core properties (created/modified) and
+  rewrites the zip with sorted entries, fixed timestamps and permissions
+- dump_json() sorts keys, so bytes never depend on how a dict was assembled
+- the SQLite store (analysis_store.write_store) is always built into a fresh
+  file in plan order with a rollback journal, so it is byte-identical for
+  the same SQLite library version (the header records the library version)
+
+Without SOURCE_DATE_EPOCH, build_time() is the current time and outputs are
+written as before (JSON keys in insertion order).
+"""
+
+import json
+import os
+import re
+import time
+import zipfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, IO, Optional
+
+SOURCE_DATE_EPOCH_ENV = "SOURCE_DATE_EPOCH"
+ZIP_EPOCH = 315532800  # 1980-01-01, the earliest time a zip entry can hold
+CONTENT_TYPES = "[Content_Types].xml"
+CORE_PROPERTIES = "docProps/core.xml"
+CORE_DATES = re.compile(rb"(<dcterms:(?:created|modified)\b[^>]*>)[^<]*(</dcterms:(?:created|modified)>)")
+
+
+def source_date_epoch() -> Optional[int]:
+    """SOURCE_DATE_EPOCH as an int, or None when not reproducing."""
+    value = os.environ.get(SOURCE_DATE_EPOCH_ENV, "").strip()
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{SOURCE_DATE_EPOCH_ENV} must be an integer Unix timestamp, got {value!r}")
+
+
+def is_reproducible() -> bool:
+    return source_date_epoch() is not None
+
+
+def build_timestamp() -> int:
+    """Unix time to stamp into artifacts: SOURCE_DATE_EPOCH, else now."""
+    epoch = source_date_epoch()
+    return int(time.time()) if epoch is None else epoch
+
+
+def build_time() -> datetime:
+    """Local time to print into artifacts; UTC when pinned by SOURCE_DATE_EPOCH."""
+    epoch = source_date_epoch()
+    return datetime.now() if epoch is None else datetime.fromtimestamp(epoch, tz=timezone.utc)
+
+
+def dump_json(data: Any, f: IO[str], **kwargs):
+    """json.dump (ensure_ascii=False unless given) with sorted keys in reproducible mode."""
+    kwargs.setdefault('ensure_ascii', False)
+    if is_reproducible():
+        kwargs['sort_keys'] = True
+    json.dump(data, f, **kwargs)
+
+
+def normalize_zip(path: Path, epoch: int):
+    """Rewrite a zip (XLSX) with sorted entries, one timestamp and fixed permissions."""
+    date_time = time.gmtime(max(epoch, ZIP_EPOCH))[:6]
+    stamp = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(epoch)).encode()
+    with zipfile.ZipFile(path) as archive:
+        entries = {info.filename: archive.read(info) for info in archive.infolist()}
+
+    tmp = path.with_name(path.name + ".tmp")
+    # [Content_Types].xml stays first, as Office writes it
+    names = sorted(entries, key=lambda name: (name != CONTENT_TYPES, name))
+    with zipfile.ZipFile(tmp, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name in names:
+            data = entries[name]
+            if name == CORE_PROPERTIES:
+                data = CORE_DATES.sub(rb"\g<1>" + stamp + rb"\g<2>", data)
+            info = zipfile.ZipInfo(name, date_time=date_time)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.create_system = 3  # Unix, so external_attr is read the same everywhere
+            info.external_attr = 0o644 << 16
+            archive.writestr(info, data)
+    os.replace(tmp, path)
+
+
+def save_workbook(wb, path: Path):
+    """wb.save(path), normalized for byte-identical output in reproducible mode."""
+    wb.save(path)
+    epoch = source_date_epoch()
+    if epoch is not None:
+        normalize_zip(Path(path), epoch)
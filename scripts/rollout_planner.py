@@ -0,0 +1,201 @@
+"""
+Policy Rollout Planner (Weighted Set Cover)
+
+Orders candidate policies so each adoption step closes the most
+risk-weighted plan gaps. A gap is a (plan, area) pair with NO or LIMITED
+coverage (areas a plan does not mention are NO, as in the Gap Details tab),
+weighted by the area's risk tier (CRITICAL/HIGH/MEDIUM) and by severity
+(NO = 1.0, LIMITED = 0.5).
+
+- plan_rollout_greedy: greedy weighted set cover with a lazy max-heap;
+  marginal gains only shrink, so stale heap entries are re-scored on pop.
+- plan_rollout_exact: best policy subset for every step count, via a
+  subset-sum (SOS) transform over 2^k subsets. Used when k is small.
+
+Gaps are aggregated per area before planning, so cost scales with
+plans x areas once and then only with policies x areas.
+"""
+
+import heapq
+from typing import Dict, List, Any, Optional
+
+from policy_taxonomy import AREA_IDS, POLICY_AREAS, RISK_TIER_WEIGHTS, area_mask, area_risk_tier, plan_coverage_masks
+
+# Severity multiplier for a gap, by current coverage level
+GAP_SEVERITY = {
+    "NO": 1.0,
+    "LIMITED": 0.5,
+}
+
+# Exact solver is used when there are at most this many candidate policies
+EXACT_SOLVER_LIMIT = 16
+
+
+def aggregate_gap_weights(plans: List[Dict[str, Any]]) -> tuple[List[float], List[int]]:
+    """
+    Risk-weighted gap total and gap count per area ID across all plans.
+
+    Returns:
+        (weights, counts), each indexed by area ID
+    """
+    weights = [0.0] * len(POLICY_AREAS)
+    counts = [0] * len(POLICY_AREAS)
+    tier_weights = [RISK_TIER_WEIGHTS[area_risk_tier(area)] for area in POLICY_AREAS]
+    for plan in plans:
+        masks = plan_coverage_masks(plan.get('policyCoverage', {}))
+        for level, severity in GAP_SEVERITY.items():
+            mask = masks[level]
+            while mask:
+                low = mask & -mask
+                area_id = low.bit_length() - 1
+                weights[area_id] += tier_weights[area_id] * severity
+                counts[area_id] += 1
+                mask ^= low
+    return weights, counts
+
+
+def _mask_weight(mask: int, weights: List[float]) -> float:
+    total = 0.0
+    while mask:
+        low = mask & -mask
+        total += weights[low.bit_length() - 1]
+        mask ^= low
+    return total
+
+
+def plan_rollout_greedy(
+    weights: List[float],
+    policy_masks: Dict[str, int],
+    costs: Optional[Dict[str, float]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Greedy weighted set cover with lazy heap updates.
+
+    Each step adopts the policy with the best (uncovered gap weight / cost).
+    Policies that would close nothing further are never selected.
+
+    Returns:
+        One record per step: policy, areas newly closed, marginal weight
+    """
+    costs = costs or {}
+    # Max-heap via negated ratios; ties broken by input order for stable output
+    heap = []
+    for order, (policy, mask) in enumerate(policy_masks.items()):
+        gain = _mask_weight(mask, weights)
+        if gain > 0:
+            heap.append((-gain / costs.get(policy, 1.0), order, policy))
+    heapq.heapify(heap)
+
+    covered = 0
+    steps = []
+    while heap:
+        neg_ratio, order, policy = heapq.heappop(heap)
+        new_mask = policy_masks[policy] & ~covered
+        gain = _mask_weight(new_mask, weights)
+        if gain <= 0:
+            continue
+        ratio = gain / costs.get(policy, 1.0)
+        # Stale entry: re-score and push back unless it still beats the next best
+        if heap and ratio < -heap[0][0]:
+            heapq.heappush(heap, (-ratio, order, policy))
+            continue
+        covered |= new_mask
+        steps.append({
+            'policy': policy,
+            'areasClosed': [POLICY_AREAS[i] for i in range(len(POLICY_AREAS)) if new_mask >> i & 1],
+            'weightClosed': gain,
+        })
+    return steps
+
+
+def plan_rollout_exact(weights: List[float], policy_masks: Dict[str, int]) -> List[Dict[str, Any]]:
+    """
+    Optimal policy subset for every subset size (max weighted coverage).
+
+    Areas are grouped by the set of policies addressing them (a k-bit
+    signature). f[m] = weight of signatures contained in m is built with a
+    subset-sum transform; subset S then leaves f[~S] uncovered.
+
+    Returns:
+        One record per size 1..k: best policies and weight covered
+    """
+    policies = list(policy_masks)
+    k = len(policies)
+    full = (1 << k) - 1
+
+    f = [0.0] * (1 << k)
+    for area_id in range(len(POLICY_AREAS)):
+        signature = 0
+        for bit, policy in enumerate(policies):
+            if policy_masks[policy] >> area_id & 1:
+                signature |= 1 << bit
+        f[signature] += weights[area_id]
+    for bit in range(k):
+        step = 1 << bit
+        for m in range(1 << k):
+            if m & step:
+                f[m] += f[m ^ step]
+
+    total = f[full]
+    best: Dict[int, tuple[float, int]] = {}
+    for subset in range(1, 1 << k):
+        size = subset.bit_count()
+        covered = total - f[full ^ subset]
+        if size not in best or covered > best[size][0] + 1e-9:
+            best[size] = (covered, subset)
+
+    return [
+        {
+            'size': size,
+            'policies': [policies[bit] for bit in range(k) if best[size][1] >> bit & 1],
+            'weightCovered': best[size][0],
+        }
+        for size in sorted(best)
+    ]
+
+
+def plan_rollout(
+    plans: List[Dict[str, Any]],
+    policy_mapping: Dict[str, List[str]],
+    costs: Optional[Dict[str, float]] = None,
+    exact_limit: int = EXACT_SOLVER_LIMIT,
+) -> Dict[str, Any]:
+    """
+    Plan the adoption order of candidate policies.
+
+    Returns:
+        Dict with 'totalWeight', 'totalGaps', 'steps' (greedy sequence with
+        cumulative coverage and, for small instances, the exact optimum for
+        the same number of policies) and 'exact' (None when k > exact_limit
+        or when custom costs are given)
+    """
+    weights, counts = aggregate_gap_weights(plans)
+    policy_masks = {policy: area_mask(areas) for policy, areas in policy_mapping.items()}
+    total_weight = sum(weights)
+
+    greedy = plan_rollout_greedy(weights, policy_masks, costs)
+    exact = plan_rollout_exact(weights, policy_masks) if len(policy_masks) <= exact_limit and not costs else None
+    exact_by_size = {entry['size']: entry for entry in exact} if exact else {}
+
+    steps = []
+    cumulative = 0.0
+    for step_no, step in enumerate(greedy, start=1):
+        cumulative += step['weightClosed']
+        optimum = exact_by_size.get(step_no)
+        steps.append({
+            'step': step_no,
+            'policy': step['policy'],
+            'areasClosed': step['areasClosed'],
+            'gapsClosed': sum(counts[AREA_IDS[area]] for area in step['areasClosed']),
+            'weightClosed': round(step['weightClosed'], 1),
+            'cumulativeWeight': round(cumulative, 1),
+            'cumulativePct': round(cumulative / total_weight * 100, 1) if total_weight else 0,
+            'optimalWeight': round(optimum['weightCovered'], 1) if optimum else None,
+        })
+
+    return {
+        'totalWeight': round(total_weight, 1),
+        'totalGaps': sum(counts),
+        'steps': steps,
+        'exact': exact,
+    }
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Run the Client Refresh Pipeline
+
+Runs the Python pipeline stages as a dependency graph (see pipeline_dag.py):
+stages whose inputs are unchanged since the last successful run are skipped,
+independent stages run concurrently, and per-stage wall time is reported.
+
+    parse-json-plans ──┬──> build-policy-matrix
+                       ├──> enhance-mapping
+                       └──> ingest-coverage-workbook
+    read-draft-policies
+    extract-policies-to-markdown   (opt-in: writes the tracked lib/data/policies by default)
+    explore-excel
+    profile-workbook
+
+Usage:
+    python3 scripts/run-pipeline.py                 # run what is out of date
+    python3 scripts/run-pipeline.py --force         # re-run everything
+    python3 scripts/run-pipeline.py --only build-policy-matrix
+    POLICY_LIBRARY_DIR=/tmp/policies python3 scripts/run-pipeline.py --only extract-policies-to-markdown
+    python3 scripts/run-pipeline.py --dry-run       # show what would run
+    python3 scripts/run-pipeline.py --metrics-dir /var/lib/node_exporter/textfile
+    SOURCE_DATE_EPOCH=$(git log -1 --format=%ct) python3 scripts/run-pipeline.py   # byte-identical outputs (see reproducible.py)
+
+Output:
+    Stage outputs as declared in pipeline_dag.STAGES
+    scripts/output/.pipeline-state.json (fingerprints of last successful runs)
+    scripts/output/logs/<stage>.log
+    <metrics-dir>/sgm_<script>_<tenant>.prom (with --metrics-dir or SGM_METRICS_DIR; every stage
+        script also writes its own, see prometheus_metrics.py)
+"""
+
+import argparse
+import time
+
+from instrumentation import Instrumentation, add_arguments as add_instrumentation_args
+from pipeline_dag import (REPO_ROOT, context_env, default_context, default_stages, resolve_stages, run_pipeline,
+                          select_stages)
+
+STATUS_ICONS = {
+    "ran": "✅",
+    "skipped": "⏭️ ",
+    "would run": "🔜",
+    "failed": "❌",
+    "blocked": "⛔",
+    "pending": "…",
+}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the client refresh pipeline")
+    parser.add_argument("--force", action="store_true", help="Re-run every stage regardless of inputs")
+    parser.add_argument("--only", nargs="+", metavar="STAGE", help="Run only these stages (plus their dependencies)")
+    parser.add_argument("--jobs", type=int, default=4, help="Maximum stages to run concurrently (default: 4)")
+    parser.add_argument("--dry-run", action="store_true", help="Report which stages would run without running them")
+    add_instrumentation_args(parser)
+    return parser.parse_args()
+
+
+def print_event(result):
+    icon = STATUS_ICONS.get(result['status'], "•")
+    timing = f" ({result['seconds']:.2f}s)" if result['status'] in ("ran", "failed") else ""
+    print(f"   {icon} {result['name']}: {result['status']}{timing}")
+    if result['status'] == "failed":
+        print(f"      See log: {result['log']}")
+
+
+def main():
+    args = parse_args()
+    instr = Instrumentation.from_args(args, "run-pipeline")
+
+    context = default_context()
+    stages = resolve_stages(context)
+    stages = select_stages(stages, args.only) if args.only else default_stages(stages)
+
+    print("🚀 Running client refresh pipeline...")
+    print(f"📂 Root: {REPO_ROOT}")
+    print(f"📋 Stages: {', '.join(stages)}\n")
+
+    started = time.perf_counter()
+    env = context_env(context)
+    if instr.metrics_dir is not None:
+        # Stage scripts export their own metrics next to the pipeline's
+        env["SGM_METRICS_DIR"] = str(instr.metrics_dir.resolve())
+    results = run_pipeline(stages, output_dir=context['output'], env=env,
+                           force=args.force, jobs=args.jobs, dry_run=args.dry_run, on_event=print_event)
+    elapsed = time.perf_counter() - started
+
+    # Summary
+    print("\n📊 Stage Timing:")
+    print("═" * 90)
+    for result in results:
+        icon = STATUS_ICONS.get(result['status'], "•")
+        print(f"   {icon} {result['name']:30} | {result['status']:10} | {result['seconds']:7.2f}s")
+    print("═" * 90)
+    ran = sum(1 for r in results if r['status'] == "ran")
+    skipped = sum(1 for r in results if r['status'] == "skipped")
+    failed = sum(1 for r in results if r['status'] in ("failed", "blocked"))
+    print(f"   Ran: {ran} | Skipped: {skipped} | Failed/Blocked: {failed} | Wall time: {elapsed:.2f}s")
+    print("═" * 90)
+    print()
+
+    for result in results:
+        if result['status'] in ("ran", "failed"):
+            instr.record(result['name'], result['seconds'])
+    instr.count("stagesRan", ran)
+    instr.count("stagesSkipped", skipped)
+    instr.gauge("stagesFailed", failed)
+    if not args.dry_run:
+        instr.finish(REPO_ROOT / context['output'] / "run-pipeline.json", success=not failed)
+
+    if failed:
+        print("❌ Pipeline finished with failures")
+        return 1
+    print("🎉 Pipeline complete!")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Local Coverage Query Service
+
+Small asyncio HTTP/JSON server over the coverage model. It loads
+json-plan-analysis.json once and answers queries from memory, with an LRU
+response cache. When the pipeline publishes a new analysis (the file's
+mtime or size changes) the model is reloaded and the cache is cleared. If
+the file is missing or unreadable mid-rewrite, the last good model keeps
+serving; until one has loaded, queries get 503.
+
+Endpoints (GET):
+    /health
+    /plans                              plan list with coverage stats
+    /plans/<planId>                     one plan's coverage (IDs as in plan_shards.py)
+    /areas                              plans at each coverage level per standard area
+    /gaps?area=<area>                   plans with NO or LIMITED coverage in an area
+    /plans-needing?policy=<KEY>         plans with NO or LIMITED coverage in a policy's areas: a
+                                        deliverable key (enhance-mapping.py Plans Count) or a
+                                        BHG policy name (policy_matrix.py Tab 3)
+    /plans-needing?area=<a>&area=<b>    ... or in explicit areas (unmentioned areas do not count)
+    /search?q=<text>[&limit=N]          plans whose name, clause details or policy names match
+
+Usage:
+    python3 scripts/serve-coverage.py [--host 127.0.0.1] [--port 8765] [--cache-size 1024]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from plan_shards import assign_plan_ids
+from policy_matrix import BHG_POLICY_MAPPING
+from policy_taxonomy import AREA_IDS, DELIVERABLE_ALIASES, POLICY_AREAS, CoverageIndex
+
+OUTPUT_DIR = Path(os.environ.get("SGM_OUTPUT_DIR", Path(__file__).parent / "output"))
+INPUT_FILE = OUTPUT_DIR / "json-plan-analysis.json"
+
+DEFAULT_SEARCH_LIMIT = 50
+MAX_HEADER_BYTES = 16 * 1024
+REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           503: "Service Unavailable"}
+
+
+class QueryError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class CoverageModel:
+    """In-memory coverage model with the indexes the endpoints need."""
+
+    def __init__(self, output_data: Dict[str, Any], version: str):
+        self.version = version
+        self.data = output_data
+        self.plans = output_data['plans']
+        self.plan_ids = assign_plan_ids(self.plans)
+        self.by_id = dict(zip(self.plan_ids, self.plans))
+        self.index = CoverageIndex(self.plans)
+        # Plan bitset per area of plans that list the area as NO or LIMITED (unmentioned areas excluded)
+        self.needing = [0] * len(POLICY_AREAS)
+        for plan_idx, plan in enumerate(self.plans):
+            for area, entry in plan['policyCoverage'].items():
+                if area in AREA_IDS and entry['coverage'] in ("NO", "LIMITED"):
+                    self.needing[AREA_IDS[area]] |= 1 << plan_idx
+        # Lower-cased searchable text per plan
+        self.search_text = [
+            " ".join([plan['planName'], *(
+                f"{area} {entry.get('originalPolicy') or ''} {entry.get('details') or ''}"
+                for area, entry in plan['policyCoverage'].items()
+            )]).lower()
+            for plan in self.plans
+        ]
+
+    def plan_summary(self, plan_idx: int) -> Dict[str, Any]:
+        plan = self.plans[plan_idx]
+        return {
+            'id': self.plan_ids[plan_idx],
+            'name': plan['planName'],
+            'division': plan.get('division'),
+            'coverageStats': plan['coverageStats'],
+        }
+
+    def plans_in_mask(self, mask: int) -> List[Dict[str, Any]]:
+        return [self.plan_summary(plan_idx) for plan_idx in range(len(self.plans)) if mask >> plan_idx & 1]
+
+    def query(self, path: str, params: Dict[str, List[str]]) -> Any:
+        """Answer one request path; raises QueryError for bad requests."""
+        if path == "/health":
+            return {'status': "ok", 'version': self.version, 'plans': len(self.plans)}
+
+        if path == "/plans":
+            return [self.plan_summary(plan_idx) for plan_idx in range(len(self.plans))]
+
+        if path.startswith("/plans/"):
+            pid = path[len("/plans/"):]
+            if pid not in self.by_id:
+                raise QueryError(404, f"Unknown plan: {pid}")
+            return dict(self.by_id[pid], planId=pid)
+
+        if path == "/areas":
+            return {area: self.index.level_counts(area) for area in POLICY_AREAS}
+
+        if path == "/gaps":
+            area = self._area(params)
+            area_id = AREA_IDS[area]
+            gaps = []
+            for level in ("NO", "LIMITED"):
+                for plan in self.plans_in_mask(self.index.area_plans[level][area_id]):
+                    gaps.append(dict(plan, coverage=level))
+            return {'area': area, 'gaps': gaps}
+
+        if path == "/plans-needing":
+            if params.get('policy'):
+                policy = params['policy'][0]
+                if policy in DELIVERABLE_ALIASES:
+                    areas = [DELIVERABLE_ALIASES[policy]]
+                elif policy in BHG_POLICY_MAPPING:
+                    areas = BHG_POLICY_MAPPING[policy]
+                else:
+                    raise QueryError(404, f"Unknown policy: {policy}")
+            else:
+                areas = params.get('area', [])
+                if not areas:
+                    raise QueryError(400, "Give ?policy=<KEY> or one or more ?area=<area>")
+                for area in areas:
+                    if area not in AREA_IDS:
+                        raise QueryError(404, f"Unknown area: {area}")
+            mask = 0
+            for area in areas:
+                mask |= self.needing[AREA_IDS[area]]
+            return {'areas': areas, 'plans': self.plans_in_mask(mask)}
+
+        if path == "/search":
+            text = (params.get('q') or [""])[0].strip().lower()
+            if not text:
+                raise QueryError(400, "Give ?q=<text>")
+            try:
+                limit = int((params.get('limit') or [DEFAULT_SEARCH_LIMIT])[0])
+            except ValueError:
+                raise QueryError(400, "limit must be an integer")
+            terms = text.split()
+            matches = [
+                self.plan_summary(plan_idx)
+                for plan_idx, haystack in enumerate(self.search_text)
+                if all(term in haystack for term in terms)
+            ]
+            return {'query': text, 'total': len(matches), 'plans': matches[:limit]}
+
+        raise QueryError(404, f"Unknown endpoint: {path}")
+
+    @staticmethod
+    def _area(params: Dict[str, List[str]]) -> str:
+        area = (params.get('area') or [""])[0]
+        if not area:
+            raise QueryError(400, "Give ?area=<area>")
+        if area not in AREA_IDS:
+            raise QueryError(404, f"Unknown area: {area}")
+        return area
+
+
+class CoverageService:
+    """Serves queries from the current model with an LRU response cache."""
+
+    def __init__(self, input_file: Path, cache_size: int):
+        self.input_file = input_file
+        self.cache_size = cache_size
+        self.cache: "OrderedDict[str, tuple[int, bytes]]" = OrderedDict()
+        self.model: Optional[CoverageModel] = None
+        self.stamp = None
+        self.failed_stamp = None
+        self.reload_lock = asyncio.Lock()
+        self.stats = {'requests': 0, 'hits': 0, 'misses': 0, 'reloads': 0}
+
+    def _file_stamp(self):
+        stat = self.input_file.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    @staticmethod
+    def _load(input_file: Path, stamp) -> CoverageModel:
+        with open(input_file, 'r', encoding='utf-8') as f:
+            output_data = json.load(f)
+        return CoverageModel(output_data, version=f"{stamp[0]:x}-{stamp[1]:x}")
+
+    async def current_model(self) -> CoverageModel:
+        """
+        Reload the model (once, off the event loop) if the output file changed.
+
+        A file that is missing or fails to load (e.g. caught mid-rewrite) keeps
+        the last good model; raises QueryError(503) if there is none yet.
+        """
+        try:
+            stamp = self._file_stamp()
+        except OSError:
+            stamp = None
+        if stamp is not None and stamp != self.stamp and stamp != self.failed_stamp:
+            async with self.reload_lock:
+                if stamp != self.stamp and stamp != self.failed_stamp:
+                    try:
+                        model = await asyncio.to_thread(self._load, self.input_file, stamp)
+                    except (OSError, ValueError, KeyError, TypeError) as e:
+                        # Retried once the file changes again
+                        self.failed_stamp = stamp
+                        kept = "keeping the previous model" if self.model is not None else "no model yet"
+                        print(f"⚠️  Could not load {self.input_file} ({kept}): {type(e).__name__}: {e}")
+                    else:
+                        self.model = model
+                        self.stamp = stamp
+                        self.cache.clear()
+                        self.stats['reloads'] += 1
+                        print(f"🔄 Loaded {self.input_file} ({len(self.model.plans)} plans)")
+        if self.model is None:
+            raise QueryError(503, f"No coverage analysis loaded yet from {self.input_file}")
+        return self.model
+
+    async def respond(self, target: str) -> tuple[int, bytes, Optional[str]]:
+        """Status, JSON body and ETag (None without a model) for a request target."""
+        self.stats['requests'] += 1
+        try:
+            model = await self.current_model()
+        except QueryError as e:
+            return e.status, json.dumps({'error': str(e)}, ensure_ascii=False).encode('utf-8'), None
+        key = target
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.cache.move_to_end(key)
+            self.stats['hits'] += 1
+            status, body = cached
+        else:
+            self.stats['misses'] += 1
+            url = urlsplit(target)
+            try:
+                status, result = 200, model.query(unquote(url.path).rstrip("/") or "/", parse_qs(url.query))
+            except QueryError as e:
+                status, result = e.status, {'error': str(e)}
+            if url.path.rstrip("/") == "/health":
+                result = dict(result, cache=dict(self.stats, size=len(self.cache)))
+            body = json.dumps(result, ensure_ascii=False).encode('utf-8')
+            if url.path.rstrip("/") != "/health":
+                self.cache[key] = (status, body)
+                if len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+        return status, body, f'"{model.version}"'
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """One connection; HTTP/1.1 keep-alive until the client closes."""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                lines = head.decode('latin-1').split("\r\n")
+                parts = lines[0].split()
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+                keep_alive = headers.get('connection', "").lower() != "close" and lines[0].endswith("HTTP/1.1")
+
+                etag = None
+                if len(parts) != 3:
+                    status, body = 400, b'{"error": "Malformed request line"}'
+                elif parts[0] != "GET":
+                    status, body = 405, b'{"error": "Only GET is supported"}'
+                else:
+                    status, body, etag = await self.respond(parts[1])
+                    if status == 200 and headers.get('if-none-match') == etag:
+                        status, body = 304, b""
+
+                response = [
+                    f"HTTP/1.1 {status} {REASONS.get(status, 'Error')}",
+                    "Content-Type: application/json; charset=utf-8",
+                    f"Content-Length: {len(body)}",
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}",
+                ]
+                if etag:
+                    response.append(f"ETag: {etag}")
+                writer.write(("\r\n".join(response) + "\r\n\r\n").encode('latin-1') + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve coverage queries over local HTTP")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Port (default: 8765)")
+    parser.add_argument("--input", type=Path, default=INPUT_FILE, help=f"Analysis JSON (default: {INPUT_FILE})")
+    parser.add_argument("--cache-size", type=int, default=1024, help="Cached responses kept (default: 1024)")
+    return parser.parse_args()
+
+
+async def serve(args: argparse.Namespace):
+    service = CoverageService(args.input, args.cache_size)
+    try:
+        await service.current_model()
+    except QueryError as e:
+        print(f"⚠️  {e}; answering 503 until it loads")
+    server = await asyncio.start_server(service.handle, args.host, args.port, limit=MAX_HEADER_BYTES, backlog=1024)
+    print(f"🚀 Serving coverage queries on http://{args.host}:{args.port}/ (Ctrl+C to stop)")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    args = parse_args()
+    if not args.input.exists():
+        print(f"❌ Analysis not found: {args.input} (run parse-json-plans.py first)")
+        return 1
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        print("\n👋 Stopped")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,52 @@
+"""Shared fixtures. The scripts import each other by bare module name, so scripts/ goes on sys.path."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from coverage_model import build_analysis  # noqa: E402
+
+
+def make_plan(name, source, division, coverage, business_unit="Sales", plan_type="Commission"):
+    """A parsed plan in the json-plan-analysis.json layout; coverage maps area -> level."""
+    return {
+        'sourceFile': source,
+        'planName': name,
+        'businessUnit': business_unit,
+        'planType': plan_type,
+        'division': division,
+        'policyCoverage': {
+            area: {'coverage': level, 'details': f"{name}: {area} is {level.lower()}", 'originalPolicy': f"Policy {area}"}
+            for area, level in coverage.items()
+        },
+    }
+
+
+@pytest.fixture
+def plans():
+    return [
+        make_plan("Medical Plan 10", "medical-plan10.json", "Medical", {
+            "Clawback/Recovery": "FULL", "Quota Management": "LIMITED", "Windfall/Large Deals": "NO",
+        }),
+        make_plan("Medical Plan 11", "medical-plan11.json", "Medical", {
+            "Sales Crediting": "FULL", "Payment Timing": "FULL", "Leave of Absence": "LIMITED",
+        }),
+        # Same source file as the first plan: the ID gets a '-2' suffix
+        make_plan("Medical Plan 10 (rev)", "medical-plan10.json", "Medical", {
+            "Clawback/Recovery": "LIMITED",
+        }),
+        # A non-standard area and a plan with no business unit
+        make_plan("Dental Plan 1", "dental-plan1.json", "Dental", {
+            "Territory Management": "NO", "Car Allowance": "FULL",
+        }, business_unit=None),
+    ]
+
+
+@pytest.fixture
+def analysis(plans):
+    return build_analysis(plans, "test", len(plans), ["Medical", "Dental"])
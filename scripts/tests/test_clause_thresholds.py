@@ -0,0 +1,91 @@
+import json
+
+import pytest
+
+from clause_thresholds import ThresholdIndex, extract_plan_thresholds, extract_values, parse_quantity
+
+
+@pytest.mark.parametrize("details, expected", [
+    ("45-60 days", [("duration", 45, ">="), ("duration", 60, "<=")]),
+    ("$425K-$1M", [("money", 425000, ">="), ("money", 1000000, "<=")]),
+    ("between $425K and $1M", [("money", 425000, ">="), ("money", 1000000, "<=")]),
+    ("$1-2M", [("money", 1000000, ">="), ("money", 2000000, "<=")]),
+    ("10-20%", [("percent", 10, ">="), ("percent", 20, "<=")]),
+    ("< $425K or ≥ $425K", [("money", 425000, "<"), ("money", 425000, ">=")]),
+    ("capped at 100%", [("percent", 100, "<=")]),
+    ("within 30 days", [("duration", 30, "<=")]),
+    ("12 fiscal months", [("duration", 360, None)]),
+    ("a 30-day window", [("duration", 30, None)]),
+    ("$5K and $10K bonuses", [("money", 5000, None), ("money", 10000, None)]),
+    ("No thresholds here", []),
+])
+def test_extract_values(details, expected):
+    values = extract_values(details)
+    assert [(value['kind'], value['value'], value['comparator']) for value in values] == expected
+
+
+def test_extract_values_keeps_original_duration():
+    value, = extract_values("Clawback applies for 12 fiscal months after payment")
+    assert value['original'] == "12 fiscal months"
+    assert value['unit'] == "days"
+
+
+@pytest.mark.parametrize("kind, text, expected", [
+    ("percent", "17%", 17),
+    ("percent", "17", 17),
+    ("money", "$425K", 425000),
+    ("money", "1M", 1000000),
+    ("duration", "6 months", 180),
+    ("duration", "90 days", 90),
+    ("duration", "30", 30),
+])
+def test_parse_quantity(kind, text, expected):
+    assert parse_quantity(kind, text) == expected
+
+
+@pytest.mark.parametrize("kind, text", [
+    ("percent", "1M"),
+    ("percent", "$5"),
+    ("money", "5%"),
+    ("duration", "30-60 days"),
+    ("duration", "soon"),
+])
+def test_parse_quantity_rejects_other_units(kind, text):
+    with pytest.raises(ValueError):
+        parse_quantity(kind, text)
+
+
+@pytest.fixture
+def index():
+    plans = [{'planName': "Plan A", 'sourceFile': "plan-a.json"}, {'planName': "Plan B", 'sourceFile': "plan-b.json"}]
+    clauses = [
+        [{'area': "Windfall/Large Deals", 'policy': "Windfall", 'details': "Deals between $425K and $1M need review"},
+         {'area': "Clawback/Recovery", 'policy': "Clawback", 'details': "Recovered within 90 days"}],
+        [{'area': "Windfall/Large Deals", 'policy': "Windfall", 'details': "Deals over $2M are capped at 50%"},
+         {'area': "Payment Timing", 'policy': "Payments", 'details': "Paid within 30 days of close"}],
+    ]
+    return ThresholdIndex(extract_plan_thresholds(plans, clauses))
+
+
+def test_index_range(index):
+    assert [record['value'] for record in index.range("money")] == [425000, 1000000, 2000000]
+    assert [record['value'] for record in index.range("money", low=1000000)] == [1000000, 2000000]
+    assert [record['value'] for record in index.range("money", low=1000000, inclusive=False)] == [2000000]
+    assert [record['value'] for record in index.range("duration", high=30)] == [30]
+    assert [record['planId'] for record in index.range("duration", area="Clawback/Recovery")] == ["plan-a"]
+    assert index.range("percent", area="Payment Timing") == []
+    assert sorted(index.plans("money", low=500000)) == ["plan-a", "plan-b"]
+
+
+def test_index_distribution(index):
+    assert index.distribution("money", [500000, 1000000]) == [
+        {'from': None, 'to': 500000, 'count': 1},
+        {'from': 500000, 'to': 1000000, 'count': 0},
+        {'from': 1000000, 'to': None, 'count': 2},
+    ]
+
+
+def test_index_round_trip(index):
+    restored = ThresholdIndex.from_dict(json.loads(json.dumps(index.to_dict())))
+    assert restored.range("money", 400000, 1500000) == index.range("money", 400000, 1500000)
+    assert restored.distribution("duration", [60]) == index.distribution("duration", [60])
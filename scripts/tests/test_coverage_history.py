@@ -0,0 +1,150 @@
+import copy
+import struct
+
+import pytest
+
+from coverage_history import RECORD, CoverageHistory, compact_state
+from conftest import make_plan
+from coverage_model import build_analysis, plan_coverage_stats
+from policy_taxonomy import POLICY_AREAS
+
+
+def with_level(analysis, plan_idx, area, level):
+    """A copy of the analysis with one plan's area set to a level (stats recomputed)."""
+    changed = copy.deepcopy(analysis)
+    plan = changed['plans'][plan_idx]
+    plan['policyCoverage'][area] = {'coverage': level, 'details': None, 'originalPolicy': None}
+    plan['coverageStats'] = plan_coverage_stats(plan['policyCoverage'])
+    return changed
+
+
+@pytest.fixture
+def large_analysis():
+    """Enough plans that a one-plan change is stored as a delta."""
+    levels = ["FULL", "LIMITED", "NO"]
+    plans = [
+        make_plan(f"Plan {i}", f"plan{i}.json", "Medical",
+                  {area: levels[(i + a) % 3] for a, area in enumerate(POLICY_AREAS) if (i + a) % 4})
+        for i in range(40)
+    ]
+    return build_analysis(plans, "test", len(plans), ["Medical"])
+
+
+@pytest.fixture
+def history(tmp_path):
+    return CoverageHistory(tmp_path / "coverage.sgmhist")
+
+
+def test_empty_history(history):
+    assert history.records() == []
+    assert history.latest_state() is None
+    assert history.global_series() == []
+
+
+def test_base_then_delta(history, large_analysis):
+    analysis = large_analysis
+    first = history.append(analysis, timestamp=100)
+    second_analysis = with_level(analysis, 1, "Quota Management", "FULL")
+    second = history.append(second_analysis, timestamp=200)
+
+    assert (first['kind'], first['run']) == ("BASE", 1)
+    assert (second['kind'], second['run']) == ("DELTA", 2)
+    assert second['bytes'] < first['bytes']
+    assert history.latest_state() == compact_state(second_analysis)
+
+    states = [state for _, state in history.iter_states()]
+    assert states == [compact_state(analysis), compact_state(second_analysis)]
+
+
+def test_series(history, analysis):
+    history.append(analysis, timestamp=100)
+    changed = with_level(analysis, 0, "Windfall/Large Deals", "FULL")
+    history.append(changed, timestamp=200)
+
+    assert history.plan_series("medical-plan10") == [
+        {'run': 1, 'timestamp': 100, 'percentage': analysis['plans'][0]['coverageStats']['percentage']},
+        {'run': 2, 'timestamp': 200, 'percentage': changed['plans'][0]['coverageStats']['percentage']},
+    ]
+    assert [point['coverage'] for point in history.plan_area_series("medical-plan10", "Windfall/Large Deals")] == \
+        ["NO", "FULL"]
+    # The repeated source file gets its own ID
+    assert [point['run'] for point in history.plan_series("medical-plan10-2")] == [1, 2]
+    assert [point['plans'] for point in history.global_series()] == [4, 4]
+    assert [point['run'] for point in history.global_series(since=150)] == [2]
+    assert [point['run'] for point in history.global_series(until=150)] == [1]
+
+
+def test_removed_plan(history, analysis):
+    history.append(analysis, timestamp=100)
+    shrunk = copy.deepcopy(analysis)
+    del shrunk['plans'][3]
+    history.append(shrunk, timestamp=200)
+    assert "dental-plan1" not in history.latest_state()['plans']
+    assert [point['run'] for point in history.plan_series("dental-plan1")] == [1]
+
+
+def test_rebase_interval(tmp_path, large_analysis):
+    analysis = large_analysis
+    history = CoverageHistory(tmp_path / "coverage.sgmhist", rebase_interval=3)
+    levels = ["FULL", "LIMITED", "NO"]
+    kinds = [history.append(with_level(analysis, 1, "Quota Management", levels[run % 3]), timestamp=run)['kind']
+             for run in range(7)]
+    assert kinds == ["BASE", "DELTA", "DELTA", "BASE", "DELTA", "DELTA", "BASE"]
+    # Starting after a rebase replays from that base
+    assert [point['run'] for point in history.global_series(since=4)] == [5, 6, 7]
+
+
+def test_torn_tail_ignored_and_truncated(history, analysis):
+    history.append(analysis, timestamp=100)
+    history.append(with_level(analysis, 1, "Quota Management", "FULL"), timestamp=200)
+    intact = history.records()
+    size = history.path.stat().st_size
+
+    with open(history.path, 'r+b') as f:
+        f.truncate(size - 3)
+    assert history.records() == intact[:1]
+    assert history.latest_state() == compact_state(analysis)
+
+    third = history.append(analysis, timestamp=300)
+    assert third['run'] == 2
+    assert [record['run'] for record in history.records()] == [1, 2]
+    assert history.path.stat().st_size == intact[0]['end'] + third['bytes']
+
+
+def test_partial_header_ignored(history, analysis):
+    history.append(analysis, timestamp=100)
+    with open(history.path, 'ab') as f:
+        f.write(b"\x02\x00\x00")
+    assert len(history.records()) == 1
+    assert history.append(analysis, timestamp=200)['run'] == 2
+
+
+def test_full_rewrite_stored_as_base(history, analysis):
+    history.append(analysis, timestamp=100)
+    renamed = copy.deepcopy(analysis)
+    for plan in renamed['plans']:
+        plan['sourceFile'] = "renamed-" + plan['sourceFile']
+    # Every plan changed: a delta would be larger than half a base
+    assert history.append(renamed, timestamp=200)['kind'] == "BASE"
+    assert history.latest_state() == compact_state(renamed)
+
+
+def test_crc_mismatch_stops_read(history, analysis):
+    history.append(analysis, timestamp=100)
+    history.append(with_level(analysis, 1, "Quota Management", "FULL"), timestamp=200)
+    history.append(with_level(analysis, 1, "Quota Management", "NO"), timestamp=300)
+    second = history.records()[1]
+
+    data = bytearray(history.path.read_bytes())
+    data[second['offset']] ^= 0xFF
+    history.path.write_bytes(bytes(data))
+    assert [record['run'] for record in history.records()] == [1]
+
+
+def test_unknown_kind_stops_read(history, analysis):
+    history.append(analysis, timestamp=100)
+    history.append(analysis, timestamp=200)
+    data = bytearray(history.path.read_bytes())
+    struct.pack_into("<B", data, history.records()[1]['offset'] - RECORD.size, 9)
+    history.path.write_bytes(bytes(data))
+    assert len(history.records()) == 1
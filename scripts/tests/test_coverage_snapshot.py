@@ -0,0 +1,74 @@
+import struct
+
+import pytest
+
+from coverage_snapshot import FORMAT_VERSION, HEADER, MAGIC, CoverageSnapshot, encode_snapshot, write_snapshot
+
+
+def test_round_trip(tmp_path, analysis):
+    path = tmp_path / "coverage.sgmcov"
+    size = write_snapshot(path, analysis)
+    assert path.stat().st_size == size
+
+    with CoverageSnapshot.open(path) as snapshot:
+        assert len(snapshot) == len(analysis['plans'])
+        decoded = snapshot.to_analysis()
+
+    assert decoded['metadata'] == analysis['metadata']
+    assert decoded['globalStats'] == analysis['globalStats']
+    assert decoded['divisionStats'] == analysis['divisionStats']
+    for plan, original in zip(decoded['plans'], analysis['plans']):
+        assert plan['planName'] == original['planName']
+        assert plan['sourceFile'] == original['sourceFile']
+        assert plan.get('businessUnit') == original['businessUnit']
+        assert plan['policyCoverage'] == original['policyCoverage']
+        assert plan['coverageStats'] == original['coverageStats']
+
+
+def test_lookups(analysis):
+    snapshot = CoverageSnapshot(encode_snapshot(analysis))
+    assert snapshot.find_plan("Medical Plan 11") == 1
+    assert snapshot.find_plan("No Such Plan") is None
+    assert snapshot.plan_row(0) == {"Clawback/Recovery": "FULL", "Quota Management": "LIMITED",
+                                    "Windfall/Large Deals": "NO"}
+    assert snapshot.plan_row(3)["Car Allowance"] == "FULL"
+    # Unmentioned areas have code 0
+    codes = snapshot.plan_codes(2)
+    assert codes[snapshot.areas.index("Clawback/Recovery")] == 2
+    assert codes.count(0) == len(codes) - 1
+
+
+def test_plan_index_out_of_range(analysis):
+    snapshot = CoverageSnapshot(encode_snapshot(analysis))
+    with pytest.raises(IndexError):
+        snapshot.plan(len(analysis['plans']))
+    with pytest.raises(IndexError):
+        snapshot.plan_name(-1)
+
+
+def test_empty_analysis():
+    data = {'metadata': {}, 'globalStats': {}, 'divisionStats': {}, 'plans': []}
+    snapshot = CoverageSnapshot(encode_snapshot(data))
+    assert len(snapshot) == 0
+    assert snapshot.to_analysis()['plans'] == []
+
+
+def test_bad_magic(analysis):
+    data = bytearray(encode_snapshot(analysis))
+    data[:len(MAGIC)] = b"NOTCOV"
+    with pytest.raises(ValueError, match="bad magic"):
+        CoverageSnapshot(bytes(data))
+
+
+def test_newer_version_rejected(analysis):
+    data = bytearray(encode_snapshot(analysis))
+    struct.pack_into("<H", data, len(MAGIC), FORMAT_VERSION + 1)
+    with pytest.raises(ValueError, match="newer"):
+        CoverageSnapshot(bytes(data))
+
+
+@pytest.mark.parametrize("keep", [0, HEADER.size - 1, HEADER.size + 8, -1])
+def test_truncated(analysis, keep):
+    data = encode_snapshot(analysis)
+    with pytest.raises(ValueError):
+        CoverageSnapshot(data[:keep])
@@ -0,0 +1,83 @@
+import random
+from itertools import combinations
+
+import pytest
+
+from policy_taxonomy import POLICY_AREAS, area_mask
+from rollout_planner import aggregate_gap_weights, plan_rollout, plan_rollout_exact, plan_rollout_greedy
+
+
+def random_instance(seed, policy_count):
+    rng = random.Random(seed)
+    weights = [rng.choice([0, 0, 1, 2.5, 4]) for _ in POLICY_AREAS]
+    policy_masks = {
+        f"P{i}": area_mask(rng.sample(POLICY_AREAS, rng.randint(1, 5)))
+        for i in range(policy_count)
+    }
+    return weights, policy_masks
+
+
+def covered_weight(weights, masks):
+    union = 0
+    for mask in masks:
+        union |= mask
+    return sum(weight for area_id, weight in enumerate(weights) if union >> area_id & 1)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_exact_matches_brute_force(seed):
+    weights, policy_masks = random_instance(seed, policy_count=seed % 7 + 2)
+    result = plan_rollout_exact(weights, policy_masks)
+    assert [step['size'] for step in result] == list(range(1, len(policy_masks) + 1))
+    for step in result:
+        best = max(covered_weight(weights, [policy_masks[p] for p in combo])
+                   for combo in combinations(policy_masks, step['size']))
+        assert step['weightCovered'] == pytest.approx(best)
+        assert len(step['policies']) == step['size']
+        assert covered_weight(weights, [policy_masks[p] for p in step['policies']]) == pytest.approx(best)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_greedy_never_beats_exact(seed):
+    weights, policy_masks = random_instance(seed, policy_count=8)
+    greedy = plan_rollout_greedy(weights, policy_masks)
+    exact = plan_rollout_exact(weights, policy_masks)
+    cumulative = 0.0
+    for step, optimum in zip(greedy, exact):
+        assert step['weightClosed'] > 0
+        cumulative += step['weightClosed']
+        assert cumulative <= optimum['weightCovered'] + 1e-9
+    # A single policy is chosen optimally, and greedy stops once everything reachable is covered
+    if greedy:
+        assert greedy[0]['weightClosed'] == pytest.approx(exact[0]['weightCovered'])
+    assert cumulative == pytest.approx(exact[-1]['weightCovered'])
+
+
+def test_greedy_uses_cost():
+    weights = [1.0] * len(POLICY_AREAS)
+    policy_masks = {
+        "Broad": area_mask(POLICY_AREAS[:4]),
+        "Narrow": area_mask(POLICY_AREAS[:2]),
+    }
+    assert plan_rollout_greedy(weights, policy_masks)[0]['policy'] == "Broad"
+    steps = plan_rollout_greedy(weights, policy_masks, costs={"Broad": 10.0})
+    assert [step['policy'] for step in steps] == ["Narrow", "Broad"]
+    assert steps[1]['areasClosed'] == POLICY_AREAS[2:4]
+
+
+def test_plan_rollout(plans):
+    policy_mapping = {
+        "Windfall Policy": ["Windfall/Large Deals"],
+        "Quota Policy": ["Quota Management", "Territory Management"],
+        "Unrelated Policy": ["International Requirements"],
+    }
+    weights, counts = aggregate_gap_weights(plans)
+    result = plan_rollout(plans, policy_mapping)
+    assert result['totalWeight'] == pytest.approx(sum(weights), abs=0.05)
+    assert result['totalGaps'] == sum(counts)
+    assert result['exact']
+    assert {step['policy'] for step in result['steps']} <= set(policy_mapping)
+    for step in result['steps']:
+        assert step['cumulativeWeight'] <= step['optimalWeight']
+    # Custom costs skip the exact solver
+    assert plan_rollout(plans, policy_mapping, costs={"Quota Policy": 2.0})['exact'] is None
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Watch Mode for the Client Refresh Pipeline
+
+Watches the input files of the default pipeline stages (plan clause
+extracts, master workbook, DRAFT policy DOCX files, mapping CSV, stage
+scripts) and, after each debounced burst of changes, re-runs only the
+stages whose inputs changed plus the stages downstream of them.
+parse-json-plans re-parses only the changed plan files (--incremental
+parse cache).
+
+Opt-in stages are watched only when named: --include adds them to the
+default stages, --only watches just the named stages (plus their
+dependencies), as in run-pipeline.py. Including
+extract-policies-to-markdown also watches the template policy DOCX files.
+
+Uses inotify on Linux and falls back to polling elsewhere (or --poll).
+
+Usage:
+    python3 scripts/watch-pipeline.py [--debounce 0.5] [--poll] [--interval 1.0]
+    POLICY_LIBRARY_DIR=/tmp/policies python3 scripts/watch-pipeline.py --include extract-policies-to-markdown
+    python3 scripts/watch-pipeline.py --only build-policy-matrix
+
+Output:
+    Stage outputs as declared in pipeline_dag.STAGES, refreshed on change
+"""
+
+import argparse
+import os
+import time
+
+from file_watch import InotifyWatcher, create_watcher
+from pipeline_dag import (
+    REPO_ROOT, STAGES, context_env, default_context, default_stages, downstream_stages, resolve_stages,
+    run_pipeline, select_stages, stages_for_paths,
+)
+
+STATUS_ICONS = {
+    "ran": "✅",
+    "skipped": "⏭️ ",
+    "failed": "❌",
+    "blocked": "⛔",
+}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Re-run affected pipeline stages when input files change")
+    parser.add_argument("--debounce", type=float, default=0.5, help="Quiet period that ends a burst of changes (seconds)")
+    parser.add_argument("--max-wait", type=float, default=10.0, help="Longest time to keep collecting one burst (seconds)")
+    parser.add_argument("--poll", action="store_true", help="Poll file stats instead of using inotify")
+    parser.add_argument("--interval", type=float, default=1.0, help="Polling interval (seconds)")
+    parser.add_argument("--jobs", type=int, default=4, help="Maximum stages to run concurrently (default: 4)")
+    parser.add_argument("--only", nargs="+", metavar="STAGE", choices=list(STAGES),
+                        help="Watch only these stages (plus their dependencies)")
+    parser.add_argument("--include", nargs="+", metavar="STAGE", choices=list(STAGES), default=[],
+                        help="Also watch these opt-in stages (e.g. extract-policies-to-markdown)")
+    parser.add_argument("--no-initial-run", action="store_true", help="Do not bring outputs up to date before watching")
+    return parser.parse_args()
+
+
+def print_event(result):
+    if result['status'] in STATUS_ICONS:
+        timing = f" ({result['seconds']:.2f}s)" if result['status'] in ("ran", "failed") else ""
+        print(f"   {STATUS_ICONS[result['status']]} {result['name']}: {result['status']}{timing}")
+        if result['status'] == "failed":
+            print(f"      See log: {result['log']}")
+
+
+def main():
+    args = parse_args()
+
+    context = default_context()
+    stages = resolve_stages(context)
+    if args.only:
+        stages = select_stages(stages, args.only)
+    else:
+        stages = select_stages(stages, list(default_stages(stages)) + args.include)
+    env = context_env(context)
+
+    # Files the pipeline writes itself must not re-trigger it
+    outputs = {os.path.normpath(REPO_ROOT / output) for stage in stages.values() for output in stage['outputs']}
+    patterns = sorted({pattern for stage in stages.values() for pattern in stage['inputs']})
+
+    print("👀 Watching client refresh pipeline inputs...")
+    print(f"📂 Root: {REPO_ROOT}")
+    print(f"📋 Stages: {', '.join(stages)}")
+
+    if not args.no_initial_run:
+        print("\n🔄 Initial run (up-to-date stages are skipped):")
+        run_pipeline(stages, output_dir=context['output'], env=env, jobs=args.jobs, on_event=print_event)
+
+    watcher = create_watcher(REPO_ROOT, patterns, polling=args.poll, interval=args.interval)
+    mode = "inotify" if isinstance(watcher, InotifyWatcher) else f"polling every {args.interval}s"
+    print(f"\n👀 Waiting for changes ({mode}, debounce {args.debounce}s; Ctrl+C to stop)")
+
+    try:
+        while True:
+            changed = watcher.wait_for_changes(debounce=args.debounce, max_wait=args.max_wait)
+            started = time.perf_counter()
+            changed = sorted(path for path in changed if path not in outputs)
+            affected = stages_for_paths(stages, REPO_ROOT, changed)
+            if not affected:
+                continue
+
+            to_run = downstream_stages(stages, affected)
+            print(f"\n📝 {len(changed)} file(s) changed:")
+            for path in changed[:10]:
+                print(f"   {os.path.relpath(path, REPO_ROOT)}")
+            if len(changed) > 10:
+                print(f"   ... and {len(changed) - 10} more")
+            print(f"🔄 Re-running: {', '.join(to_run)}")
+
+            results = run_pipeline(select_stages(stages, to_run), output_dir=context['output'], env=env,
+                                   jobs=args.jobs, on_event=print_event)
+            failed = [r['name'] for r in results if r['status'] in ("failed", "blocked")]
+            elapsed = time.perf_counter() - started
+            icon = "❌" if failed else "✅"
+            print(f"{icon} Refreshed in {elapsed:.2f}s" + (f" (failed: {', '.join(failed)})" if failed else ""))
+            print("👀 Waiting for changes...")
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+    finally:
+        watcher.close()
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())